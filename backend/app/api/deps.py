@@ -1,6 +1,7 @@
 """
 Common dependencies for API endpoints.
 """
+import threading
 from typing import Generator
 from llm.chain import SalesGPTCore
 from llm.client import get_llm
@@ -9,19 +10,24 @@ from memory.store import SessionStore
 # Singleton instances
 _core_instance = None
 _store_instance = None
+_core_lock = threading.Lock()
 
 
 def get_core() -> SalesGPTCore:
     """
-    Get or create SalesGPTCore instance.
+    Get or create the process-wide SalesGPTCore instance.
+
+    Built on first use and shared by chat and every insight endpoint; the
+    engine composes its chains lazily, so this is cheap to call per request.
     
     Returns:
         SalesGPTCore instance
     """
     global _core_instance
     if _core_instance is None:
-        llm = get_llm()
-        _core_instance = SalesGPTCore(llm)
+        with _core_lock:
+            if _core_instance is None:
+                _core_instance = SalesGPTCore(get_llm())
     return _core_instance
 
 
@@ -2,7 +2,7 @@
 V1 API Router - aggregates all v1 endpoints.
 """
 from fastapi import APIRouter
-from app.api.v1.endpoints import health, units, sales, regional, analytics, forecast, chat, rfm
+from app.api.v1.endpoints import health, units, sales, regional, analytics, forecast, chat, rfm, dashboard
 
 api_router = APIRouter()
 
@@ -15,6 +15,7 @@ api_router.include_router(analytics.router, prefix="/analytics", tags=["analytic
 api_router.include_router(forecast.router, prefix="/forecast", tags=["forecast"])
 api_router.include_router(chat.router, prefix="/chat", tags=["chat"])
 api_router.include_router(rfm.router, prefix="/rfm", tags=["rfm"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 
 
 
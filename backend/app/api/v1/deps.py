@@ -21,3 +21,9 @@ async def get_analytics_service(
     db: AsyncSession = Depends(get_db)
 ) -> AnalyticsService:
     return AnalyticsService(db)
+
+from app.db.session import admitted_session
+from app.services.dashboard_service import DashboardService
+async def get_dashboard_service() -> DashboardService:
+    """Dashboard tiles open their own sessions instead of sharing one from get_db"""
+    return DashboardService(admitted_session)
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional
 from app.api.v1.deps import get_db
+from app.db.session import admitted_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.analytics_service import AnalyticsService
 from app.schemas.common import StandardResponse
 from app.api.deps import get_core # Legacy dependency for AI Core
 from app.utils.cache import cache_response
+from app.utils.exceptions import ServiceUnavailableError
 
 router = APIRouter()
 
@@ -13,7 +15,7 @@ async def get_analytics_service(db: AsyncSession = Depends(get_db)) -> Analytics
     return AnalyticsService(db)
 
 @router.get("/available-months", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/analytics/available-months")
 async def get_available_months(
     unit_id: Optional[str] = Query(None),
     service: AnalyticsService = Depends(get_analytics_service)
@@ -25,7 +27,7 @@ async def get_available_months(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/top-customers", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/analytics/top-customers")
 async def get_top_customers(
     unit_id: Optional[int] = Query(None),
     month: Optional[int] = Query(None, description="Month in YYYY-MM format"),
@@ -55,8 +57,22 @@ async def get_credit_sales_ratio(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/credit-ratio-by-channel", response_model=StandardResponse)
+@cache_response(expire=300, route="/analytics/credit-ratio-by-channel")
+async def get_credit_ratio_by_channel(
+    unit_id: Optional[int] = Query(None),
+    month: Optional[str] = Query(None, description="YYYY-MM (default: latest month with deliveries)"),
+    service: AnalyticsService = Depends(get_analytics_service)
+):
+    """Credit vs cash sales breakdown by channel based on credit_facility_type."""
+    try:
+        data = await service.get_credit_by_channel(unit_id, month)
+        return StandardResponse(data=data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/concentration-risk", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/analytics/concentration-risk")
 async def get_concentration_risk(
     unit_id: Optional[str] = Query(None),
     month: Optional[str] = Query(None),
@@ -72,18 +88,16 @@ async def get_concentration_risk(
 async def get_concentration_risk_insights(
     unit_id: Optional[str] = Query(None),
     month: Optional[str] = Query(None),
-    service: AnalyticsService = Depends(get_analytics_service)
+    core = Depends(get_core)
 ):
     """
     Generate AI insights for customer concentration risk.
     Analyzes top customer dependencies and provides strategic recommendations.
     """
     try:
-        from llm.chain import SalesGPTCore
-        from llm.client import get_llm
-        
-        # Get concentration risk data
-        risk_data = await service.get_concentration_risk(unit_id, month)
+        # Short-lived session, released before the LLM call
+        async with admitted_session() as db:
+            risk_data = await AnalyticsService(db).get_concentration_risk(unit_id, month)
         
         top10_pct = risk_data.get("top_10_percentage", 0)
         top_customers = risk_data.get("top_10_customers", [])
@@ -95,9 +109,7 @@ async def get_concentration_risk_insights(
         }
         
         # Generate AI insights using LLM
-        llm = get_llm()
-        gpt = SalesGPTCore(llm)
-        insights = gpt.analyze_concentration_risk(
+        insights = await core.aanalyze_concentration_risk(
             top10_pct=top10_pct,
             top1_data=top1_data
         )
@@ -106,6 +118,8 @@ async def get_concentration_risk_insights(
             data={"insights": insights.get("analysis", "No insights available")},
             message="Concentration risk insights generated successfully"
         )
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         import logging
         logging.exception(f"Failed to generate concentration risk insights: {str(e)}")
@@ -18,7 +18,8 @@ async def chat(
         response = await service.process_message(
             request.message,
             request.session_id,
-            request.debug
+            request.debug,
+            request.reasoning_mode
         )
         return response
     except Exception as e:
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import Optional
+from app.api.v1.deps import get_dashboard_service
+from app.services.dashboard_service import DashboardService
+from app.schemas.common import StandardResponse
+from app.utils.cache import cache_response
+
+router = APIRouter()
+
+@router.get("", response_model=StandardResponse, summary="Get All Dashboard Tiles")
+@cache_response(expire=300, route="/dashboard", period_scope="year")
+async def get_dashboard(
+    unit_id: Optional[int] = Query(None),
+    year: Optional[int] = Query(None),
+    month: Optional[int] = Query(None),
+    service: DashboardService = Depends(get_dashboard_service)
+):
+    """
+    YTD, MTD, metrics, monthly summary, territories, regions, areas, top
+    customers, credit ratio and concentration risk in one payload.
+
+    Tiles are computed concurrently on separate connections; per-tile
+    timings are returned under ``timings_ms`` and failed tiles under ``errors``.
+    """
+    try:
+        data = await service.get_dashboard(unit_id, year, month)
+        return StandardResponse(data=data)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,25 +1,89 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Path, Query, HTTPException
 from typing import Optional
-from app.api.v1.deps import get_db
-from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import admitted_session
 from app.services.forecast_service import ForecastService
 from app.schemas.common import StandardResponse
 from app.utils.cache import cache_response
+from app.utils.exceptions import ServiceUnavailableError
 
 router = APIRouter()
 
-async def get_forecast_service(db: AsyncSession = Depends(get_db)) -> ForecastService:
-    return ForecastService(db)
+async def get_forecast_service() -> ForecastService:
+    """Forecast branches open their own sessions so they can run concurrently"""
+    return ForecastService(session_maker=admitted_session)
 
 @router.get("", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/forecast", versioned=False)
 async def get_forecast(
     unit_id: Optional[str] = Query(None),
+    format: str = Query("points", pattern="^(points|columnar)$", description="Chart layout: per-month points or shared-axis arrays"),
     service: ForecastService = Depends(get_forecast_service)
 ):
     try:
-        data = await service.get_sales_forecast(unit_id)
+        data = await service.get_sales_forecast(unit_id, columnar=format == "columnar")
         return StandardResponse(data=data)
+    except ServiceUnavailableError:
+        # Branches are admitted inside the service; keep the 503 and its Retry-After
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Path segment -> ForecastService dimension
+_DIMENSIONS = {"items": "item", "territories": "territory"}
+
+@router.get("/overview", response_model=StandardResponse)
+@cache_response(expire=300, route="/forecast/overview", versioned=False)
+async def get_forecast_overview(
+    unit_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200, description="Top items and territories to list"),
+    points: Optional[int] = Query(None, ge=3, description="Downsample the global chart to about this many points"),
+    service: ForecastService = Depends(get_forecast_service)
+):
+    """
+    Global chart with the top items and territories as names and totals.
+
+    Their charts are loaded one at a time from /forecast/{items|territories}/series.
+    """
+    try:
+        data = await service.get_forecast_overview(unit_id, limit, points)
+        return StandardResponse(data=data)
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{dimension}", response_model=StandardResponse)
+@cache_response(expire=300, route="/forecast/entities", versioned=False)
+async def get_forecast_entities(
+    dimension: str = Path(..., pattern="^(items|territories)$"),
+    unit_id: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    service: ForecastService = Depends(get_forecast_service)
+):
+    """Top items or territories with actual and forecast totals, without series"""
+    try:
+        data = await service.get_forecast_entities(_DIMENSIONS[dimension], unit_id, limit)
+        return StandardResponse(data=data)
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/{dimension}/series", response_model=StandardResponse)
+@cache_response(expire=300, route="/forecast/series", versioned=False)
+async def get_forecast_entity_series(
+    dimension: str = Path(..., pattern="^(items|territories)$"),
+    name: str = Query(..., description="Item or territory name"),
+    unit_id: Optional[str] = Query(None),
+    points: Optional[int] = Query(None, ge=3, description="Downsample to about this many points (LTTB)"),
+    service: ForecastService = Depends(get_forecast_service)
+):
+    """Monthly actual/forecast chart of one item or territory"""
+    try:
+        data = await service.get_entity_forecast(_DIMENSIONS[dimension], name, unit_id, points)
+        return StandardResponse(data=data)
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -37,6 +101,8 @@ async def generate_forecast_insights(
     try:
         insights = await service.generate_insights(unit_id, core)
         return StandardResponse(data=insights)
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         import logging
         logging.exception(f"Forecast AI Error: {e}")
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from app.utils.cache import get_cache_stats
+from app.db.engine import get_pool_stats
+from app.db.session import admission
 
 router = APIRouter()
 
@@ -12,3 +15,26 @@ def health_check():
         Status dict
     """
     return {"status": "ok"}
+
+
+@router.get("/cache")
+def cache_stats():
+    """
+    Response cache counters for this worker.
+    
+    Returns:
+        Dict of route -> hits/misses/errors
+    """
+    return {"status": "ok", "routes": get_cache_stats()}
+
+
+@router.get("/db")
+def db_admission_stats():
+    """
+    Database admission and connection pool counters for this worker.
+    
+    Returns:
+        Admission lanes (limit/active/queued/admitted/rejected/wait times)
+        and pools (size/checked out/saturation/checkout latency)
+    """
+    return {"status": "ok", "admission": admission.get_stats(), **get_pool_stats()}
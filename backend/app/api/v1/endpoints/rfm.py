@@ -1,16 +1,62 @@
+from functools import partial
 from fastapi import APIRouter, Query, Depends
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
-from app.services.rfm_service import RFMService
+from app.db.admission import HEAVY
+from app.db.session import admitted_session, get_db
+from app.services.rfm_kernel import SEGMENTS
+from app.services.rfm_service import RFMService, SORT_FIELDS
 router = APIRouter()
 @router.get("/analysis")
 async def get_rfm_analysis(
     unit_id: Optional[int] = Query(None, description="Business Unit ID filter"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    segment: Optional[str] = Query(None, pattern=f"^({'|'.join(SEGMENTS)})$", description="Only customers in this segment"),
+    sort_by: Optional[str] = Query(None, pattern=f"^({'|'.join(SORT_FIELDS)})$", description="Customer sort key"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort direction"),
+    page: Optional[int] = Query(None, ge=1, description="Page number; omit to return every customer"),
+    page_size: int = Query(50, ge=1, le=1000, description="Customers per page"),
+    summary_only: bool = Query(False, description="Return only the segment summary and metadata"),
+):
+    """
+    Get RFM analysis with customer segments.
+
+    Without ``page`` the full analysis is returned; with it, a page of
+    customers in the paginated response format. Both read the same cached
+    scored snapshot. Snapshot hits never touch the database; a heavy-lane
+    session is opened only to compute a missing snapshot.
+    """
+    service = RFMService(session_maker=partial(admitted_session, HEAVY))
+    descending = order == "desc"
+    if summary_only:
+        return await service.get_rfm_overview(unit_id, start_date, end_date)
+    if page is not None:
+        return await service.get_rfm_page(
+            page, page_size, unit_id, start_date, end_date, segment, sort_by, descending
+        )
+    return await service.get_rfm_analysis(unit_id, start_date, end_date, segment, sort_by, descending)
+
+
+@router.get("/transitions")
+async def get_rfm_transitions(
+    unit_id: int = Query(..., description="Business Unit ID"),
+    from_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Earlier month (YYYY-MM, default: the month before to_month)"),
+    to_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Later month (YYYY-MM, default: latest stored)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Segment migration matrix between two months of stored RFM history"""
+    service = RFMService(db)
+    return await service.get_segment_transitions(unit_id, from_month, to_month)
+
+
+@router.get("/customers/{customer_id}/history")
+async def get_rfm_customer_history(
+    customer_id: str,
+    unit_id: Optional[int] = Query(None, description="Business Unit ID filter"),
+    start_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="First month (YYYY-MM)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get complete RFM analysis with customer segments"""
+    """Monthly RFM segment history of one customer"""
     service = RFMService(db)
-    return await service.get_rfm_analysis(unit_id, start_date, end_date)
\ No newline at end of file
+    return await service.get_customer_segment_history(customer_id, unit_id, start_month)
@@ -4,12 +4,14 @@ from typing import Optional
 import logging
 
 from app.db.session import get_db
+from app.db.session import admitted_session
 from app.api.v1.deps import get_sales_service
 from app.services.sales_service import SalesService
 from app.schemas.sales import YTDResponse
 from app.schemas.common import StandardResponse
+from app.api.deps import get_core
 from app.utils.cache import cache_response
-from app.utils.exceptions import NotFoundError, DatabaseError
+from app.utils.exceptions import NotFoundError, DatabaseError, ServiceUnavailableError
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +24,7 @@ router = APIRouter()
     status_code=status.HTTP_200_OK,
     summary="Get YTD Sales Analysis"
 )
-@cache_response(expire=300)
+@cache_response(expire=300, route="/sales/ytd")
 async def get_ytd_sales(
     unit_id: Optional[str] = Query(
         None,
@@ -91,7 +93,7 @@ async def get_ytd_sales(
     response_model=StandardResponse,
     summary="Get Month-to-Date Stats"
 )
-@cache_response(expire=300)
+@cache_response(expire=300, route="/sales/mtd")
 async def get_mtd_stats(
     unit_id: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
@@ -105,7 +107,7 @@ async def get_mtd_stats(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/metrics", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/sales/metrics", period_scope="year")
 async def get_sales_metrics(
     unit_id: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
@@ -122,7 +124,7 @@ async def get_sales_metrics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/monthly-summary", response_model=StandardResponse)
-@cache_response(expire=300)
+@cache_response(expire=300, route="/sales/monthly-summary", period_scope="year")
 async def get_monthly_summary(
     month: Optional[int] = Query(None, description="Month in YYYY-MM format"),
     year: Optional[int] = Query(None, description="Year for yearly average"),
@@ -139,18 +141,16 @@ async def get_monthly_summary(
 async def get_ytd_insights(
     unit_id: Optional[str] = Query(None),
     fiscal_year: bool = Query(False),
-    service: SalesService = Depends(get_sales_service)
+    core = Depends(get_core)
 ):
     """
     Generate AI insights for YTD sales performance.
     Uses LLM to analyze YTD year-over-year growth trends and provide strategic recommendations.
     """
     try:
-        from llm.chain import SalesGPTCore
-        from llm.client import get_llm
-        
-        # Get YTD data (current YTD vs last year YTD)
-        ytd_data = await service.get_ytd_comparison(unit_id, fiscal_year)
+        # Short-lived session, released before the LLM call
+        async with admitted_session() as db:
+            ytd_data = await SalesService(db).get_ytd_comparison(unit_id, fiscal_year)
         
         current_ytd = ytd_data.get("current_ytd", {})
         last_ytd = ytd_data.get("last_ytd", {})
@@ -181,9 +181,7 @@ async def get_ytd_insights(
         ]
         
         # Generate AI insights using LLM
-        llm = get_llm()
-        gpt = SalesGPTCore(llm)
-        insights = gpt.analyze_sales_diagnostics(
+        insights = await core.aanalyze_sales_diagnostics(
             current_month=transformed_current,
             trend_data=transformed_trend
         )
@@ -192,6 +190,8 @@ async def get_ytd_insights(
             data={"insights": insights},
             message="YTD insights generated successfully"
         )
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         logger.exception(f"Failed to generate YTD insights: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
@@ -201,18 +201,16 @@ async def get_mtd_insights(
     unit_id: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
     month: Optional[int] = Query(None),
-    service: SalesService = Depends(get_sales_service)
+    core = Depends(get_core)
 ):
     """
     Generate AI insights for MTD (Month-to-Date) sales performance.
     Analyzes current month vs previous month performance.
     """
     try:
-        from llm.chain import SalesGPTCore
-        from llm.client import get_llm
-        
-        # Get MTD data (current month vs previous month)
-        mtd_data = await service.get_mtd_stats(unit_id, year, month)
+        # Short-lived session, released before the LLM call
+        async with admitted_session() as db:
+            mtd_data = await SalesService(db).get_mtd_stats(unit_id, year, month)
         
         current_month = mtd_data.get("current_month", {})
         previous_month = mtd_data.get("previous_month", {})
@@ -242,9 +240,7 @@ async def get_mtd_insights(
         ]
         
         # Generate AI insights using LLM
-        llm = get_llm()
-        gpt = SalesGPTCore(llm)
-        insights = gpt.analyze_sales_diagnostics(
+        insights = await core.aanalyze_sales_diagnostics(
             current_month=transformed_current,
             trend_data=transformed_trend
         )
@@ -253,6 +249,8 @@ async def get_mtd_insights(
             data={"insights": insights},
             message="MTD insights generated successfully"
         )
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         logger.exception(f"Failed to generate MTD insights: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate insights: {str(e)}")
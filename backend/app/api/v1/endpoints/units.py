@@ -18,7 +18,7 @@ from app.utils.cache import cache_response
 router = APIRouter()
 
 @router.get("/", response_model=StandardResponse)
-@cache_response(expire=3600)
+@cache_response(expire=3600, route="/units", versioned=False)
 async def get_units(db: AsyncSession = Depends(get_db)):
     """
     Get list of all business units with their IDs and names.
@@ -0,0 +1,147 @@
+"""
+Admission control for database sessions.
+
+Caps how many sessions a worker holds at once (derived from the engine's
+pool so requests never queue inside SQLAlchemy) and splits them into
+priority lanes: "interactive" dashboard reads may use every slot, while
+"heavy" work (RFM pulls, background refreshes) is capped so it can never
+occupy the whole pool. Freed slots go to interactive waiters first.
+
+Waiters queue for at most DB_QUEUE_TIMEOUT_SECONDS and a full queue is
+rejected immediately, both surfacing as a 503 instead of piling up.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict
+
+from app.utils.exceptions import ServiceUnavailableError
+
+INTERACTIVE = "interactive"
+HEAVY = "heavy"
+
+# Lanes in the order freed slots are handed out
+LANES = (INTERACTIVE, HEAVY)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        limit: int,
+        heavy_limit: int,
+        queue_timeout: float = 5.0,
+        max_queue: int = 100
+    ):
+        """
+        Args:
+            limit: Sessions held at once across all lanes
+            heavy_limit: Sessions the heavy lane may hold at once
+            queue_timeout: Seconds a request waits for a slot before a 503
+            max_queue: Waiters per lane beyond which requests are shed at once
+        """
+        self.limit = max(limit, 1)
+        self.lane_limits = {INTERACTIVE: self.limit, HEAVY: max(min(heavy_limit, self.limit), 1)}
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._active: Dict[str, int] = dict.fromkeys(LANES, 0)
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._stats: Dict[str, Dict[str, float]] = {
+            lane: dict.fromkeys(("admitted", "rejected", "timeouts", "wait_seconds_total", "wait_seconds_max"), 0)
+            for lane in LANES
+        }
+
+    def _has_capacity(self, lane: str) -> bool:
+        return sum(self._active.values()) < self.limit and self._active[lane] < self.lane_limits[lane]
+
+    def _has_priority(self, lane: str) -> bool:
+        """No one in this lane or a higher-priority lane is already waiting."""
+        for other in LANES:
+            if self._waiters[other]:
+                return False
+            if other == lane:
+                return True
+        return True
+
+    async def acquire(self, lane: str = INTERACTIVE) -> None:
+        if lane not in self._active:
+            raise ValueError(f"Unknown admission lane: {lane}")
+        stats = self._stats[lane]
+
+        if self._has_capacity(lane) and self._has_priority(lane):
+            self._active[lane] += 1
+            stats["admitted"] += 1
+            return
+
+        if len(self._waiters[lane]) >= self.max_queue or self.queue_timeout <= 0:
+            stats["rejected"] += 1
+            raise ServiceUnavailableError(f"Database busy: {lane} lane is saturated")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            # A slot granted right at the deadline is still taken
+            if not waiter.done() or waiter.cancelled():
+                stats["timeouts"] += 1
+                stats["rejected"] += 1
+                raise ServiceUnavailableError(f"Database busy: no {lane} slot within {self.queue_timeout:g}s")
+        except asyncio.CancelledError:
+            # The slot may have been granted while the request was cancelled
+            if waiter.done() and not waiter.cancelled():
+                self.release(lane)
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            if waiter in self._waiters[lane]:
+                self._waiters[lane].remove(waiter)
+
+        waited = time.perf_counter() - started
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        stats["admitted"] += 1
+
+    def release(self, lane: str = INTERACTIVE) -> None:
+        self._active[lane] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters, interactive lane first."""
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._has_capacity(lane):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                # The slot is counted here so no newcomer can take it first
+                self._active[lane] += 1
+                waiter.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: str = INTERACTIVE) -> AsyncIterator[None]:
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release(lane)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, active sessions, wait times and rejections per lane."""
+        lanes = {}
+        for lane in LANES:
+            stats = self._stats[lane]
+            admitted = stats["admitted"]
+            lanes[lane] = {
+                "limit": self.lane_limits[lane],
+                "active": self._active[lane],
+                "queued": len(self._waiters[lane]),
+                "admitted": int(admitted),
+                "rejected": int(stats["rejected"]),
+                "timeouts": int(stats["timeouts"]),
+                "avg_wait_ms": round(stats["wait_seconds_total"] / admitted * 1000, 2) if admitted else 0.0,
+                "max_wait_ms": round(stats["wait_seconds_max"] * 1000, 2),
+            }
+        return {"limit": self.limit, "queue_timeout_seconds": self.queue_timeout, "lanes": lanes}
@@ -0,0 +1,181 @@
+"""
+Single owner of the process's database pools.
+
+One async pool (asyncpg) serves the API, repositories and jobs; one lazily
+created sync pool (psycopg2) serves the LangChain SQLDatabase used by the
+chat agent and the legacy sync repositories. Pool sizes are derived from a
+deployment-wide connection budget split across workers, so adding workers
+never silently multiplies the Postgres connection count.
+
+Both pools record checkout latency and saturation (see get_pool_stats).
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from core.config import settings
+
+
+def compute_pool_sizes(budget: int, workers: int, sync_enabled: bool = True) -> Dict[str, Dict[str, int]]:
+    """
+    Split a deployment-wide connection budget into this worker's pools.
+
+    Each worker gets ``budget // workers`` connections. DB_SYNC_POOL_SHARE of
+    them (at least one) go to the sync pool; the async pool keeps half of the
+    rest open and may overflow into the other half.
+    """
+    per_worker = max(budget // max(workers, 1), 2)
+    sync_total = max(int(per_worker * settings.DB_SYNC_POOL_SHARE), 1) if sync_enabled else 0
+    async_total = per_worker - sync_total
+    async_size = max(async_total // 2, 1)
+    return {
+        "async": {"pool_size": async_size, "max_overflow": max(async_total - async_size, 0)},
+        "sync": {"pool_size": sync_total, "max_overflow": 0},
+    }
+
+
+POOL_SIZES = compute_pool_sizes(
+    settings.DB_CONNECTION_BUDGET, settings.WEB_CONCURRENCY, settings.DB_SYNC_POOL_ENABLED
+)
+
+
+class _InstrumentedPool:
+    """Records how long connection checkouts wait and how full the pool gets."""
+    label = "pool"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            _record_checkout(self.label, time.perf_counter() - started, self.checkedout(), failed=True)
+            raise
+        _record_checkout(self.label, time.perf_counter() - started, self.checkedout())
+        return connection
+
+
+class _AsyncPool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    label = "async"
+
+
+class _SyncPool(_InstrumentedPool, QueuePool):
+    label = "sync"
+
+
+_stats_lock = threading.Lock()
+_pool_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _record_checkout(label: str, waited: float, checked_out: int, failed: bool = False) -> None:
+    with _stats_lock:
+        stats = _pool_stats.setdefault(label, dict.fromkeys(
+            ("checkouts", "timeouts", "wait_seconds_total", "wait_seconds_max", "peak_checked_out"), 0
+        ))
+        if failed:
+            stats["timeouts"] += 1
+            return
+        stats["checkouts"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        stats["peak_checked_out"] = max(stats["peak_checked_out"], checked_out)
+
+
+def make_pg_url(driver: str = "psycopg2") -> str:
+    return (
+        f"postgresql+{driver}://{settings.PG_USER}:{settings.PG_PASSWORD}"
+        f"@{settings.PG_HOST}:{settings.PG_PORT}/{settings.PG_DB}"
+    )
+
+
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL,
+    echo=False,
+    poolclass=_AsyncPool,
+    pool_recycle=1800,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    **POOL_SIZES["async"],
+)
+
+# Create async session factory
+async_session_maker = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+_sync_engine: Optional[Engine] = None
+_sql_database = None
+_sync_lock = threading.Lock()
+
+
+def get_sync_engine() -> Engine:
+    """Sync engine for the LLM agent and legacy sync repositories, created on first use."""
+    global _sync_engine
+    if not settings.DB_SYNC_POOL_ENABLED:
+        raise RuntimeError("The sync database pool is disabled (DB_SYNC_POOL_ENABLED=false)")
+    with _sync_lock:
+        if _sync_engine is None:
+            _sync_engine = create_engine(
+                make_pg_url(),
+                poolclass=_SyncPool,
+                pool_pre_ping=True,
+                pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+                echo=False,
+                connect_args={
+                    'connect_timeout': 10,
+                    'options': '-c statement_timeout=30000'
+                },
+                **POOL_SIZES["sync"],
+            )
+    return _sync_engine
+
+
+def get_sql_database():
+    """
+    LangChain SQLDatabase over the shared sync pool.
+
+    Created lazily so the app doesn't crash at startup if the DB is full.
+    """
+    global _sql_database
+    if _sql_database is None:
+        from langchain_community.utilities import SQLDatabase
+        _sql_database = SQLDatabase(get_sync_engine(), schema=settings.PG_SCHEMA)
+    return _sql_database
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Size, usage, saturation and checkout latency of every pool in this worker."""
+    pools = {"async": async_engine.pool}
+    if _sync_engine is not None:
+        pools["sync"] = _sync_engine.pool
+
+    result = {}
+    for label, pool in pools.items():
+        with _stats_lock:
+            stats = dict(_pool_stats.get(label, {}))
+        capacity = POOL_SIZES[label]["pool_size"] + POOL_SIZES[label]["max_overflow"]
+        checked_out = pool.checkedout()
+        checkouts = stats.get("checkouts", 0)
+        result[label] = {
+            "pool_size": POOL_SIZES[label]["pool_size"],
+            "max_overflow": POOL_SIZES[label]["max_overflow"],
+            "checked_out": checked_out,
+            "saturation": round(checked_out / capacity, 2) if capacity else 0.0,
+            "peak_checked_out": int(stats.get("peak_checked_out", 0)),
+            "checkouts": int(checkouts),
+            "timeouts": int(stats.get("timeouts", 0)),
+            "avg_checkout_ms": round(stats.get("wait_seconds_total", 0) / checkouts * 1000, 2) if checkouts else 0.0,
+            "max_checkout_ms": round(stats.get("wait_seconds_max", 0) * 1000, 2),
+        }
+    return {
+        "connection_budget": settings.DB_CONNECTION_BUDGET,
+        "workers": settings.WEB_CONCURRENCY,
+        "pools": result,
+    }
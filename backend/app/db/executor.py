@@ -0,0 +1,69 @@
+"""
+Typed query executor for raw SQL.
+
+Returns driver values (int, Decimal, date, ...) straight from asyncpg as row
+tuples or columns, replacing the LangChain ``SQLDatabase.run()`` path that
+rendered rows into a string only for callers to parse it back with
+``ast.literal_eval``/``eval``.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import admitted_session
+
+
+@dataclass
+class QueryResult:
+    columns: Tuple[str, ...]
+    rows: List[Tuple[Any, ...]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def first(self) -> Optional[Tuple[Any, ...]]:
+        return self.rows[0] if self.rows else None
+
+    def scalar(self) -> Any:
+        return self.rows[0][0] if self.rows else None
+
+    def columnar(self) -> Dict[str, List[Any]]:
+        """Column name -> list of values."""
+        if not self.rows:
+            return {column: [] for column in self.columns}
+        return {column: list(values) for column, values in zip(self.columns, zip(*self.rows))}
+
+    def dicts(self) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+
+async def fetch(
+    query: str,
+    params: Optional[Dict[str, Any]] = None,
+    session: Optional[AsyncSession] = None,
+    lane: Optional[str] = None
+) -> QueryResult:
+    """
+    Run a read query and return its typed rows.
+
+    Args:
+        query: SQL text with :named parameters
+        params: Bind parameters
+        session: Existing session to run on (default: an admitted session of its own)
+        lane: Admission lane when opening a session
+    """
+    if session is not None:
+        return await _fetch(session, query, params)
+    async with admitted_session(lane) as own_session:
+        return await _fetch(own_session, query, params)
+
+
+async def _fetch(session: AsyncSession, query: str, params: Optional[Dict[str, Any]]) -> QueryResult:
+    result = await session.execute(text(query), params or {})
+    # Plain tuples keep the driver's values and are cheap to cache or pickle
+    return QueryResult(columns=tuple(result.keys()), rows=[tuple(row) for row in result.all()])
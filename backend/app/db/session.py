@@ -1,45 +1,98 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from core.config import settings
+from app.db.admission import AdmissionController, HEAVY, INTERACTIVE
+from app.db.engine import POOL_SIZES, async_engine, async_session_maker
 
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    echo=False,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=1800,
-)
+import contextvars
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
-# Create async session factory
-async_session_maker = async_sessionmaker(
-    async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+# Never admit more sessions than the pool can hand out without blocking
+_db_limit = settings.DB_MAX_CONCURRENCY or POOL_SIZES["async"]["pool_size"] + POOL_SIZES["async"]["max_overflow"]
+admission = AdmissionController(
+    limit=_db_limit,
+    heavy_limit=settings.DB_HEAVY_LANE_LIMIT or max(_db_limit // 2, 1),
+    queue_timeout=settings.DB_QUEUE_TIMEOUT_SECONDS,
+    max_queue=settings.DB_MAX_QUEUE,
 )
 
-import asyncio
-from typing import AsyncGenerator
+# Lane used by get_db; background jobs switch it to HEAVY for their task
+db_lane: contextvars.ContextVar[str] = contextvars.ContextVar("db_lane", default=INTERACTIVE)
+
+
+@asynccontextmanager
+async def admitted_session(lane: str = None) -> AsyncIterator[AsyncSession]:
+    """Session opened once the admission controller grants a slot in ``lane``."""
+    async with admission.slot(lane or db_lane.get()):
+        async with async_session_maker() as session:
+            yield session
+
+
+async def _session_scope(lane: str = None) -> AsyncGenerator[AsyncSession, None]:
+    async with admitted_session(lane) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception as e:
+            import traceback
+            with open("backend_errors.txt", "a") as f:
+                f.write(f"DB Session Error: {str(e)}\n{traceback.format_exc()}\n")
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
 
-_db_semaphore = asyncio.Semaphore(1) 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to provide an async database session.
     Automatically handles commit/rollback and closing.
-    Uses a semaphore to prevent opening too many simultaneous connections.
+    Waits for an admission slot (interactive lane by default) so the pool is
+    never oversubscribed; raises a 503 when none frees up in time.
     """
-    async with _db_semaphore:
-        async with async_session_maker() as session:
-            try:
-                yield session
-                await session.commit()
-            except Exception as e:
-                import traceback
-                with open("backend_errors.txt", "a") as f:
-                    f.write(f"DB Session Error: {str(e)}\n{traceback.format_exc()}\n")
-                await session.rollback()
-                raise
-            finally:
-                await session.close()
+    async for session in _session_scope():
+        yield session
+
+
+async def get_heavy_db() -> AsyncGenerator[AsyncSession, None]:
+    """Like get_db, for long-running reads that must not starve the dashboard."""
+    async for session in _session_scope(HEAVY):
+        yield session
+
+
+async def ensure_index_concurrently(name: str, definition: str, lane: str = HEAVY) -> bool:
+    """
+    Build an index on a live table without blocking its writers.
+
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so it runs on
+    its own autocommit connection (holding an admission slot like any
+    session). An invalid index left behind by an interrupted build is
+    dropped and rebuilt.
+
+    Args:
+        name: Index name
+        definition: Everything after the name, e.g. "ON tbldeliveryinfo (delivery_date)"
+
+    Returns:
+        True when the index was built, False when a valid one already existed
+    """
+    async with admission.slot(lane):
+        async with async_engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            result = await conn.execute(
+                text("""
+                    SELECT i.indisvalid
+                    FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = :name
+                """),
+                {"name": name}
+            )
+            valid = result.scalar()
+            if valid:
+                return False
+            if valid is not None:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+            await conn.execute(text(f"CREATE INDEX CONCURRENTLY {name} {definition}"))
+            return True
@@ -0,0 +1,79 @@
+"""
+Single registry of the delivery quantity -> MT conversion rules.
+
+Every SQL fragment that converts delivery_qty or labels the UOM is generated
+from UOM_RULES: the ad-hoc query expressions, the trigger that maintains the
+persisted tbldeliveryinfo.qty_mt / uom_shown columns, and the backfill job.
+"""
+from dataclasses import dataclass
+from typing import Tuple
+
+
+@dataclass(frozen=True)
+class UomRule:
+    """Business units whose deliveries are reported in MT."""
+    unit_ids: Tuple[int, ...]
+    # base_uom values already expressed in MT (no weight conversion needed)
+    native_uoms: Tuple[str, ...] = ()
+
+
+UOM_RULES: Tuple[UomRule, ...] = (
+    UomRule(unit_ids=(4,), native_uoms=("Ton",)),
+    UomRule(unit_ids=(188, 189, 232)),
+    UomRule(unit_ids=(144,), native_uoms=("Metric Tons",)),
+)
+
+# base_uom spellings displayed as MT for any unit
+MT_UOM_ALIASES: Tuple[str, ...] = ("Metric Tons", "Metric Ton", "MT", "Ton")
+
+
+def mt_unit_ids() -> Tuple[int, ...]:
+    return tuple(unit_id for rule in UOM_RULES for unit_id in rule.unit_ids)
+
+
+def _in_list(values) -> str:
+    return ", ".join(str(v) if isinstance(v, int) else "'" + v.replace("'", "''") + "'" for v in values)
+
+
+def _unit_match(rule: UomRule, prefix: str) -> str:
+    if len(rule.unit_ids) == 1:
+        return f"{prefix}unit_id = {rule.unit_ids[0]}"
+    return f"{prefix}unit_id IN ({_in_list(rule.unit_ids)})"
+
+
+def build_qty_mt_case(prefix: str = "") -> str:
+    """
+    CASE expression converting one row's delivery_qty to MT.
+
+    Args:
+        prefix: Column qualifier, e.g. "NEW." inside a trigger
+    """
+    whens = []
+    for rule in UOM_RULES:
+        unit_match = _unit_match(rule, prefix)
+        if rule.native_uoms:
+            uom_match = (
+                f"{prefix}base_uom = {_in_list(rule.native_uoms)}"
+                if len(rule.native_uoms) == 1
+                else f"{prefix}base_uom IN ({_in_list(rule.native_uoms)})"
+            )
+            whens.append(f"WHEN {unit_match} AND {uom_match} THEN {prefix}delivery_qty")
+        whens.append(f"WHEN {unit_match} THEN ({prefix}delivery_qty * {prefix}numgrossweight) / 1000.0")
+    body = "\n            ".join(whens)
+    return f"""
+        CASE
+            {body}
+            ELSE {prefix}delivery_qty
+        END
+    """
+
+
+def build_uom_shown_case(prefix: str = "") -> str:
+    """CASE expression for the UOM label used when grouping converted quantities."""
+    return f"""
+        CASE
+            WHEN {prefix}unit_id IN ({_in_list(mt_unit_ids())}) THEN 'MT'
+            WHEN {prefix}base_uom IN ({_in_list(MT_UOM_ALIASES)}) THEN 'MT'
+            ELSE {prefix}base_uom
+        END
+    """
@@ -1,30 +1,113 @@
+from typing import Optional
 from sqlalchemy import text
+from core.config import settings
+from app.db.uom import build_qty_mt_case, build_uom_shown_case, mt_unit_ids
 
 def get_uom_conversion_sql() -> str:
     """
-    Returns the centralized SQL CASE statement for UOM conversion.
-    Only specific units (4, 144, 188, 189, 232) are converted to MT.
+    Returns the centralized SQL for a row's quantity converted to MT.
+    Only the units registered in app/db/uom.py are converted to MT.
     All other units use their base UOM without conversion.
+    With USE_PERSISTED_QTY_MT this is the trigger-maintained qty_mt column.
     """
-    return """
-        CASE
-            WHEN unit_id = 4 AND base_uom = 'Ton' THEN delivery_qty
-            WHEN unit_id = 4 THEN (delivery_qty * numgrossweight) / 1000.0
-            WHEN unit_id IN (188, 189, 232) THEN (delivery_qty * numgrossweight) / 1000.0
-            WHEN unit_id = 144 AND base_uom = 'Metric Tons' THEN delivery_qty
-            WHEN unit_id = 144 THEN (delivery_qty * numgrossweight) / 1000.0
-            ELSE delivery_qty
-        END
+    if settings.USE_PERSISTED_QTY_MT:
+        return "qty_mt"
+    return build_qty_mt_case()
+
+def get_uom_shown_sql() -> str:
     """
+    Returns SQL for the UOM label used when grouping converted quantities.
+    With USE_PERSISTED_QTY_MT this is the trigger-maintained uom_shown column.
+    """
+    if settings.USE_PERSISTED_QTY_MT:
+        return "uom_shown"
+    return build_uom_shown_case()
 
 def get_uom_display() -> str:
     """
     Returns SQL to determine the display UOM.
     Specific units show 'MT', others show their base_uom.
     """
-    return """
+    return f"""
         CASE
-            WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
+            WHEN unit_id IN ({", ".join(map(str, mt_unit_ids()))}) THEN 'MT'
             ELSE COALESCE(base_uom, 'Units')
         END
     """
+
+# Daily pre-aggregated rollup of tbldeliveryinfo (see app/repositories/rollup_repository.py)
+DAILY_ROLLUP_TABLE = "tbldeliveryinfo_daily"
+ROLLUP_STATE_TABLE = "tbldeliveryinfo_rollup_state"
+DAILY_ROLLUP_NAME = "daily"
+
+# Per-(unit, customer, month) RFM inputs (see app/repositories/rfm_state_repository.py);
+# its high-water mark lives in ROLLUP_STATE_TABLE under RFM_STATE_NAME
+RFM_STATE_TABLE = "rfm_customer_state"
+RFM_STATE_NAME = "rfm"
+
+# Monthly scored RFM segments per unit and customer (see app/repositories/rfm_history_repository.py)
+RFM_HISTORY_TABLE = "rfm_segment_history"
+
+# Rollup grain: one row per combination of these tbldeliveryinfo columns per day
+ROLLUP_DIMENSIONS = (
+    "delivery_date",
+    "unit_id",
+    "region",
+    "area",
+    "territory",
+    "customer_id",
+    "customer_name",
+    "channel_name",
+    "credit_facility_type",
+    "base_uom",
+)
+
+
+def get_delivery_rows_sql() -> str:
+    """
+    Returns the per-row projection of tbldeliveryinfo in rollup shape:
+    the rollup dimensions plus qty_mt, invoice_amount, order_count,
+    qty_order_count (rows with a delivery quantity) and uom_shown.
+    """
+    dimensions = ", ".join(ROLLUP_DIMENSIONS)
+    return f"""
+        SELECT
+            {dimensions},
+            ({get_uom_conversion_sql()})::double precision AS qty_mt,
+            delivery_invoice_amount::double precision AS invoice_amount,
+            1 AS order_count,
+            (delivery_qty IS NOT NULL)::int AS qty_order_count,
+            {get_uom_shown_sql()} AS uom_shown
+        FROM tbldeliveryinfo
+    """
+
+
+def get_delivery_source_sql(use_rollup: Optional[bool] = None) -> str:
+    """
+    Returns the FROM-clause source for delivery aggregates.
+
+    Columns match ROLLUP_DIMENSIONS plus qty_mt, invoice_amount, order_count,
+    qty_order_count and uom_shown, so queries aggregate with SUM(qty_mt) and
+    SUM(order_count) regardless of the backing store. With the daily rollup
+    enabled, days up to the rollup's high-water mark come from the rollup and
+    only newer days are read from raw tbldeliveryinfo.
+    """
+    if use_rollup is None:
+        use_rollup = settings.USE_DAILY_ROLLUP
+    if not use_rollup:
+        return f"({get_delivery_rows_sql()}) AS deliveries"
+
+    dimensions = ", ".join(ROLLUP_DIMENSIONS)
+    covered_until = f"""(
+        SELECT covered_until FROM {ROLLUP_STATE_TABLE} WHERE name = '{DAILY_ROLLUP_NAME}'
+    )"""
+    return f"""(
+        SELECT
+            {dimensions}, qty_mt, invoice_amount, order_count, qty_order_count,
+            {build_uom_shown_case()} AS uom_shown
+        FROM {DAILY_ROLLUP_TABLE}
+        WHERE delivery_date < {covered_until}
+        UNION ALL
+        {get_delivery_rows_sql()}
+        WHERE delivery_date >= COALESCE({covered_until}, '-infinity'::date)
+    ) AS deliveries"""
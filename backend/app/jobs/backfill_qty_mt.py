@@ -0,0 +1,75 @@
+"""
+Backfill of the persisted tbldeliveryinfo.qty_mt / uom_shown columns.
+
+Creates the columns and maintenance trigger, builds the covering index
+concurrently, then walks tbldeliveryinfo in delivery_date batches (one
+transaction each) updating rows whose values are missing or disagree with
+the conversion registry.
+Safe to re-run; rows that are already correct are skipped.
+
+    python -m app.jobs.backfill_qty_mt
+    python -m app.jobs.backfill_qty_mt --batch-days 30
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from core.config import settings
+from app.db.session import async_session_maker, ensure_index_concurrently
+from app.repositories.uom_repository import COVERING_INDEX, UomRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_qty_mt(batch_days: Optional[int] = None) -> int:
+    """Ensure the schema and backfill every delivery_date batch. Returns rows updated."""
+    batch_days = batch_days or settings.QTY_MT_BACKFILL_BATCH_DAYS
+    started = time.perf_counter()
+
+    async with async_session_maker() as session:
+        async with session.begin():
+            repo = UomRepository(session)
+            await repo.ensure_schema()
+            bounds = await repo.get_date_bounds()
+
+    # Needs the columns, and must not hold a write lock on the live table
+    if await ensure_index_concurrently(*COVERING_INDEX):
+        logger.info(f"Built index {COVERING_INDEX[0]}")
+
+    total = 0
+    batches = [(None, None)]
+    if bounds:
+        day = bounds["min_date"]
+        while day <= bounds["max_date"]:
+            batches.append((day, day + timedelta(days=batch_days)))
+            day += timedelta(days=batch_days)
+
+    for start_date, end_date in batches:
+        # Short transactions keep row locks brief on the live table
+        async with async_session_maker() as session:
+            async with session.begin():
+                updated = await UomRepository(session).backfill_range(start_date, end_date)
+        total += updated
+        if updated:
+            logger.info(f"qty_mt backfill {start_date or 'undated'}..{end_date or ''}: {updated} rows")
+
+    logger.info(f"qty_mt backfill finished: {total} rows in {time.perf_counter() - started:.2f}s")
+    return total
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Backfill tbldeliveryinfo.qty_mt / uom_shown")
+    parser.add_argument("--batch-days", type=int, default=None, help="delivery days per transaction")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(backfill_qty_mt(batch_days=args.batch_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Monthly RFM segment history per unit.
+
+For every closed month not stored yet, scores the unit's customers over the
+RFM_HISTORY_WINDOW_MONTHS ending with that month (with the RFM kernel behind
+/rfm/analysis) and stores their segments, so /rfm/transitions and customer
+histories are plain lookups. Months already stored are skipped; run from cron after the
+month closes:
+
+    python -m app.jobs.build_rfm_history                 # missing months, every unit
+    python -m app.jobs.build_rfm_history --unit 4 --full # recompute the backfill range
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from core.config import settings
+from app.db.admission import HEAVY
+from app.db.session import admitted_session
+from app.repositories.rfm_history_repository import RFMHistoryRepository
+from app.services.rfm_service import RFMService
+
+logger = logging.getLogger(__name__)
+
+
+def add_months(month: date, count: int) -> date:
+    """First day of the month ``count`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def months_to_build(
+    first_date: date,
+    last_date: date,
+    stored: Sequence[date],
+    backfill_months: int,
+    today: Optional[date] = None,
+    full: bool = False
+) -> List[date]:
+    """Closed months with deliveries within the backfill range that still need a snapshot."""
+    current_month = (today or date.today()).replace(day=1)
+    last_month = min(last_date.replace(day=1), add_months(current_month, -1))
+    month = max(first_date.replace(day=1), add_months(last_month, -(backfill_months - 1)))
+    stored_months = set() if full else set(stored)
+
+    months = []
+    while month <= last_month:
+        if month not in stored_months:
+            months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+async def build_month(unit_id: int, month: date, window_months: int) -> int:
+    """Score one unit's window ending with ``month`` and store it in one transaction."""
+    start = add_months(month, -(window_months - 1))
+    end = add_months(month, 1) - timedelta(days=1)
+    async with admitted_session(HEAVY) as session:
+        async with session.begin():
+            service = RFMService(session)
+            df = await service.repository.get_customer_aggregates(unit_id, start.isoformat(), end.isoformat())
+            customers: List[Dict[str, Any]] = []
+            if not df.empty:
+                customers, _ = await service.score_aggregates(df)
+            return await RFMHistoryRepository(session).replace_month(unit_id, month, customers)
+
+
+async def build_rfm_history(
+    unit_ids: Optional[Sequence[int]] = None,
+    full: bool = False,
+    backfill_months: Optional[int] = None,
+    window_months: Optional[int] = None
+) -> Dict[str, Any]:
+    """Create the history schema if needed and store every missing month."""
+    backfill_months = settings.RFM_HISTORY_BACKFILL_MONTHS if backfill_months is None else backfill_months
+    window_months = settings.RFM_HISTORY_WINDOW_MONTHS if window_months is None else window_months
+    started = time.perf_counter()
+
+    async with admitted_session(HEAVY) as session:
+        async with session.begin():
+            repo = RFMHistoryRepository(session)
+            await repo.ensure_schema()
+            ranges = await repo.get_unit_ranges()
+            if unit_ids is not None:
+                ranges = {unit_id: ranges[unit_id] for unit_id in unit_ids if unit_id in ranges}
+            stored = {unit_id: await repo.get_stored_months(unit_id) for unit_id in ranges}
+
+    months_built = 0
+    rows_written = 0
+    for unit_id, unit_range in ranges.items():
+        months = months_to_build(
+            unit_range["first_date"], unit_range["last_date"], stored[unit_id], backfill_months, full=full
+        )
+        for month in months:
+            rows_written += await build_month(unit_id, month, window_months)
+            months_built += 1
+
+    logger.info(
+        f"RFM history: {months_built} unit-months, {rows_written} rows "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return {"units": len(ranges), "months_built": months_built, "rows_written": rows_written}
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Store monthly RFM segments per unit")
+    parser.add_argument("--unit", type=int, action="append", dest="units", help="unit to build (repeatable)")
+    parser.add_argument("--full", action="store_true", help="recompute months already stored")
+    parser.add_argument("--backfill-months", type=int, default=None, help="closed months to cover")
+    parser.add_argument("--window-months", type=int, default=None, help="RFM window ending with each month")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(build_rfm_history(
+        unit_ids=args.units,
+        full=args.full,
+        backfill_months=args.backfill_months,
+        window_months=args.window_months,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Schema digest used by the NL->SQL prompt.
+
+Rebuilds the digest of ALLOWED_TABLES from the database and publishes it to
+Redis, so every worker picks it up on its next miss. The API warms it at
+startup when SCHEMA_DIGEST_WARM_ON_STARTUP is enabled; run by hand after a
+schema change:
+
+    python -m app.jobs.build_schema_digest          # rebuild and publish
+    python -m app.jobs.build_schema_digest --print  # also show the digest
+"""
+import argparse
+import asyncio
+import logging
+
+from llm.schema_digest import aget_schema_digest
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_schema_digest() -> None:
+    """Load or build the digest in the background so the first chat doesn't pay for it."""
+    try:
+        digest = await aget_schema_digest()
+        logger.info(f"Schema digest ready ({len(digest)} chars)")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # Chat builds it on first use instead
+        logger.warning(f"Schema digest warm-up failed: {e}")
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Rebuild the NL->SQL schema digest")
+    parser.add_argument("--print", action="store_true", dest="show", help="print the digest")
+    args = parser.parse_args()
+
+    setup_logging()
+    digest = asyncio.run(aget_schema_digest(refresh=True))
+    if args.show:
+        print(digest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cache warmer for the executive dashboard.
+
+Precomputes the dashboard tiles for every business unit across the current
+and previous month/year so the first visitor of the day hits a warm cache.
+Runs inside the API (startup + schedule, see CACHE_WARM_* settings) or as a
+one-off CLI:
+
+    python -m app.jobs.cache_warmer            # warm once
+    python -m app.jobs.cache_warmer --loop     # keep warming on the schedule
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from app.db.admission import HEAVY
+from app.db.session import admitted_session, db_lane
+from app.repositories.units_repository import UnitsRepository
+from app.utils import cache
+from app.api.v1.endpoints import analytics, forecast, regional, sales
+
+logger = logging.getLogger(__name__)
+
+_WARM_LOCK_KEY = "cache:warm:lock"
+
+
+def _recent_periods(today: Optional[date] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Current and previous month/year in the shapes the dashboard requests them."""
+    today = today or date.today()
+    prev_year, prev_month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+    months = [(today.year, today.month), (prev_year, prev_month)]
+    return {
+        "month": [{"year": y, "month": m} for y, m in months],
+        "year": [{"year": today.year}, {"year": today.year - 1}],
+        "month_str": [{"month": f"{y}-{m:02d}"} for y, m in months],
+    }
+
+
+def _warm_targets(periods: Dict[str, List[Dict[str, Any]]]) -> List[tuple]:
+    """(route, endpoint, parameter sets per unit) for every dashboard tile."""
+    default = [{}]
+    month_year = default + periods["month"] + periods["year"]
+    return [
+        ("/sales/ytd", sales.get_ytd_sales, month_year),
+        ("/sales/mtd", sales.get_mtd_stats, month_year),
+        ("/sales/metrics", sales.get_sales_metrics, month_year),
+        ("/regional/territories", regional.get_top_territories, month_year),
+        ("/regional/regions", regional.get_regions, month_year),
+        ("/regional/areas", regional.get_areas, month_year),
+        ("/analytics/top-customers", analytics.get_top_customers, month_year),
+        ("/analytics/concentration-risk", analytics.get_concentration_risk, default + periods["month_str"]),
+        ("/forecast", forecast.get_forecast, default),
+    ]
+
+
+async def _get_unit_ids() -> List[Optional[str]]:
+    async with admitted_session() as session:
+        units = await UnitsRepository(session).get_all_units()
+    # None = the all-units view the dashboard shows before a unit is picked
+    return [None] + [unit["unit_id"] for unit in units]
+
+
+async def warm_cache(horizon: float = 0, unit_ids: Optional[List[Optional[str]]] = None) -> Dict[str, float]:
+    """
+    Precompute every dashboard tile for every unit.
+
+    Args:
+        horizon: Skip entries that stay fresh for at least this many seconds
+        unit_ids: Units to warm (default: all units from UnitsRepository)
+
+    Returns:
+        Seconds spent per route
+    """
+    # Warming is background work: yield the pool to live dashboard reads
+    lane_token = db_lane.set(HEAVY)
+    try:
+        return await _warm_all(horizon, unit_ids)
+    finally:
+        db_lane.reset(lane_token)
+
+
+async def _warm_all(horizon: float, unit_ids: Optional[List[Optional[str]]]) -> Dict[str, float]:
+    if unit_ids is None:
+        unit_ids = await _get_unit_ids()
+
+    durations = {}
+    for route, endpoint, param_sets in _warm_targets(_recent_periods()):
+        started = time.perf_counter()
+        refreshed = failed = 0
+        for unit_id in unit_ids:
+            for params in param_sets:
+                try:
+                    if await endpoint.refresh({"unit_id": unit_id, **params}, horizon=horizon):
+                        refreshed += 1
+                except Exception as e:
+                    failed += 1
+                    logger.warning(f"Cache warm failed for {route} unit={unit_id} {params}: {e}")
+        durations[route] = time.perf_counter() - started
+        logger.info(
+            f"Cache warm {route}: {refreshed} refreshed, {failed} failed "
+            f"in {durations[route]:.2f}s"
+        )
+    logger.info(f"Cache warm finished in {sum(durations.values()):.2f}s for {len(unit_ids)} units")
+    return durations
+
+
+async def _claim_cycle(interval: float) -> bool:
+    """Let only one worker warm per cycle. Redis errors fall back to warming."""
+    try:
+        return bool(await cache.redis_client.set(_WARM_LOCK_KEY, "1", nx=True, ex=max(int(interval), 1)))
+    except Exception as e:
+        logger.warning(f"Cache warm lock failed: {e}")
+        return True
+
+
+async def run_warm_loop(interval: Optional[float] = None) -> None:
+    """Warm now and then every ``interval`` seconds (0 = warm once)."""
+    interval = settings.CACHE_WARM_INTERVAL_SECONDS if interval is None else interval
+    while True:
+        if await _claim_cycle(interval or settings.CACHE_LOCK_TIMEOUT_SECONDS):
+            try:
+                # Refresh entries that would expire before the next cycle
+                await warm_cache(horizon=interval)
+            except Exception as e:
+                logger.error(f"Cache warm cycle failed: {e}")
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Pre-warm the dashboard response cache")
+    parser.add_argument("--loop", action="store_true", help="keep warming every CACHE_WARM_INTERVAL_SECONDS")
+    parser.add_argument("--unit", action="append", dest="units", help="only warm this unit (repeatable)")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.loop:
+        asyncio.run(run_warm_loop())
+    else:
+        asyncio.run(warm_cache(unit_ids=args.units))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Incremental refresh of the daily tbldeliveryinfo rollup.
+
+Recomputes the days after the rollup's high-water mark (minus
+ROLLUP_LOOKBACK_DAYS for late-arriving rows). Runs inside the API when
+USE_DAILY_ROLLUP is enabled, or from cron:
+
+    python -m app.jobs.refresh_daily_rollup          # incremental
+    python -m app.jobs.refresh_daily_rollup --full   # rebuild everything
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from app.db.admission import HEAVY
+from app.db.session import admitted_session, ensure_index_concurrently
+from app.repositories.rollup_repository import SOURCE_DATE_INDEX, RollupRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_daily_rollup(full: bool = False, lookback_days: Optional[int] = None) -> Dict[str, Any]:
+    """Create the rollup schema if needed and refresh it in one transaction."""
+    lookback_days = settings.ROLLUP_LOOKBACK_DAYS if lookback_days is None else lookback_days
+    started = time.perf_counter()
+    # Built concurrently so tbldeliveryinfo keeps taking writes meanwhile
+    if await ensure_index_concurrently(*SOURCE_DATE_INDEX):
+        logger.info(f"Built index {SOURCE_DATE_INDEX[0]}")
+    async with admitted_session(HEAVY) as session:
+        async with session.begin():
+            repo = RollupRepository(session)
+            await repo.ensure_schema()
+            result = await repo.refresh(lookback_days=lookback_days, full=full)
+    logger.info(
+        f"Daily rollup refreshed from {result['start_date'] or 'the beginning'} "
+        f"to {result['covered_until']}: {result['rows_written']} rows "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return result
+
+
+async def run_rollup_loop(interval: Optional[float] = None) -> None:
+    """Refresh now and then every ``interval`` seconds."""
+    interval = settings.ROLLUP_REFRESH_INTERVAL_SECONDS if interval is None else interval
+    while True:
+        try:
+            await refresh_daily_rollup()
+        except Exception as e:
+            logger.error(f"Daily rollup refresh failed: {e}")
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Refresh the daily tbldeliveryinfo rollup")
+    parser.add_argument("--full", action="store_true", help="rebuild the whole rollup")
+    parser.add_argument("--lookback-days", type=int, default=None, help="already rolled-up days to recompute")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(refresh_daily_rollup(full=args.full, lookback_days=args.lookback_days))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Incremental refresh of the persisted per-customer RFM state.
+
+Adds the deliveries between the state's high-water mark and
+RFM_STATE_SETTLE_DAYS before today onto the per-(unit, customer, month)
+rows. Runs inside the API when USE_RFM_STATE is enabled, or from cron:
+
+    python -m app.jobs.refresh_rfm_state          # incremental
+    python -m app.jobs.refresh_rfm_state --full   # rebuild everything
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from app.db.admission import HEAVY
+from app.db.session import admitted_session
+from app.repositories.rfm_state_repository import RFMStateRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def refresh_rfm_state(full: bool = False, settle_days: Optional[int] = None) -> Dict[str, Any]:
+    """Create the RFM state schema if needed and refresh it in one transaction."""
+    settle_days = settings.RFM_STATE_SETTLE_DAYS if settle_days is None else settle_days
+    started = time.perf_counter()
+    async with admitted_session(HEAVY) as session:
+        async with session.begin():
+            repo = RFMStateRepository(session)
+            await repo.ensure_schema()
+            result = await repo.refresh(settle_days=settle_days, full=full)
+    logger.info(
+        f"RFM state refreshed from {result['start_date'] or 'the beginning'} "
+        f"to {result['covered_until']}: {result['rows_written']} rows "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return result
+
+
+async def run_rfm_state_loop(interval: Optional[float] = None) -> None:
+    """Refresh now and then every ``interval`` seconds."""
+    interval = settings.RFM_STATE_REFRESH_INTERVAL_SECONDS if interval is None else interval
+    while True:
+        try:
+            await refresh_rfm_state()
+        except Exception as e:
+            logger.error(f"RFM state refresh failed: {e}")
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+
+
+def main() -> None:
+    from core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description="Refresh the persisted per-customer RFM state")
+    parser.add_argument("--full", action="store_true", help="rebuild the whole state")
+    parser.add_argument("--settle-days", type=int, default=None, help="recent days left to live reads")
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(refresh_rfm_state(full=args.full, settle_days=args.settle_days))
+
+
+if __name__ == "__main__":
+    main()
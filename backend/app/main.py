@@ -28,6 +28,44 @@ app.add_middleware(
 from app.api.v1.api import api_router
 app.include_router(api_router, prefix="/api/v1")
 
+import asyncio
+from core.config import settings
+
+_background_tasks = []
+
+
+@app.on_event("startup")
+async def start_cache_warmer():
+    if settings.CACHE_WARM_ENABLED:
+        from app.jobs.cache_warmer import run_warm_loop
+        _background_tasks.append(asyncio.create_task(run_warm_loop()))
+
+
+@app.on_event("startup")
+async def start_rollup_refresh():
+    if settings.USE_DAILY_ROLLUP:
+        from app.jobs.refresh_daily_rollup import run_rollup_loop
+        _background_tasks.append(asyncio.create_task(run_rollup_loop()))
+
+
+@app.on_event("startup")
+async def start_rfm_state_refresh():
+    if settings.USE_RFM_STATE:
+        from app.jobs.refresh_rfm_state import run_rfm_state_loop
+        _background_tasks.append(asyncio.create_task(run_rfm_state_loop()))
+
+
+@app.on_event("startup")
+async def warm_schema_digest():
+    if settings.SCHEMA_DIGEST_WARM_ON_STARTUP:
+        from app.jobs.build_schema_digest import warm_schema_digest
+        _background_tasks.append(asyncio.create_task(warm_schema_digest()))
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in _background_tasks:
+        task.cancel()
 
 
 @app.exception_handler(AppException)
@@ -38,5 +76,6 @@ async def app_exception_handler(request: Request, exc: AppException):
             "status": "error",
             "message": exc.message,
             "path": str(request.url)
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
\ No newline at end of file
@@ -1,19 +1,22 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from app.db.utils import get_uom_conversion_sql
+from app.db.utils import get_delivery_source_sql
+from app.repositories.period_repository import PeriodComparisonRepository, PeriodWindow
 from app.utils.exceptions import DatabaseError
 
 class AnalyticsRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.periods = PeriodComparisonRepository(db)
 
     async def get_available_months(self, unit_id: Optional[int] = None) -> List[str]:
         try:
+            source = get_delivery_source_sql()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
             query = text(f"""
                 SELECT DISTINCT TO_CHAR(delivery_date, 'YYYY-MM') as month
-                FROM tbldeliveryinfo
+                FROM {source}
                 WHERE delivery_date IS NOT NULL
                 {unit_clause}
                 ORDER BY month DESC
@@ -32,7 +35,7 @@ class AnalyticsRepository:
         unit_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
             
             # Using same CTE logic as legac
@@ -40,24 +43,16 @@ class AnalyticsRepository:
                 WITH cust_sales AS (
                     SELECT
                         customer_name,
-                        CASE
-                            WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                            WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                            ELSE base_uom
-                        END AS uom_shown,
-                        SUM({uom_sql}) AS total_sales,
-                        COUNT(*) AS order_count
-                    FROM tbldeliveryinfo
+                        uom_shown,
+                        SUM(qty_mt) AS total_sales,
+                        SUM(order_count) AS order_count
+                    FROM {source}
                     WHERE delivery_date >= :start_date
                       AND delivery_date < :end_date
                       AND delivery_date IS NOT NULL
                       {unit_clause}
                     GROUP BY customer_name,
-                        CASE
-                            WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                            WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                            ELSE base_uom
-                        END
+                        uom_shown
                 )
                 SELECT
                     customer_name,
@@ -97,7 +92,7 @@ class AnalyticsRepository:
         unit_id: Optional[int] = None
     ) -> List[Any]:
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
             
             query = text(f"""
@@ -108,12 +103,12 @@ class AnalyticsRepository:
                         WHEN LOWER("credit_facility_type") = 'credit' THEN 'Credit'
                         ELSE 'Other'
                     END AS pay_type,
-                    COUNT(*) as order_count,
-                    ROUND(CAST(SUM({uom_sql}) AS NUMERIC), 2) as total_revenue
-                FROM tbldeliveryinfo
+                    SUM(qty_order_count) as order_count,
+                    ROUND(CAST(SUM(qty_mt) AS NUMERIC), 2) as total_revenue
+                FROM {source}
                 WHERE "delivery_date" >= :start_date
                   AND "delivery_date" < :end_date
-                  AND "delivery_qty" IS NOT NULL
+                  AND qty_order_count > 0
                   {unit_clause}
                 GROUP BY pay_type
             """)
@@ -128,73 +123,172 @@ class AnalyticsRepository:
         except Exception as e:
             raise DatabaseError(f"Error fetching credit ratio: {str(e)}")
 
-    async def get_concentration_data(
+    async def get_latest_delivery_date(self, unit_id: Optional[int] = None) -> Optional[Any]:
+        """Most recent delivery_date; MAX() is answered from the date index."""
+        try:
+            unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
+            query = text(f"""
+                SELECT MAX(delivery_date) AS latest
+                FROM tbldeliveryinfo
+                WHERE delivery_date IS NOT NULL
+                  {unit_clause}
+            """)
+            params = {"unit_id": unit_id} if unit_id is not None else {}
+            result = await self.db.execute(query, params)
+            return result.scalar()
+        except Exception as e:
+            raise DatabaseError(f"Error fetching latest delivery date: {str(e)}")
+
+    async def get_credit_by_channel(
         self,
         start_date: Any,
         end_date: Any,
         unit_id: Optional[int] = None
-    ) -> Dict[str, Any]:
+    ) -> List[Any]:
+        """
+        Revenue per (pay type, channel) with the pay-type, channel and grand
+        totals computed by window functions over the same aggregate.
+        """
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
-            
-            # 1. Total Qty
-            q_total = text(f"""
-                SELECT SUM({uom_sql}) AS total_qty
-                FROM tbldeliveryinfo
-                WHERE delivery_date >= :start_date
-                  AND delivery_date < :end_date
-                  AND delivery_qty IS NOT NULL
-                  {unit_clause}
-            """)
-            
-            # 2. Top 10 with Window Func
-            q_top10 = text(f"""
-                SELECT 
-                    customer_name,
-                    SUM({uom_sql}) as customer_qty,
-                    ROUND(
-                        SUM({uom_sql}) * 100.0 / NULLIF(SUM(SUM({uom_sql})) OVER(), 0),
-                        2
-                    ) as qty_share_pct
-                FROM tbldeliveryinfo
-                WHERE customer_name IS NOT NULL 
-                  AND delivery_date >= :start_date
-                  AND delivery_date < :end_date
-                  {unit_clause}
-                GROUP BY customer_name
-                ORDER BY customer_qty DESC
-                LIMIT 10
+
+            query = text(f"""
+                WITH agg AS (
+                    SELECT
+                        CASE
+                            WHEN LOWER("credit_facility_type") = 'cash' THEN 'Cash'
+                            WHEN LOWER("credit_facility_type") = 'both' THEN 'Both'
+                            WHEN LOWER("credit_facility_type") = 'credit' THEN 'Credit'
+                            ELSE 'Other'
+                        END AS pay_type,
+                        channel_name,
+                        SUM(invoice_amount) AS channel_sales
+                    FROM {source}
+                    WHERE delivery_date >= :start_date
+                      AND delivery_date < :end_date
+                      AND channel_name IS NOT NULL
+                      AND invoice_amount IS NOT NULL
+                      {unit_clause}
+                    GROUP BY pay_type, channel_name
+                )
+                SELECT
+                    pay_type,
+                    channel_name,
+                    ROUND(CAST(channel_sales AS NUMERIC), 2) AS channel_sales,
+                    ROUND(CAST(
+                        channel_sales * 100.0 / NULLIF(SUM(channel_sales) OVER (PARTITION BY pay_type), 0)
+                    AS NUMERIC), 2) AS channel_pct_within_pay_type,
+                    SUM(channel_sales) OVER (PARTITION BY pay_type) AS pay_type_total,
+                    SUM(channel_sales) OVER (PARTITION BY channel_name) AS channel_total,
+                    SUM(channel_sales) OVER () AS grand_total
+                FROM agg
+                ORDER BY pay_type, channel_pct_within_pay_type DESC
             """)
-            
+
             params = {"start_date": start_date, "end_date": end_date}
             if unit_id is not None:
                 params["unit_id"] = unit_id
-            
-            # Execute
-            res_total = await self.db.execute(q_total, params)
-            total_row = res_total.fetchone()
-            total_qty = float(total_row.total_qty or 0) if total_row else 0.0
-            
-            res_top = await self.db.execute(q_top10, params)
-            top_rows = res_top.fetchall()
-            
-            top_customers = []
-            top10_sum = 0.0
-            for row in top_rows:
-                qty = float(row.customer_qty or 0)
-                top10_sum += qty
-                top_customers.append({
-                     "name": row.customer_name,
-                     "quantity": qty,
-                     "percentage": float(row.qty_share_pct or 0)
-                })
-                
+
+            result = await self.db.execute(query, params)
+            return result.fetchall()
+        except Exception as e:
+            raise DatabaseError(f"Error fetching credit sales by channel: {str(e)}")
+
+    async def get_concentration_data(
+        self,
+        start_date: Any,
+        end_date: Any,
+        unit_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Total quantity and top 10 customers' share from one scan."""
+        try:
+            comparison = await self.periods.compare(
+                [PeriodWindow("current", start_date, end_date)],
+                group_by={"customer_name": "customer_name"},
+                unit_id=unit_id,
+                where="qty_order_count > 0"
+            )
+            customers = [
+                (group["key"]["customer_name"], group["windows"]["current"]["quantity"])
+                for group in comparison["groups"]
+            ]
+            return self._summarize_concentration(customers, comparison["totals"]["current"]["quantity"])
+
+        except Exception as e:
+            raise DatabaseError(f"Error fetching concentration data: {str(e)}")
+
+    async def get_customer_overview(
+        self,
+        start_date: Any,
+        end_date: Any,
+        unit_id: Optional[int] = None,
+        top_n: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Top customers and concentration risk from one shared per-customer scan.
+
+        Returns {"top_customers": [...], "concentration": {...}} in the shapes
+        of get_top_customers and get_concentration_data.
+        """
+        try:
+            comparison = await self.periods.compare(
+                [PeriodWindow("current", start_date, end_date)],
+                group_by={"customer_name": "customer_name", "uom_shown": "uom_shown"},
+                unit_id=unit_id
+            )
+            total_qty = comparison["totals"]["current"]["quantity"]
+            groups = sorted(
+                comparison["groups"],
+                key=lambda g: g["windows"]["current"]["quantity"],
+                reverse=True
+            )
+
+            top_customers = [
+                {
+                    "name": group["key"]["customer_name"],
+                    "uom": group["key"]["uom_shown"],
+                    "quantity": round(group["windows"]["current"]["quantity"], 2),
+                    "orders": group["windows"]["current"]["orders"],
+                    "percentage": round(group["windows"]["current"]["quantity"] * 100.0 / total_qty, 2) if total_qty else 0.0
+                }
+                for group in groups[:top_n]
+            ]
+
+            # Concentration ranks customers across UOMs and ignores rows
+            # without a quantity, which add nothing here
+            by_customer: Dict[str, float] = {}
+            for group in groups:
+                name = group["key"]["customer_name"]
+                by_customer[name] = by_customer.get(name, 0.0) + group["windows"]["current"]["quantity"]
+            customers = [(name, qty) for name, qty in by_customer.items() if qty]
+
             return {
-                "total_quantity": total_qty,
-                "top_10_quantity": top10_sum,
-                "top_10_customers": top_customers
+                "top_customers": top_customers,
+                "concentration": self._summarize_concentration(customers, total_qty),
             }
-            
         except Exception as e:
-            raise DatabaseError(f"Error fetching concentration data: {str(e)}")
+            raise DatabaseError(f"Error fetching customer overview: {str(e)}")
+
+    @staticmethod
+    def _summarize_concentration(customers: List[Tuple[Optional[str], float]], total_qty: float) -> Dict[str, Any]:
+        """Top 10 customers' share; percentages are of named customers' volume."""
+        customers = [(name, qty) for name, qty in customers if name is not None]
+        named_total = sum(qty for _, qty in customers)
+        customers.sort(key=lambda c: c[1], reverse=True)
+
+        top_customers = []
+        top10_sum = 0.0
+        for name, qty in customers[:10]:
+            top10_sum += qty
+            top_customers.append({
+                 "name": name,
+                 "quantity": qty,
+                 "percentage": round(qty * 100.0 / named_total, 2) if named_total else 0.0
+            })
+
+        return {
+            "total_quantity": total_qty,
+            "top_10_quantity": top10_sum,
+            "top_10_customers": top_customers
+        }
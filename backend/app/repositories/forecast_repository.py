@@ -3,145 +3,178 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.utils.exceptions import DatabaseError
 
+# Forecast dimension -> (monthly table, name column)
+FORECAST_DIMENSIONS = {
+    "item": ("AIL_Monthly_Total_Item", "Item_Name"),
+    "territory": ("AIL_Monthly_Total_Final_Territory", "Territory"),
+}
+
 class ForecastRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def get_global_forecast(self, unit_id: Optional[str] = None) -> Dict[str, List]:
+        """
+        Monthly actual and forecast totals from one scan.
+
+        Returns:
+            {"actuals": [(month, qty)], "forecast": [(month, qty)]}, months ascending
+        """
         try:
             unit_filter = "AND \"Unit_Id\" = :unit_id" if unit_id else ""
             params = {"unit_id": unit_id} if unit_id else {}
 
-            # Global Actuals (Historical)
-            q_act = text(f"""
-                SELECT 
+            q = text(f"""
+                SELECT
                     TO_CHAR("Date", 'YYYY-MM') AS month,
-                    SUM("numDeliveryQtyMT") AS total_qty
+                    SUM("numDeliveryQtyMT") FILTER (WHERE "Type" != 'Forecasted') AS actual_qty,
+                    SUM("numDeliveryQtyMT") FILTER (WHERE "Type" = 'Forecasted') AS forecast_qty,
+                    COUNT(*) FILTER (WHERE "Type" != 'Forecasted') AS actual_rows,
+                    COUNT(*) FILTER (WHERE "Type" = 'Forecasted') AS forecast_rows
                 FROM "AIL_Monthly_Total_Forecast"
-                WHERE 1=1
-                  {unit_filter}
-                  AND "Type" != 'Forecasted'
-                  AND "Date" >= '2022-01-01'
+                WHERE "Date" >= '2022-01-01'
                   AND "Date" <= '2026-12-31'
                   AND "Date" IS NOT NULL
-                GROUP BY month
-                ORDER BY month ASC
-            """)
-
-            # Global Forecast
-            q_for = text(f"""
-                SELECT 
-                    TO_CHAR("Date", 'YYYY-MM') AS month,
-                    SUM("numDeliveryQtyMT") AS total_qty
-                FROM "AIL_Monthly_Total_Forecast"
-                WHERE "Type" = 'Forecasted'
                   {unit_filter}
-                  AND "Date" >= '2022-01-01'
-                  AND "Date" <= '2026-12-31'
-                  AND "Date" IS NOT NULL
                 GROUP BY month
                 ORDER BY month ASC
             """)
 
-            res_act = await self.db.execute(q_act, params)
-            res_for = await self.db.execute(q_for, params)
-            
+            result = await self.db.execute(q, params)
+            rows = result.fetchall()
             return {
-                "actuals": res_act.fetchall(),
-                "forecast": res_for.fetchall()
+                "actuals": [(row.month, row.actual_qty) for row in rows if row.actual_rows],
+                "forecast": [(row.month, row.forecast_qty) for row in rows if row.forecast_rows]
             }
         except Exception as e:
             raise DatabaseError(f"Error fetching global forecast: {str(e)}")
 
-    async def get_top_items(self, unit_id: Optional[str] = None, limit: int = 100) -> List[str]:
+    async def get_top_series(self, dimension: str, unit_id: Optional[str] = None, limit: int = 50):
+        """
+        Monthly series of the top ``limit`` distinct names of a dimension.
+
+        Names are ranked by their largest forecasted month (the order the
+        old per-row ranking produced) with a window function, so exactly
+        ``limit`` distinct names come back when that many exist, together
+        with their series in the same query.
+
+        Returns:
+            Rows of (rank, name, type, month, qty) ordered by rank then month;
+            type is 'Historical' for months before the current one
+        """
+        table, column = FORECAST_DIMENSIONS[dimension]
         try:
             unit_filter = "AND \"Unit_Id\" = :unit_id" if unit_id else ""
+            series_unit_filter = "AND t.\"Unit_Id\" = :unit_id" if unit_id else ""
             params = {"unit_id": unit_id} if unit_id else {}
-            
+
             q = text(f"""
-                SELECT "Item_Name" FROM "AIL_Monthly_Total_Item" 
-                WHERE "Type" = 'Forecasted'
-                {unit_filter}
-                ORDER BY "numDeliveryQtyMT" DESC LIMIT :limit
+                WITH ranked AS (
+                    SELECT
+                        "{column}" AS name,
+                        ROW_NUMBER() OVER (
+                            ORDER BY MAX("numDeliveryQtyMT") DESC NULLS LAST, "{column}"
+                        ) AS rank
+                    FROM "{table}"
+                    WHERE "Type" = 'Forecasted'
+                      AND "{column}" IS NOT NULL
+                      {unit_filter}
+                    GROUP BY "{column}"
+                )
+                SELECT
+                    ranked.rank,
+                    ranked.name,
+                    CASE WHEN t."Date" < date_trunc('month', CURRENT_DATE) THEN 'Historical' ELSE t."Type" END AS "Type",
+                    TO_CHAR(t."Date", 'YYYY-MM') AS month,
+                    SUM(t."numDeliveryQtyMT") AS qty
+                FROM "{table}" t
+                JOIN ranked ON ranked.name = t."{column}" AND ranked.rank <= :limit
+                WHERE t."Date" >= '2022-01-01'
+                  AND t."Date" <= '2026-12-31'
+                  AND t."Date" IS NOT NULL
+                  {series_unit_filter}
+                GROUP BY 1, 2, 3, 4
+                ORDER BY 1, 4
             """)
-            
+
             result = await self.db.execute(q, {**params, "limit": limit})
-            rows = result.fetchall()
-            # Deduplicate
-            return list(dict.fromkeys([row[0] for row in rows]))
+            return result.fetchall()
         except Exception as e:
-            raise DatabaseError(f"Error fetching top items: {str(e)}")
+            raise DatabaseError(f"Error fetching top {dimension} forecast series: {str(e)}")
 
-    async def get_item_data_bulk(self, item_names: List[str], unit_id: Optional[str] = None):
-        if not item_names:
-            return []
-            
+    async def get_top_entities(self, dimension: str, unit_id: Optional[str] = None, limit: int = 50):
+        """
+        Top ``limit`` names of a dimension with their totals, without series.
+
+        Ranked like get_top_series.
+
+        Returns:
+            Rows of (rank, name, actual_qty, forecast_qty, months): quantities
+            before and from the current month within the chart range
+        """
+        table, column = FORECAST_DIMENSIONS[dimension]
         try:
             unit_filter = "AND \"Unit_Id\" = :unit_id" if unit_id else ""
             params = {"unit_id": unit_id} if unit_id else {}
-            
-            # safe expansion:
+            in_range = "\"Date\" >= '2022-01-01' AND \"Date\" <= '2026-12-31'"
+
             q = text(f"""
-                SELECT "Item_Name", 
-                       CASE WHEN "Date" < date_trunc('month', CURRENT_DATE) THEN 'Historical' ELSE "Type" END as "Type",
-                       TO_CHAR("Date", 'YYYY-MM') as month, 
-                       SUM("numDeliveryQtyMT") as qty
-                FROM "AIL_Monthly_Total_Item" 
-                WHERE "Item_Name" = ANY(:names)
-                {unit_filter}
-                AND "Date" >= '2022-01-01'
-                AND "Date" <= '2026-12-31'
-                AND "Date" IS NOT NULL
-                GROUP BY 1, 2, 3
-                ORDER BY 3 ASC
+                SELECT
+                    ROW_NUMBER() OVER (
+                        ORDER BY MAX("numDeliveryQtyMT") FILTER (WHERE "Type" = 'Forecasted') DESC NULLS LAST, "{column}"
+                    ) AS rank,
+                    "{column}" AS name,
+                    SUM("numDeliveryQtyMT") FILTER (
+                        WHERE {in_range} AND "Date" < date_trunc('month', CURRENT_DATE)
+                    ) AS actual_qty,
+                    SUM("numDeliveryQtyMT") FILTER (
+                        WHERE {in_range} AND "Date" >= date_trunc('month', CURRENT_DATE)
+                    ) AS forecast_qty,
+                    COUNT(DISTINCT date_trunc('month', "Date")) FILTER (WHERE {in_range}) AS months
+                FROM "{table}"
+                WHERE "{column}" IS NOT NULL
+                  {unit_filter}
+                GROUP BY "{column}"
+                HAVING COUNT(*) FILTER (WHERE "Type" = 'Forecasted') > 0
+                ORDER BY rank
+                LIMIT :limit
             """)
-            
-            result = await self.db.execute(q, {**params, "names": item_names})
+
+            result = await self.db.execute(q, {**params, "limit": limit})
             return result.fetchall()
         except Exception as e:
-            raise DatabaseError(f"Error fetching item data bulk: {str(e)}")
+            raise DatabaseError(f"Error fetching top {dimension} forecasts: {str(e)}")
 
-    async def get_top_territories(self, unit_id: Optional[str] = None, limit: int = 100) -> List[str]:
-         # Similar to items
-         try:
-            unit_filter = "AND \"Unit_Id\" = :unit_id" if unit_id else ""
-            params = {"unit_id": unit_id} if unit_id else {}
-            
-            q = text(f"""
-                SELECT "Territory" FROM "AIL_Monthly_Total_Final_Territory"
-                WHERE "Type" = 'Forecasted'
-                {unit_filter}
-                ORDER BY "numDeliveryQtyMT" DESC LIMIT :limit
-            """)
-            
-            result = await self.db.execute(q, {**params, "limit": limit})
-            rows = result.fetchall()
-            return list(dict.fromkeys([row[0] for row in rows]))
-         except Exception:
-             return []
+    async def get_entity_series(self, dimension: str, name: str, unit_id: Optional[str] = None):
+        """
+        Monthly series of one name of a dimension.
 
-    async def get_territory_data_bulk(self, terr_names: List[str], unit_id: Optional[str] = None):
-        if not terr_names: return []
+        Returns:
+            Rows shaped like get_top_series: (rank, name, type, month, qty), rank 1
+        """
+        table, column = FORECAST_DIMENSIONS[dimension]
         try:
             unit_filter = "AND \"Unit_Id\" = :unit_id" if unit_id else ""
             params = {"unit_id": unit_id} if unit_id else {}
-            
+
             q = text(f"""
-                SELECT "Territory", 
-                       CASE WHEN "Date" < date_trunc('month', CURRENT_DATE) THEN 'Historical' ELSE "Type" END as "Type",
-                       TO_CHAR("Date", 'YYYY-MM') as month, 
-                       SUM("numDeliveryQtyMT") as qty
-                FROM "AIL_Monthly_Total_Final_Territory"
-                WHERE "Territory" = ANY(:names)
-                {unit_filter}
-                AND "Date" >= '2022-01-01'
-                AND "Date" <= '2026-12-31'
-                AND "Date" IS NOT NULL
-                GROUP BY 1, 2, 3
-                ORDER BY 3 ASC
+                SELECT
+                    1 AS rank,
+                    "{column}" AS name,
+                    CASE WHEN "Date" < date_trunc('month', CURRENT_DATE) THEN 'Historical' ELSE "Type" END AS "Type",
+                    TO_CHAR("Date", 'YYYY-MM') AS month,
+                    SUM("numDeliveryQtyMT") AS qty
+                FROM "{table}"
+                WHERE "{column}" = :name
+                  AND "Date" >= '2022-01-01'
+                  AND "Date" <= '2026-12-31'
+                  AND "Date" IS NOT NULL
+                  {unit_filter}
+                GROUP BY 1, 2, 3, 4
+                ORDER BY 4
             """)
-            
-            result = await self.db.execute(q, {**params, "names": terr_names})
+
+            result = await self.db.execute(q, {**params, "name": name})
             return result.fetchall()
-        except Exception:
-            return []
+        except Exception as e:
+            raise DatabaseError(f"Error fetching {dimension} forecast series: {str(e)}")
@@ -0,0 +1,164 @@
+from typing import Dict, Any, List, Optional, Sequence
+from dataclasses import dataclass
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.utils import get_delivery_source_sql, get_uom_display
+from app.utils.exceptions import DatabaseError
+
+
+@dataclass(frozen=True)
+class PeriodWindow:
+    """Named half-open date window [start, end)."""
+    name: str
+    start: date
+    end: date
+
+
+class PeriodComparisonRepository:
+    """
+    Metrics for several date windows from a single scan of the delivery source.
+
+    Each window becomes a set of FILTER-ed aggregates over the same rows, so
+    current vs previous month vs same period last year costs one query and
+    one pass instead of one per window.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def compare(
+        self,
+        windows: Sequence[PeriodWindow],
+        group_by: Optional[Dict[str, str]] = None,
+        unit_id: Optional[int] = None,
+        where: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Args:
+            windows: Named date windows to aggregate
+            group_by: Output column -> SQL expression to group by (optional)
+            unit_id: Optional business unit filter
+            where: Extra SQL predicate applied to every window
+
+        Returns:
+            {"totals": {window: metrics}, "groups": [{"key": {...}, "windows": {window: metrics}}]}
+            where metrics = {"quantity": float, "orders": int, "uom": str | None}.
+            Groups are returned in no particular order.
+        """
+        groupings = {"groups": group_by} if group_by else {}
+        comparison = await self.compare_sets(windows, groupings, unit_id, where)
+        return {"totals": comparison["totals"], "groups": comparison["groups"].get("groups", [])}
+
+    async def compare_sets(
+        self,
+        windows: Sequence[PeriodWindow],
+        groupings: Dict[str, Dict[str, str]],
+        unit_id: Optional[int] = None,
+        where: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Like compare(), but for several independent groupings at once.
+
+        All groupings share the same scan through GROUPING SETS, so e.g.
+        per-region, per-area and per-territory figures cost one query.
+
+        Args:
+            groupings: Grouping name -> {output column: SQL expression}
+
+        Returns:
+            {"totals": {window: metrics}, "groups": {grouping: [{"key": {...}, "windows": {...}}]}}
+        """
+        try:
+            uom_display_sql = get_uom_display()
+            params: Dict[str, Any] = {}
+
+            # Each distinct expression is selected once and shared between groupings
+            expressions: List[str] = []
+            for group_by in groupings.values():
+                for expr in group_by.values():
+                    if expr not in expressions:
+                        expressions.append(expr)
+
+            select_parts = [f"{expr} AS k{i}" for i, expr in enumerate(expressions)]
+            if expressions:
+                # Bit set = expression rolled up; tells the grouping sets (and
+                # the grand total) apart even when a key is NULL
+                select_parts.append(f"GROUPING({', '.join(expressions)}) AS grouping_id")
+
+            window_conditions = []
+            for i, window in enumerate(windows):
+                condition = f"(delivery_date >= :w{i}_start AND delivery_date < :w{i}_end)"
+                params[f"w{i}_start"] = window.start
+                params[f"w{i}_end"] = window.end
+                window_conditions.append(condition)
+                select_parts.extend([
+                    f"SUM(qty_mt) FILTER (WHERE {condition}) AS w{i}_quantity",
+                    f"SUM(order_count) FILTER (WHERE {condition}) AS w{i}_orders",
+                    f"MAX({uom_display_sql}) FILTER (WHERE {condition}) AS w{i}_uom",
+                ])
+
+            unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
+            if unit_id is not None:
+                params["unit_id"] = unit_id
+            extra_clause = f"AND {where}" if where else ""
+
+            # Totals come from the empty grouping set of the same scan
+            group_clause = ""
+            if expressions:
+                sets = [f"({', '.join(group_by.values())})" for group_by in groupings.values()]
+                group_clause = f"GROUP BY GROUPING SETS ({', '.join(sets)}, ())"
+
+            select_list = ",\n                    ".join(select_parts)
+            query = text(f"""
+                SELECT
+                    {select_list}
+                FROM {get_delivery_source_sql()}
+                WHERE ({" OR ".join(window_conditions)})
+                  {unit_clause}
+                  {extra_clause}
+                {group_clause}
+            """)
+
+            result = await self.db.execute(query, params)
+            rows = result.fetchall()
+
+            def metrics(row) -> Dict[str, Dict[str, Any]]:
+                mapping = row._mapping
+                return {
+                    window.name: {
+                        "quantity": float(mapping[f"w{i}_quantity"] or 0),
+                        "orders": int(mapping[f"w{i}_orders"] or 0),
+                        "uom": mapping[f"w{i}_uom"],
+                    }
+                    for i, window in enumerate(windows)
+                }
+
+            def grouping_id(group_by: Dict[str, str]) -> int:
+                # GROUPING() puts its first argument in the most significant bit
+                return sum(
+                    1 << (len(expressions) - 1 - i)
+                    for i, expr in enumerate(expressions)
+                    if expr not in group_by.values()
+                )
+
+            total_id = (1 << len(expressions)) - 1
+            set_ids = {grouping_id(group_by): name for name, group_by in groupings.items()}
+
+            empty = {window.name: {"quantity": 0.0, "orders": 0, "uom": None} for window in windows}
+            comparison: Dict[str, Any] = {"totals": empty, "groups": {name: [] for name in groupings}}
+            for row in rows:
+                if not expressions or row.grouping_id == total_id:
+                    comparison["totals"] = metrics(row)
+                    continue
+                name = set_ids[row.grouping_id]
+                comparison["groups"][name].append({
+                    "key": {
+                        alias: row._mapping[f"k{expressions.index(expr)}"]
+                        for alias, expr in groupings[name].items()
+                    },
+                    "windows": metrics(row),
+                })
+            return comparison
+        except Exception as e:
+            raise DatabaseError(f"Error comparing periods: {str(e)}")
@@ -0,0 +1,198 @@
+from typing import Any, Dict, List, Optional
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.utils import RFM_HISTORY_TABLE, get_delivery_source_sql
+from app.utils.exceptions import DatabaseError
+
+# Segment labels for customers present in only one of two compared months
+NEW_SEGMENT = "New"
+LOST_SEGMENT = "Lost"
+
+
+class RFMHistoryRepository:
+    """
+    Stored monthly RFM segments per unit and customer.
+
+    Each (unit, month) holds the scored population of the RFM window ending
+    with that month, written by app/jobs/build_rfm_history.py, so segment
+    migrations are read from a few indexed rows instead of rescoring.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_schema(self) -> None:
+        """Create the history table and its indexes if missing."""
+        try:
+            statements = [
+                f"""
+                CREATE TABLE IF NOT EXISTS {RFM_HISTORY_TABLE} (
+                    unit_id integer NOT NULL,
+                    month date NOT NULL,
+                    customer_id text NOT NULL,
+                    customer_name text NOT NULL,
+                    recency integer NOT NULL,
+                    frequency bigint NOT NULL,
+                    monetary double precision NOT NULL,
+                    rfm_score double precision NOT NULL,
+                    segment text,
+                    computed_at timestamptz NOT NULL DEFAULT now(),
+                    PRIMARY KEY (unit_id, month, customer_id, customer_name)
+                )
+                """,
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_{RFM_HISTORY_TABLE}_customer
+                ON {RFM_HISTORY_TABLE} (customer_id, unit_id, month)
+                """,
+            ]
+            for statement in statements:
+                await self.db.execute(text(statement))
+        except Exception as e:
+            raise DatabaseError(f"Error creating RFM history schema: {str(e)}")
+
+    async def get_unit_ranges(self) -> Dict[int, Dict[str, date]]:
+        """First and last delivery date per unit."""
+        try:
+            result = await self.db.execute(text(f"""
+                SELECT unit_id, MIN(delivery_date)::date AS first_date, MAX(delivery_date)::date AS last_date
+                FROM {get_delivery_source_sql()}
+                WHERE unit_id IS NOT NULL
+                  AND delivery_date IS NOT NULL
+                GROUP BY unit_id
+                ORDER BY unit_id
+            """))
+            return {
+                int(row.unit_id): {"first_date": row.first_date, "last_date": row.last_date}
+                for row in result.fetchall()
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error fetching unit date ranges: {str(e)}")
+
+    async def get_stored_months(self, unit_id: int) -> List[date]:
+        try:
+            result = await self.db.execute(
+                text(f"SELECT DISTINCT month FROM {RFM_HISTORY_TABLE} WHERE unit_id = :unit_id ORDER BY month"),
+                {"unit_id": unit_id}
+            )
+            return [row.month for row in result.fetchall()]
+        except Exception as e:
+            raise DatabaseError(f"Error fetching RFM history months: {str(e)}")
+
+    async def replace_month(self, unit_id: int, month: date, customers: List[Dict[str, Any]]) -> int:
+        """
+        Store one month's scored customers, replacing any earlier run.
+
+        Args:
+            customers: Scored records from rfm_kernel.score_customers
+        """
+        try:
+            await self.db.execute(
+                text(f"DELETE FROM {RFM_HISTORY_TABLE} WHERE unit_id = :unit_id AND month = :month"),
+                {"unit_id": unit_id, "month": month}
+            )
+            if not customers:
+                return 0
+            await self.db.execute(
+                text(f"""
+                    INSERT INTO {RFM_HISTORY_TABLE} (
+                        unit_id, month, customer_id, customer_name,
+                        recency, frequency, monetary, rfm_score, segment
+                    )
+                    VALUES (
+                        :unit_id, :month, :customer_id, :customer_name,
+                        :recency, :frequency, :monetary, :rfm_score, :segment
+                    )
+                """),
+                [
+                    {
+                        "unit_id": unit_id,
+                        "month": month,
+                        "customer_id": str(customer["customer_id"]),
+                        "customer_name": customer["customer_name"],
+                        "recency": int(customer["Recency"]),
+                        "frequency": int(customer["Frequency"]),
+                        "monetary": float(customer["Monetary"]),
+                        "rfm_score": float(customer["RFM_Score"]),
+                        "segment": customer["Customer_segment"],
+                    }
+                    for customer in customers
+                ]
+            )
+            return len(customers)
+        except Exception as e:
+            raise DatabaseError(f"Error storing RFM history: {str(e)}")
+
+    async def get_transitions(self, unit_id: int, from_month: date, to_month: date) -> List[Any]:
+        """
+        Customer counts per (from segment, to segment) between two months.
+
+        Customers missing from one of the months appear as NEW_SEGMENT or
+        LOST_SEGMENT on that side.
+        """
+        try:
+            result = await self.db.execute(
+                text(f"""
+                    WITH previous AS (
+                        SELECT customer_id, customer_name, segment
+                        FROM {RFM_HISTORY_TABLE}
+                        WHERE unit_id = :unit_id AND month = :from_month
+                    ),
+                    latest AS (
+                        SELECT customer_id, customer_name, segment
+                        FROM {RFM_HISTORY_TABLE}
+                        WHERE unit_id = :unit_id AND month = :to_month
+                    )
+                    SELECT
+                        CASE WHEN previous.customer_id IS NULL THEN :new ELSE previous.segment END AS from_segment,
+                        CASE WHEN latest.customer_id IS NULL THEN :lost ELSE latest.segment END AS to_segment,
+                        COUNT(*) AS customers
+                    FROM previous
+                    FULL OUTER JOIN latest
+                      ON latest.customer_id = previous.customer_id
+                     AND latest.customer_name = previous.customer_name
+                    GROUP BY 1, 2
+                """),
+                {
+                    "unit_id": unit_id,
+                    "from_month": from_month,
+                    "to_month": to_month,
+                    "new": NEW_SEGMENT,
+                    "lost": LOST_SEGMENT,
+                }
+            )
+            return result.fetchall()
+        except Exception as e:
+            raise DatabaseError(f"Error fetching RFM transitions: {str(e)}")
+
+    async def get_customer_history(
+        self,
+        customer_id: str,
+        unit_id: Optional[int] = None,
+        start_month: Optional[date] = None
+    ) -> List[Any]:
+        try:
+            unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
+            month_clause = "AND month >= :start_month" if start_month else ""
+            params: Dict[str, Any] = {"customer_id": customer_id}
+            if unit_id is not None:
+                params["unit_id"] = unit_id
+            if start_month:
+                params["start_month"] = start_month
+
+            result = await self.db.execute(
+                text(f"""
+                    SELECT
+                        unit_id, month, customer_name,
+                        recency, frequency, monetary, rfm_score, segment
+                    FROM {RFM_HISTORY_TABLE}
+                    WHERE customer_id = :customer_id
+                      {unit_clause}
+                      {month_clause}
+                    ORDER BY unit_id, month
+                """),
+                params
+            )
+            return result.fetchall()
+        except Exception as e:
+            raise DatabaseError(f"Error fetching customer RFM history: {str(e)}")
@@ -3,7 +3,8 @@ from datetime import datetime, timedelta
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.utils import get_uom_conversion_sql
+from core.config import settings
+from app.db.utils import ROLLUP_STATE_TABLE, RFM_STATE_NAME, RFM_STATE_TABLE, get_delivery_source_sql
 
 
 class RFMRepository:
@@ -12,14 +13,107 @@ class RFMRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def get_customer_transactions(
+    @staticmethod
+    def uses_state(start_date: Optional[str] = None, end_date: Optional[str] = None) -> bool:
+        """Whether a date range can be served from the monthly RFM state (whole months only)."""
+        if not settings.USE_RFM_STATE:
+            return False
+        if start_date and datetime.fromisoformat(start_date).day != 1:
+            return False
+        if end_date and (datetime.fromisoformat(end_date) + timedelta(days=1)).day != 1:
+            return False
+        return True
+    
+    def _customer_rows_sql(
+        self,
+        unit_id: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> str:
+        """
+        FROM-clause source of per-customer rows: customer_id, customer_name,
+        first_date, last_date, order_count and monetary.
+        
+        With the RFM state enabled, whole-month ranges read the precomputed
+        monthly rows plus only the deliveries after the state's high-water
+        mark; otherwise every delivery in the range is read.
+        """
+        unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
+        date_clauses = []
+        if start_date:
+            date_clauses.append("AND delivery_date >= :start_date")
+        if end_date:
+            date_clauses.append("AND delivery_date <= :end_date")
+        date_clause = " ".join(date_clauses)
+        
+        deliveries = f"""
+            SELECT
+                customer_id,
+                customer_name,
+                delivery_date AS first_date,
+                delivery_date AS last_date,
+                order_count,
+                qty_mt AS monetary
+            FROM {get_delivery_source_sql()}
+            WHERE delivery_date IS NOT NULL
+              AND customer_id IS NOT NULL
+              {unit_clause}
+              {date_clause}
+        """
+        if not self.uses_state(start_date, end_date):
+            return f"({deliveries}) AS customer_rows"
+        
+        # Months are keyed by their first day, so whole-month bounds apply as is
+        month_clauses = []
+        if start_date:
+            month_clauses.append("AND month >= :start_date")
+        if end_date:
+            month_clauses.append("AND month <= :end_date")
+        month_clause = " ".join(month_clauses)
+        covered_until = f"""(
+            SELECT covered_until FROM {ROLLUP_STATE_TABLE} WHERE name = '{RFM_STATE_NAME}'
+        )"""
+        return f"""(
+            SELECT
+                customer_id,
+                customer_name,
+                first_purchase_date AS first_date,
+                last_purchase_date AS last_date,
+                order_count,
+                monetary
+            FROM {RFM_STATE_TABLE}
+            WHERE TRUE
+              {unit_clause}
+              {month_clause}
+            UNION ALL
+            {deliveries}
+              AND delivery_date >= COALESCE({covered_until}, '-infinity'::date)
+        ) AS customer_rows"""
+    
+    @staticmethod
+    def _date_params(
+        unit_id: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Dict[str, Any]:
+        # Convert string dates to date objects for asyncpg
+        params: Dict[str, Any] = {}
+        if unit_id is not None:
+            params['unit_id'] = unit_id
+        if start_date:
+            params['start_date'] = datetime.fromisoformat(start_date).date()
+        if end_date:
+            params['end_date'] = datetime.fromisoformat(end_date).date()
+        return params
+    
+    async def get_customer_aggregates(
         self, 
         unit_id: Optional[int] = None,
         start_date: Optional[str] = None, 
         end_date: Optional[str] = None
     ) -> pd.DataFrame:
         """
-        Fetch customer transaction data for RFM analysis from tbldeliveryinfo
+        Per-customer RFM inputs aggregated in the database (one row per customer)
         
         Args:
             unit_id: Optional business unit filter
@@ -27,59 +121,39 @@ class RFMRepository:
             end_date: Optional end date filter (YYYY-MM-DD)
             
         Returns:
-            DataFrame with customer_id, customer_name, delivery_date, monetary
+            DataFrame with customer_id, customer_name, Recency, Frequency, Monetary.
+            Recency is days since the customer's last delivery, counted from the
+            day after the latest delivery in the selection.
         """
-        # Get UOM conversion SQL for monetary calculation
-        uom_sql = get_uom_conversion_sql()
-        
-        # Build unit filter
-        unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
-        
-        # Build date filters
-        date_clauses = []
-        if start_date:
-            date_clauses.append("AND delivery_date >= :start_date")
-        if end_date:
-            date_clauses.append("AND delivery_date <= :end_date")
-        date_clause = " ".join(date_clauses)
-        
         query_str = f"""
         SELECT 
             customer_id,
             customer_name,
-            delivery_date,
-            {uom_sql} as monetary
-        FROM tbldeliveryinfo
-        WHERE delivery_date IS NOT NULL
-          AND customer_id IS NOT NULL
-          AND customer_name IS NOT NULL
-          {unit_clause}
-          {date_clause}
-        ORDER BY customer_id, delivery_date
+            EXTRACT(DAY FROM
+                (MAX(MAX(last_date)) OVER () + INTERVAL '1 day') - MAX(last_date)
+            )::int AS recency,
+            SUM(order_count) AS frequency,
+            COALESCE(SUM(monetary), 0) AS monetary
+        FROM {self._customer_rows_sql(unit_id, start_date, end_date)}
+        WHERE customer_name IS NOT NULL
+        GROUP BY customer_id, customer_name
+        ORDER BY customer_id, customer_name
         """
         
         query = text(query_str)
-        
-        # Build parameters dict - convert string dates to date objects for asyncpg
-        params = {}
-        if unit_id is not None:
-            params['unit_id'] = unit_id
-        if start_date:
-            # Convert string to date object
-            params['start_date'] = datetime.fromisoformat(start_date).date()
-        if end_date:
-            params['end_date'] = datetime.fromisoformat(end_date).date()
+        params = self._date_params(unit_id, start_date, end_date)
         
         result = await self.db.execute(query, params)
         rows = result.fetchall()
         
-        # Convert to DataFrame
+        columns = ['customer_id', 'customer_name', 'Recency', 'Frequency', 'Monetary']
         if not rows:
-            return pd.DataFrame(columns=['customer_id', 'customer_name', 'delivery_date', 'monetary'])
+            return pd.DataFrame(columns=columns)
         
-        df = pd.DataFrame(rows, columns=['customer_id', 'customer_name', 'delivery_date', 'monetary'])
-        # Ensure monetary is numeric (handle Decimals/Objects)
-        df['monetary'] = pd.to_numeric(df['monetary'], errors='coerce').fillna(0.0)
+        df = pd.DataFrame(rows, columns=columns)
+        # Ensure numeric dtypes (handle Decimals/Objects)
+        df['Frequency'] = pd.to_numeric(df['Frequency'], errors='coerce').fillna(0).astype(int)
+        df['Monetary'] = pd.to_numeric(df['Monetary'], errors='coerce').fillna(0.0)
         return df
     
     async def get_rfm_summary(
@@ -89,40 +163,18 @@ class RFMRepository:
         end_date: Optional[str] = None
     ) -> Dict[str, Any]:
         """Get summary statistics for RFM analysis"""
-        unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
-        
-        # Build date filters
-        date_clauses = []
-        if start_date:
-            date_clauses.append("AND delivery_date >= :start_date")
-        if end_date:
-            date_clauses.append("AND delivery_date <= :end_date")
-        date_clause = " ".join(date_clauses)
-        
         query_str = f"""
         SELECT 
             COUNT(DISTINCT customer_id) as total_customers,
-            COUNT(*) as total_transactions,
-            SUM({get_uom_conversion_sql()}) as total_volume,
-            MIN(delivery_date) as earliest_date,
-            MAX(delivery_date) as latest_date
-        FROM tbldeliveryinfo
-        WHERE delivery_date IS NOT NULL
-          AND customer_id IS NOT NULL
-          {unit_clause}
-          {date_clause}
+            SUM(order_count) as total_transactions,
+            SUM(monetary) as total_volume,
+            MIN(first_date) as earliest_date,
+            MAX(last_date) as latest_date
+        FROM {self._customer_rows_sql(unit_id, start_date, end_date)}
         """
         
         query = text(query_str)
-        
-        params = {}
-        if unit_id is not None:
-            params['unit_id'] = unit_id
-        if start_date:
-            params['start_date'] = datetime.fromisoformat(start_date).date()
-        if end_date:
-            params['end_date'] = datetime.fromisoformat(end_date).date()
-            
+        params = self._date_params(unit_id, start_date, end_date)
         if params:
             query = query.bindparams(**params)
         
@@ -0,0 +1,168 @@
+from typing import Any, Dict, Optional
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.utils import (
+    ROLLUP_STATE_TABLE,
+    RFM_STATE_NAME,
+    RFM_STATE_TABLE,
+    get_delivery_source_sql,
+)
+from app.repositories.rollup_repository import STATE_TABLE_DDL
+from app.utils.exceptions import DatabaseError
+
+# Upsert key; unit_id and customer_name may be NULL in tbldeliveryinfo
+_STATE_KEY = "(COALESCE(unit_id, -1)), customer_id, (COALESCE(customer_name, '')), month"
+
+# Per-(unit, customer, month) RFM inputs of the deliveries in a date range.
+# Grouped by the upsert key expressions so a refresh never yields two rows
+# for one key (NULL and -1 / '' would otherwise be separate groups); MAX
+# keeps the stored unit_id and customer_name as they appear in the source.
+_MONTHLY_AGGREGATES = f"""
+    SELECT
+        MAX(unit_id) AS unit_id,
+        customer_id,
+        MAX(customer_name) AS customer_name,
+        date_trunc('month', delivery_date)::date AS month,
+        MIN(delivery_date) AS first_purchase_date,
+        MAX(delivery_date) AS last_purchase_date,
+        SUM(order_count) AS order_count,
+        COALESCE(SUM(qty_mt), 0) AS monetary
+    FROM {{source}}
+    WHERE delivery_date IS NOT NULL
+      AND customer_id IS NOT NULL
+      {{date_clause}}
+    GROUP BY COALESCE(unit_id, -1), customer_id, COALESCE(customer_name, ''),
+             date_trunc('month', delivery_date)::date
+"""
+
+
+class RFMStateRepository:
+    """
+    Maintains the persisted per-customer RFM state.
+
+    One row per (unit, customer, month) with the last purchase date, order
+    count and monetary volume of the deliveries before the state's
+    high-water mark. Refreshes only read deliveries past the mark and add
+    them onto the existing rows, so history is never rescanned.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_schema(self) -> None:
+        """Create the state table (and the shared high-water mark table) if missing."""
+        try:
+            statements = [
+                # Column types follow the delivery source
+                f"""
+                CREATE TABLE IF NOT EXISTS {RFM_STATE_TABLE} AS
+                {_MONTHLY_AGGREGATES.format(source=get_delivery_source_sql(use_rollup=False), date_clause="")}
+                WITH NO DATA
+                """,
+                f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_{RFM_STATE_TABLE}_key
+                ON {RFM_STATE_TABLE} ({_STATE_KEY})
+                """,
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_{RFM_STATE_TABLE}_unit_month
+                ON {RFM_STATE_TABLE} (unit_id, month)
+                """,
+                STATE_TABLE_DDL,
+            ]
+            for statement in statements:
+                await self.db.execute(text(statement))
+        except Exception as e:
+            raise DatabaseError(f"Error creating RFM state schema: {str(e)}")
+
+    async def get_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.db.execute(
+                text(f"""
+                    SELECT covered_until, refreshed_at, rows_written
+                    FROM {ROLLUP_STATE_TABLE}
+                    WHERE name = :name
+                """),
+                {"name": RFM_STATE_NAME}
+            )
+            row = result.fetchone()
+            if not row:
+                return None
+            return {
+                "covered_until": row.covered_until,
+                "refreshed_at": row.refreshed_at,
+                "rows_written": int(row.rows_written),
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error fetching RFM state: {str(e)}")
+
+    async def refresh(self, settle_days: int = 3, full: bool = False, until: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Fold the deliveries in [covered_until, until) into the state.
+
+        Deliveries are added onto the existing rows, so a day must be final
+        before it is folded in: ``until`` defaults to ``settle_days`` before
+        today and newer days are read live by the RFM queries. Rows that
+        arrive later for an already folded day need a full rebuild.
+
+        Args:
+            settle_days: Recent days left out of the state
+            full: Rebuild the state from scratch
+            until: Exclusive end day of the refresh
+        """
+        try:
+            until = until or date.today() - timedelta(days=settle_days)
+            # Serialize concurrent refreshes across workers and cron runs
+            await self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": RFM_STATE_TABLE})
+
+            state = None if full else await self.get_state()
+            start = state["covered_until"] if state else None
+            if start and start >= until:
+                return {"start_date": start.isoformat(), "covered_until": start.isoformat(), "rows_written": 0}
+
+            if start is None:
+                await self.db.execute(text(f"TRUNCATE {RFM_STATE_TABLE}"))
+
+            date_clause = "AND delivery_date < :end_date"
+            params: Dict[str, Any] = {"end_date": until}
+            if start:
+                date_clause += " AND delivery_date >= :start_date"
+                params["start_date"] = start
+
+            monthly = _MONTHLY_AGGREGATES.format(source=get_delivery_source_sql(), date_clause=date_clause)
+            result = await self.db.execute(
+                text(f"""
+                    INSERT INTO {RFM_STATE_TABLE} AS state (
+                        unit_id, customer_id, customer_name, month,
+                        first_purchase_date, last_purchase_date, order_count, monetary
+                    )
+                    {monthly}
+                    ON CONFLICT ({_STATE_KEY}) DO UPDATE
+                    SET first_purchase_date = LEAST(state.first_purchase_date, EXCLUDED.first_purchase_date),
+                        last_purchase_date = GREATEST(state.last_purchase_date, EXCLUDED.last_purchase_date),
+                        order_count = state.order_count + EXCLUDED.order_count,
+                        monetary = state.monetary + EXCLUDED.monetary
+                """),
+                params
+            )
+            rows_written = result.rowcount or 0
+
+            await self.db.execute(
+                text(f"""
+                    INSERT INTO {ROLLUP_STATE_TABLE} (name, covered_until, refreshed_at, rows_written)
+                    VALUES (:name, :covered_until, now(), :rows_written)
+                    ON CONFLICT (name) DO UPDATE
+                    SET covered_until = EXCLUDED.covered_until,
+                        refreshed_at = EXCLUDED.refreshed_at,
+                        rows_written = EXCLUDED.rows_written
+                """),
+                {"name": RFM_STATE_NAME, "covered_until": until, "rows_written": rows_written}
+            )
+
+            return {
+                "start_date": start.isoformat() if start else None,
+                "covered_until": until.isoformat(),
+                "rows_written": rows_written,
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error refreshing RFM state: {str(e)}")
@@ -0,0 +1,163 @@
+from typing import Any, Dict, Optional
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.utils import (
+    DAILY_ROLLUP_NAME,
+    DAILY_ROLLUP_TABLE,
+    ROLLUP_DIMENSIONS,
+    ROLLUP_STATE_TABLE,
+    get_delivery_rows_sql,
+)
+from app.utils.exceptions import DatabaseError
+
+# Rollup dimensions with delivery_date truncated to the day
+_DAY_DIMENSIONS = ", ".join(
+    "delivery_date::date" if column == "delivery_date" else column for column in ROLLUP_DIMENSIONS
+)
+
+# High-water marks of the derived tables, one row per name
+STATE_TABLE_DDL = f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (
+        name text PRIMARY KEY,
+        covered_until date NOT NULL,
+        refreshed_at timestamptz NOT NULL DEFAULT now(),
+        rows_written bigint NOT NULL DEFAULT 0
+    )
+"""
+
+# Incremental refreshes and the raw tail read a date range of the source.
+# Built with app.db.session.ensure_index_concurrently, outside any transaction.
+SOURCE_DATE_INDEX = ("idx_tbldeliveryinfo_delivery_date", "ON tbldeliveryinfo (delivery_date)")
+
+
+class RollupRepository:
+    """Maintains the daily pre-aggregated rollup of tbldeliveryinfo."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_schema(self) -> None:
+        """Create the rollup and state tables (and the rollup's indexes) if missing."""
+        try:
+            statements = [
+                # Column types follow tbldeliveryinfo
+                f"""
+                CREATE TABLE IF NOT EXISTS {DAILY_ROLLUP_TABLE} AS
+                SELECT {_DAY_DIMENSIONS}, qty_mt, invoice_amount, order_count, qty_order_count
+                FROM ({get_delivery_rows_sql()}) AS deliveries
+                WITH NO DATA
+                """,
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_{DAILY_ROLLUP_TABLE}_unit_date
+                ON {DAILY_ROLLUP_TABLE} (unit_id, delivery_date)
+                """,
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_{DAILY_ROLLUP_TABLE}_date
+                ON {DAILY_ROLLUP_TABLE} (delivery_date)
+                """,
+                STATE_TABLE_DDL,
+            ]
+            for statement in statements:
+                await self.db.execute(text(statement))
+        except Exception as e:
+            raise DatabaseError(f"Error creating rollup schema: {str(e)}")
+
+    async def get_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.db.execute(
+                text(f"""
+                    SELECT covered_until, refreshed_at, rows_written
+                    FROM {ROLLUP_STATE_TABLE}
+                    WHERE name = :name
+                """),
+                {"name": DAILY_ROLLUP_NAME}
+            )
+            row = result.fetchone()
+            if not row:
+                return None
+            return {
+                "covered_until": row.covered_until,
+                "refreshed_at": row.refreshed_at,
+                "rows_written": int(row.rows_written),
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error fetching rollup state: {str(e)}")
+
+    async def refresh(self, lookback_days: int = 3, full: bool = False, until: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Rebuild rollup days from the high-water mark onwards.
+
+        Days in [covered_until - lookback_days, until) are deleted and
+        re-aggregated from tbldeliveryinfo in one transaction, then the
+        high-water mark moves to ``until`` (default: today, which stays
+        on the raw tail because it is still receiving deliveries).
+
+        Args:
+            lookback_days: Already rolled-up days to recompute for late rows
+            full: Rebuild the whole rollup from scratch
+            until: Exclusive end day of the refresh
+        """
+        try:
+            until = until or date.today()
+            # Serialize concurrent refreshes across workers and cron runs
+            await self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": DAILY_ROLLUP_TABLE})
+
+            state = None if full else await self.get_state()
+            start = state["covered_until"] - timedelta(days=lookback_days) if state else None
+
+            date_clause = "AND delivery_date >= :start_date" if start else ""
+            params: Dict[str, Any] = {"end_date": until}
+            if start:
+                params["start_date"] = start
+
+            await self.db.execute(
+                text(f"""
+                    DELETE FROM {DAILY_ROLLUP_TABLE}
+                    WHERE delivery_date < :end_date
+                      {date_clause}
+                """),
+                params
+            )
+
+            dimensions = ", ".join(ROLLUP_DIMENSIONS)
+            result = await self.db.execute(
+                text(f"""
+                    INSERT INTO {DAILY_ROLLUP_TABLE} (
+                        {dimensions}, qty_mt, invoice_amount, order_count, qty_order_count
+                    )
+                    SELECT
+                        {_DAY_DIMENSIONS},
+                        SUM(qty_mt),
+                        SUM(invoice_amount),
+                        SUM(order_count),
+                        SUM(qty_order_count)
+                    FROM ({get_delivery_rows_sql()}) AS deliveries
+                    WHERE delivery_date < :end_date
+                      AND delivery_date IS NOT NULL
+                      {date_clause}
+                    GROUP BY {_DAY_DIMENSIONS}
+                """),
+                params
+            )
+            rows_written = result.rowcount or 0
+
+            await self.db.execute(
+                text(f"""
+                    INSERT INTO {ROLLUP_STATE_TABLE} (name, covered_until, refreshed_at, rows_written)
+                    VALUES (:name, :covered_until, now(), :rows_written)
+                    ON CONFLICT (name) DO UPDATE
+                    SET covered_until = EXCLUDED.covered_until,
+                        refreshed_at = EXCLUDED.refreshed_at,
+                        rows_written = EXCLUDED.rows_written
+                """),
+                {"name": DAILY_ROLLUP_NAME, "covered_until": until, "rows_written": rows_written}
+            )
+
+            return {
+                "start_date": start.isoformat() if start else None,
+                "covered_until": until.isoformat(),
+                "rows_written": rows_written,
+            }
+        except Exception as e:
+            raise DatabaseError(f"Error refreshing daily rollup: {str(e)}")
@@ -1,38 +1,17 @@
- """
+"""
 Sales repository - handles all sales-related data access. This module provides secure, centralized access to sales data with proper
 error handling and logging.
 """
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import date, datetime
 from decimal import Decimal
-import ast
 from core.logging import get_logger
-from db.engine import get_sync_db
+from app.db.executor import fetch
+from app.db.utils import get_uom_conversion_sql, get_uom_shown_sql
 
 logger = get_logger(__name__)
 
 
-def _parse_db_result(result_str: str) -> List[Tuple]:
-    """ 
-    Args:
-        result_str: String representation of query result
-        
-    Returns:
-        Parsed result as list of tuples
-        
-    Note:
-        Uses ast.literal_eval() instead of eval() for security
-    """
-    if not result_str or result_str.strip() == '':
-        return []
-    
-    try:
-        return ast.literal_eval(result_str)
-    except (SyntaxError, ValueError) as e:
-        logger.error(f"Error parsing database result: {e}")
-        return []
-
-
 def _sanitize_unit_id(unit_id: Optional[str]) -> str:
     """
     Args:
@@ -66,7 +45,7 @@ def _build_unit_filter(unit_id: Optional[str], column_name: str = "unit_id") ->
         return f'AND {column_name} = \'{sanitized}\''
 
 
-def get_ytd_sales(
+async def get_ytd_sales(
     unit_id: Optional[str] = None,
     fiscal_year: bool = False
 ) -> Dict[str, Any]:
@@ -110,22 +89,11 @@ def get_ytd_sales(
         query_template = """
             SELECT
             unit_id,
-            CASE
-                WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                ELSE base_uom
-            END AS uom_shown,
+            {uom_shown} AS uom_shown,
             COUNT(*) AS total_order,
             ROUND(
                 SUM(
-                CASE
-                    WHEN unit_id = 4 AND base_uom = 'Ton' THEN delivery_qty
-                    WHEN unit_id = 4 THEN (delivery_qty * numgrossweight) / 1000.0
-                    WHEN unit_id IN (188, 189, 232) THEN (delivery_qty * numgrossweight) / 1000.0
-                    WHEN unit_id = 144 AND base_uom = 'Metric Tons' THEN delivery_qty
-                    WHEN unit_id = 144 THEN (delivery_qty * numgrossweight) / 1000.0
-                    ELSE delivery_qty
-                END
+                {qty_mt}
                 )::numeric,
                 2
             ) AS total_sales_quantity
@@ -134,28 +102,28 @@ def get_ytd_sales(
             {unit_filter}
             GROUP BY
             unit_id,
-            CASE
-                WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                ELSE base_uom
-            END
+            {uom_shown}
         """
         
         # Execute queries
         current_query = query_template.format(
             start_date=current_ytd_start,
             end_date=current_ytd_end,
-            unit_filter=unit_filter
+            unit_filter=unit_filter,
+            uom_shown=get_uom_shown_sql(),
+            qty_mt=get_uom_conversion_sql()
         )
         
         last_query = query_template.format(
             start_date=last_ytd_start,
             end_date=last_ytd_end,
-            unit_filter=unit_filter
+            unit_filter=unit_filter,
+            uom_shown=get_uom_shown_sql(),
+            qty_mt=get_uom_conversion_sql()
         )
         
-        current_results = _parse_db_result(get_sync_db().run(current_query))
-        last_results = _parse_db_result(get_sync_db().run(last_query))
+        current_results = (await fetch(current_query)).rows
+        last_results = (await fetch(last_query)).rows
         
         if not current_results or not last_results:
             logger.warning("No YTD data found")
@@ -241,7 +209,7 @@ def get_ytd_sales(
         raise
 
 
-def get_mtd_stats(
+async def get_mtd_stats(
     unit_id: Optional[str] = None,
     month: Optional[int] = None,
     year: Optional[int] = None
@@ -293,21 +261,10 @@ def get_mtd_stats(
         query_template = """
             SELECT
             unit_id,
-            CASE
-                WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                ELSE base_uom
-            END AS uom_shown,
+            {uom_shown} AS uom_shown,
             ROUND(
                 SUM(
-                CASE
-                    WHEN unit_id = 4 AND base_uom = 'Ton' THEN delivery_qty
-                    WHEN unit_id = 4 THEN (delivery_qty * numgrossweight) / 1000.0
-                    WHEN unit_id IN (188, 189, 232) THEN (delivery_qty * numgrossweight) / 1000.0
-                    WHEN unit_id = 144 AND base_uom = 'Metric Tons' THEN delivery_qty
-                    WHEN unit_id = 144 THEN (delivery_qty * numgrossweight) / 1000.0
-                    ELSE delivery_qty
-                END
+                {qty_mt}
                 )::numeric,
                 2
             ) AS total_quantity,
@@ -317,27 +274,27 @@ def get_mtd_stats(
             {unit_filter}
             GROUP BY
             unit_id,
-            CASE
-                WHEN unit_id IN (4, 144, 188, 189, 232) THEN 'MT'
-                WHEN base_uom IN ('Metric Tons', 'Metric Ton', 'MT', 'Ton') THEN 'MT'
-                ELSE base_uom
-            END
+            {uom_shown}
         """
         
         current_query = query_template.format(
             start_date=current_month_start,
             end_date=current_month_end,
-            unit_filter=unit_filter
+            unit_filter=unit_filter,
+            uom_shown=get_uom_shown_sql(),
+            qty_mt=get_uom_conversion_sql()
         )
         
         prev_query = query_template.format(
             start_date=prev_month_start,
             end_date=prev_month_end,
-            unit_filter=unit_filter
+            unit_filter=unit_filter,
+            uom_shown=get_uom_shown_sql(),
+            qty_mt=get_uom_conversion_sql()
         )
         
-        current_results = _parse_db_result(get_sync_db().run(current_query))
-        prev_results = _parse_db_result(get_sync_db().run(prev_query))
+        current_results = (await fetch(current_query)).rows
+        prev_results = (await fetch(prev_query)).rows
         
         if not current_results or not prev_results:
             logger.warning("No MTD data found")
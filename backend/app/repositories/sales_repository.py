@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from datetime import date
-from app.db.utils import get_uom_conversion_sql
+from app.db.utils import get_delivery_source_sql
 from app.utils.exceptions import DatabaseError
 
 class SalesRepository:
@@ -19,7 +19,7 @@ class SalesRepository:
         Get aggregated metrics for a date range using correct UOM logic.
         """
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             from app.db.utils import get_uom_display
             uom_display_sql = get_uom_display()
             
@@ -27,10 +27,10 @@ class SalesRepository:
 
             query = text(f"""
                 SELECT
-                    COUNT(*) as total_orders,
-                    ROUND(SUM({uom_sql})::numeric, 2) as total_quantity,
+                    SUM(order_count) as total_orders,
+                    ROUND(SUM(qty_mt)::numeric, 2) as total_quantity,
                     MAX({uom_display_sql}) as uom
-                FROM tbldeliveryinfo
+                FROM {source}
                 WHERE delivery_date >= :start_date
                   AND delivery_date <= :end_date
                   AND delivery_date IS NOT NULL
@@ -71,7 +71,7 @@ class SalesRepository:
     ) -> Dict[str, Any]:
         """Month-to-Date statistics"""
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             from app.db.utils import get_uom_display
             uom_display_sql = get_uom_display()
             
@@ -79,10 +79,10 @@ class SalesRepository:
             
             query = text(f"""
                 SELECT 
-                    ROUND(SUM({uom_sql})::numeric, 2) as delivery_qty,
-                    COUNT(*) as total_orders,
+                    ROUND(SUM(qty_mt)::numeric, 2) as delivery_qty,
+                    SUM(order_count) as total_orders,
                     MAX({uom_display_sql}) as uom
-                FROM tbldeliveryinfo
+                FROM {source}
                 WHERE delivery_date >= :start_date
                   AND delivery_date < :end_date
                   {unit_clause}
@@ -106,7 +106,7 @@ class SalesRepository:
     async def get_monthly_trend(self, unit_id: Optional[int], limit: int = 12, end_date: Optional[date] = None, start_date: Optional[date] = None) -> List[Dict[str, Any]]:
         """Get monthly sales trend. Defaults to last 12 months if start_date not provided."""
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
             if start_date:
                  query_start = start_date
@@ -122,9 +122,9 @@ class SalesRepository:
             query = text(f"""
                 SELECT
                     TO_CHAR(delivery_date, 'YYYY-MM') as month,
-                    COUNT(*) as order_count,
-                    ROUND(SUM({uom_sql})::numeric, 2) as qty
-                FROM tbldeliveryinfo
+                    SUM(order_count) as order_count,
+                    ROUND(SUM(qty_mt)::numeric, 2) as qty
+                FROM {source}
                 WHERE delivery_date >= :start_date
                   AND delivery_date <= :end_date
                   AND delivery_date IS NOT NULL
@@ -156,7 +156,7 @@ class SalesRepository:
     async def get_monthly_summary(self, unit_id: Optional[int], date_filter: date) -> Dict[str, Any]:
         """Get summary stats for a specific month."""
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             from app.db.utils import get_uom_display
             uom_display_sql = get_uom_display()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
@@ -167,10 +167,10 @@ class SalesRepository:
             
             query = text(f"""
                 SELECT
-                    ROUND(SUM({uom_sql})::numeric, 2) as total_quantity,
-                    COUNT(*) as total_orders,
+                    ROUND(SUM(qty_mt)::numeric, 2) as total_quantity,
+                    SUM(order_count) as total_orders,
                     MAX({uom_display_sql}) as uom
-                FROM tbldeliveryinfo
+                FROM {source}
                 WHERE delivery_date >= :start_date
                   AND delivery_date < :end_date
                   {unit_clause}
@@ -207,7 +207,7 @@ class SalesRepository:
         subtitle is "Monthly Avg".
         """
         try:
-            uom_sql = get_uom_conversion_sql()
+            source = get_delivery_source_sql()
             from app.db.utils import get_uom_display
             uom_display_sql = get_uom_display()
             unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
@@ -217,10 +217,10 @@ class SalesRepository:
             
             query = text(f"""
                 SELECT
-                    ROUND(SUM({uom_sql})::numeric, 2) as total_quantity,
-                    COUNT(*) as total_orders,
+                    ROUND(SUM(qty_mt)::numeric, 2) as total_quantity,
+                    SUM(order_count) as total_orders,
                     MAX({uom_display_sql}) as uom
-                FROM tbldeliveryinfo
+                FROM {source}
                 WHERE delivery_date >= :start_date
                   AND delivery_date <= :end_date
                   {unit_clause}
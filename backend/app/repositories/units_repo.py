@@ -5,12 +5,12 @@ This module provides secure, parameterized queries for business unit data.
 """
 from typing import List, Dict, Optional
 from core.logging import get_logger
-from db.engine import get_sync_db
+from app.db.executor import fetch
 
 logger = get_logger(__name__)
 
 
-def get_all_units() -> List[Dict[str, str]]:
+async def get_all_units() -> List[Dict[str, str]]:
     """    
     Returns:
         List of dicts with unit_id and business_unit_name
@@ -29,13 +29,7 @@ def get_all_units() -> List[Dict[str, str]]:
         ORDER BY d."unit_id"
         '''
         
-        result_str = get_sync_db().run(query)
-        
-        if not result_str or result_str.strip() == '':
-            return []
-    
-        import ast
-        results = ast.literal_eval(result_str)
+        results = await fetch(query)
         
         return [
             {
@@ -49,7 +43,7 @@ def get_all_units() -> List[Dict[str, str]]:
         raise
 
 
-def get_business_unit_name(unit_id: Optional[str]) -> str:
+async def get_business_unit_name(unit_id: Optional[str]) -> str:
     """    
     Args:
         unit_id: Business unit ID
@@ -61,26 +55,16 @@ def get_business_unit_name(unit_id: Optional[str]) -> str:
         return "All Units"
     
     try:
-        sanitized_unit_id = str(unit_id).replace("'", "''")  
-        query = f'''
+        query = '''
         SELECT "strBusinessUnitName" 
         FROM dim_business_unit 
-        WHERE "Unit_Id" = '{sanitized_unit_id}'
+        WHERE "Unit_Id"::text = :unit_id
         LIMIT 1
         '''
         
-        result_str = get_sync_db().run(query)
-        
-        if not result_str or result_str.strip() == '':
-            return f"Unit {unit_id}"
+        name = (await fetch(query, {"unit_id": str(unit_id)})).scalar()
         
-        import ast
-        results = ast.literal_eval(result_str)
-        
-        if results and len(results) > 0:
-            return results[0][0]
-        
-        return f"Unit {unit_id}"
+        return name if name else f"Unit {unit_id}"
     except Exception as e:
         logger.error(f"Error fetching business unit name: {e}")
         return f"Unit {unit_id}"
@@ -0,0 +1,107 @@
+from typing import Any, Dict, Optional
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.db.uom import build_qty_mt_case, build_uom_shown_case
+from app.utils.exceptions import DatabaseError
+
+_TRIGGER_FUNCTION = "tbldeliveryinfo_set_qty_mt"
+_TRIGGER = "trg_tbldeliveryinfo_qty_mt"
+
+# Rows whose persisted values disagree with the registry (NULL-safe)
+_STALE_ROWS = f"""
+    (qty_mt IS DISTINCT FROM ({build_qty_mt_case()})::double precision
+     OR uom_shown IS DISTINCT FROM {build_uom_shown_case()})
+"""
+
+# Aggregates filter by unit and date and only need qty_mt/uom_shown. Built with
+# app.db.session.ensure_index_concurrently once the columns exist.
+COVERING_INDEX = (
+    "idx_tbldeliveryinfo_unit_date_qty_mt",
+    "ON tbldeliveryinfo (unit_id, delivery_date) INCLUDE (qty_mt, uom_shown)",
+)
+
+
+class UomRepository:
+    """Maintains the persisted tbldeliveryinfo.qty_mt / uom_shown columns."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def ensure_schema(self) -> None:
+        """
+        Add the columns and the trigger that keeps them current on
+        INSERT/UPDATE (COVERING_INDEX is built separately, without a
+        transaction). The trigger body is regenerated from the conversion
+        registry, so re-running this after a rule change (followed by a
+        backfill) brings existing rows up to date.
+        """
+        try:
+            statements = [
+                """
+                ALTER TABLE tbldeliveryinfo
+                    ADD COLUMN IF NOT EXISTS qty_mt double precision,
+                    ADD COLUMN IF NOT EXISTS uom_shown text
+                """,
+                f"""
+                CREATE OR REPLACE FUNCTION {_TRIGGER_FUNCTION}() RETURNS trigger AS $$
+                BEGIN
+                    NEW.qty_mt := ({build_qty_mt_case("NEW.")})::double precision;
+                    NEW.uom_shown := {build_uom_shown_case("NEW.")};
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                f"DROP TRIGGER IF EXISTS {_TRIGGER} ON tbldeliveryinfo",
+                f"""
+                CREATE TRIGGER {_TRIGGER}
+                BEFORE INSERT OR UPDATE OF unit_id, base_uom, delivery_qty, numgrossweight
+                ON tbldeliveryinfo
+                FOR EACH ROW EXECUTE FUNCTION {_TRIGGER_FUNCTION}()
+                """,
+            ]
+            for statement in statements:
+                await self.db.execute(text(statement))
+        except Exception as e:
+            raise DatabaseError(f"Error creating qty_mt columns: {str(e)}")
+
+    async def get_date_bounds(self) -> Optional[Dict[str, date]]:
+        try:
+            result = await self.db.execute(text("""
+                SELECT MIN(delivery_date) AS min_date, MAX(delivery_date) AS max_date
+                FROM tbldeliveryinfo
+            """))
+            row = result.fetchone()
+            if not row or row.min_date is None:
+                return None
+            return {"min_date": row.min_date, "max_date": row.max_date}
+        except Exception as e:
+            raise DatabaseError(f"Error fetching delivery date bounds: {str(e)}")
+
+    async def backfill_range(self, start_date: Optional[date], end_date: Optional[date]) -> int:
+        """
+        Recompute qty_mt / uom_shown for rows in [start_date, end_date) whose
+        values are missing or out of date. Passing no dates covers rows
+        without a delivery_date. Returns the number of rows updated.
+        """
+        try:
+            if start_date is None:
+                range_clause = "delivery_date IS NULL"
+                params: Dict[str, Any] = {}
+            else:
+                range_clause = "delivery_date >= :start_date AND delivery_date < :end_date"
+                params = {"start_date": start_date, "end_date": end_date}
+
+            result = await self.db.execute(
+                text(f"""
+                    UPDATE tbldeliveryinfo
+                    SET qty_mt = ({build_qty_mt_case()})::double precision,
+                        uom_shown = {build_uom_shown_case()}
+                    WHERE {range_clause}
+                      AND {_STALE_ROWS}
+                """),
+                params
+            )
+            return result.rowcount or 0
+        except Exception as e:
+            raise DatabaseError(f"Error backfilling qty_mt: {str(e)}")
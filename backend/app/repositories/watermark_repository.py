@@ -0,0 +1,47 @@
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text
+from app.utils.exceptions import DatabaseError
+
+class WatermarkRepository:
+    """Data-version watermarks for tbldeliveryinfo, used to version cache keys."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_data_version(self, unit_id: Optional[int] = None) -> str:
+        """
+        Token that changes whenever deliveries are added or removed for a unit:
+        latest delivery_date plus the table's insert/delete counter.
+
+        Both reads are cheap: MAX is answered from the delivery_date indexes
+        and the counter comes from pg_stat_user_tables, so no delivery
+        rows are counted. The counter is table-wide, so a write for one unit
+        also moves the others' versions.
+        """
+        try:
+            unit_clause = "AND unit_id = :unit_id" if unit_id is not None else ""
+            query = text(f"""
+                SELECT
+                    (
+                        SELECT MAX(delivery_date)
+                        FROM tbldeliveryinfo
+                        WHERE delivery_date IS NOT NULL
+                          {unit_clause}
+                    ) AS max_date,
+                    (
+                        SELECT n_tup_ins + n_tup_del
+                        FROM pg_stat_user_tables
+                        WHERE relid = 'tbldeliveryinfo'::regclass
+                    ) AS writes
+            """)
+
+            params = {"unit_id": unit_id} if unit_id is not None else {}
+            result = await self.db.execute(query, params)
+            row = result.fetchone()
+
+            if not row or row.max_date is None:
+                return "empty"
+            return f"{row.max_date.isoformat()}:{row.writes or 0}"
+        except Exception as e:
+            raise DatabaseError(f"Error fetching data version: {str(e)}")
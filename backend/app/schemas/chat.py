@@ -1,10 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 
 class ChatRequest(BaseModel):
     message: str    
     session_id: Optional[str] = None
     debug: bool = False
+    reasoning_mode: Optional[Literal["fast", "deep"]] = None  # None = settings.CHAT_REASONING_MODE
 
 class ChatResponse(BaseModel):
     session_id: str
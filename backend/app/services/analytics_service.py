@@ -3,11 +3,15 @@ from datetime import date, datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.analytics_repository import AnalyticsRepository
 from app.utils.exceptions import ValidationError
-from starlette.concurrency import run_in_threadpool
+from app.utils.cache import LocalLRUCache
+from core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Latest delivery month per unit; re-read as often as the cache data version
+_latest_months = LocalLRUCache(maxsize=128, ttl=settings.CACHE_VERSION_TTL_SECONDS)
+
 class AnalyticsService:
     def __init__(self, db: AsyncSession):
         self.repository = AnalyticsRepository(db)
@@ -116,8 +120,7 @@ class AnalyticsService:
                 credit_ai = {"percentage": result["credit"]["percentage"], "revenue": result["credit"]["revenue"]}
                 cash_ai = {"percentage": result["cash"]["percentage"], "revenue": result["cash"]["revenue"]}
                 both_ai = {"percentage": result["both"]["percentage"], "revenue": result["both"]["revenue"]}
-                insights = await run_in_threadpool(
-                    core_engine.analyze_credit_ratio_ceo,
+                insights = await core_engine.aanalyze_credit_ratio_ceo(
                     credit_ai, cash_ai, both_ai, []
                 )
                 result["ai_insights"] = insights
@@ -126,6 +129,59 @@ class AnalyticsService:
                 
         return result
 
+    async def get_credit_by_channel(
+        self,
+        unit_id: Optional[int] = None,
+        month_str: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Credit/cash/both/other revenue split by channel for a month
+        (default: the latest month with deliveries).
+        """
+        if not month_str:
+            month_str = await self._get_latest_month(unit_id)
+        start_date, end_date = self._parse_month_str(month_str) if month_str else self._get_date_range(None, None)
+        month_str = start_date.strftime("%Y-%m")
+
+        rows = await self.repository.get_credit_by_channel(start_date, end_date, unit_id)
+
+        by_payment_type = {"Credit": [], "Cash": [], "Both": [], "Other": []}
+        pay_type_totals = dict.fromkeys(by_payment_type, 0.0)
+        channel_totals: Dict[str, float] = {}
+        grand_total = 0.0
+        for row in rows:
+            by_payment_type[row.pay_type].append({
+                "channel_name": row.channel_name,
+                "revenue": float(row.channel_sales or 0),
+                "percentage_within_type": float(row.channel_pct_within_pay_type or 0)
+            })
+            pay_type_totals[row.pay_type] = float(row.pay_type_total or 0)
+            channel_totals[row.channel_name] = float(row.channel_total or 0)
+            grand_total = float(row.grand_total or 0)
+
+        by_channel = [
+            {
+                "channel_name": name,
+                "revenue": round(revenue, 2),
+                "percentage": round(revenue / grand_total * 100, 2) if grand_total else 0.0
+            }
+            for name, revenue in sorted(channel_totals.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+        return {
+            "month": month_str,
+            "by_payment_type": by_payment_type,
+            "by_channel": by_channel,
+            "totals": {
+                "credit": pay_type_totals["Credit"],
+                "cash": pay_type_totals["Cash"],
+                "both": pay_type_totals["Both"],
+                "other": pay_type_totals["Other"],
+                "total": grand_total
+            },
+            "message": "No data available for the selected month" if not rows else None
+        }
+
     async def get_concentration_risk(
         self,
         unit_id: Optional[str] = None,
@@ -148,7 +204,38 @@ class AnalyticsService:
             "month": month_str or start_date.strftime("%Y-%m")
         }
 
+    async def get_customer_overview(
+        self,
+        unit_id: Optional[int] = None,
+        month: Optional[int] = None,
+        year: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Top customers and concentration risk for the period from one scan."""
+        start_date, end_date = self._get_date_range(year, month)
+        overview = await self.repository.get_customer_overview(start_date, end_date, unit_id)
+
+        concentration = overview["concentration"]
+        concentration_ratio = (concentration["top_10_quantity"] / concentration["total_quantity"] * 100) if concentration["total_quantity"] > 0 else 0.0
+        overview["concentration"] = {
+            **concentration,
+            "concentration_ratio": round(concentration_ratio, 2),
+            "month": str(year) if year and not month else start_date.strftime("%Y-%m")
+        }
+        return overview
+
     # Helpers
+    async def _get_latest_month(self, unit_id: Optional[int]) -> Optional[str]:
+        key = str(unit_id)
+        latest = _latest_months.get(key)
+        if latest is None:
+            latest_date = await self.repository.get_latest_delivery_date(unit_id)
+            if latest_date is None:
+                return None
+            latest = latest_date.strftime("%Y-%m")
+            _latest_months.set(key, latest)
+        return latest
+
+
     def _parse_unit_id(self, unit_id: Optional[str]) -> Optional[int]:
         if unit_id and unit_id.lower() != "null":
             try:
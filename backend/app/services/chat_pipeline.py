@@ -0,0 +1,56 @@
+"""
+Chat answer pipeline as a small dependency graph.
+
+Each stage names the stages whose outputs it needs and starts as soon as
+those finish, so independent LLM calls overlap: entity extraction only needs
+the SQL result and runs alongside the descriptive answer (and reasoning).
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[Any]]  # called with the outputs of `after`, in order
+    after: Tuple[str, ...] = ()
+
+
+async def run_stages(stages: Sequence[Stage]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Run stages as soon as their dependencies finish.
+
+    Stages must be listed after the stages they depend on. The first failure
+    cancels whatever is still running and is re-raised.
+
+    Returns:
+        (outputs by stage name, wall-clock milliseconds by stage name)
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    timings_ms: Dict[str, float] = {}
+
+    async def run(stage: Stage) -> Any:
+        inputs = [await tasks[name] for name in stage.after]
+        started = time.perf_counter()
+        try:
+            return await stage.run(*inputs)
+        finally:
+            timings_ms[stage.name] = round((time.perf_counter() - started) * 1000, 1)
+
+    for stage in stages:
+        unknown = [name for name in stage.after if name not in tasks]
+        if unknown:
+            raise ValueError(f"Stage {stage.name!r} depends on unknown or later stages: {unknown}")
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    pending: List[asyncio.Task] = list(tasks.values())
+    try:
+        await asyncio.gather(*pending)
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+    return {name: task.result() for name, task in tasks.items()}, timings_ms
@@ -4,8 +4,10 @@ import json
 import uuid
 from typing import Optional, Any
 from app.schemas.chat import ChatResponse, SessionState
+from app.services.chat_pipeline import Stage, run_stages
 from app.utils.cache import redis_client
-from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from llm.usage import track_usage
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,7 +16,35 @@ class ChatService:
     def __init__(self, core_engine: Any):
         self.core = core_engine
 
-    async def process_message(self, message: str, session_id: Optional[str], debug: bool = False) -> ChatResponse:
+    async def process_message(
+        self,
+        message: str,
+        session_id: Optional[str],
+        debug: bool = False,
+        reasoning_mode: Optional[str] = None
+    ) -> ChatResponse:
+        """
+        Answer one chat message.
+
+        ``meta`` reports the LLM calls made for this answer and their token
+        totals (``llm_calls``, ``tokens``).
+
+        Args:
+            reasoning_mode: "fast" or "deep" for why/how questions;
+                None uses settings.CHAT_REASONING_MODE
+        """
+        with track_usage() as usage:
+            response = await self._process_message(message, session_id, debug, reasoning_mode)
+        response.meta = {**(response.meta or {}), **usage.as_dict()}
+        return response
+
+    async def _process_message(
+        self,
+        message: str,
+        session_id: Optional[str],
+        debug: bool,
+        reasoning_mode: Optional[str]
+    ) -> ChatResponse:
         t0 = time.time()
         
         # Ensure session_id
@@ -37,9 +67,7 @@ class ChatService:
         # 2. Elaboration Check
         if self._is_elaboration_request(message) and state.last_descriptive:
             try:
-                # Core.elaborate might be sync
-                answer = await run_in_threadpool(
-                    self.core.elaborate,
+                answer = await self.core.aelaborate(
                     last_question=state.last_question or "",
                     last_answer=state.last_descriptive,
                     last_result=state.last_result or "",
@@ -60,24 +88,31 @@ class ChatService:
         # 3. Core Processing
         question = message     
         try:
-            # Run SQL Query
-            out = await run_in_threadpool(self.core.run_sql_from_question, question)
-            
-            # Descriptive Answer
-            desc = await run_in_threadpool(self.core.descriptive, out)
-            
+            # SQL first; the answer and entity extraction both only need its result
+            stages = [
+                Stage("sql", lambda: self.core.arun_sql_from_question(question)),
+                Stage("descriptive", self.core.adescriptive, after=("sql",)),
+                Stage("entities", lambda out: self.core.aextract_entities(out["query"], out["result"]), after=("sql",)),
+            ]
             # Analytical reasoning
-            if re.search(r'\b(why|how|explain|cause)\b', message.lower()):
-                 desc = await run_in_threadpool(
-                     self.core.analyze_with_reasoning,
-                     question=out["question"],
-                     result=out["result"],
-                     descriptive_answer=desc
-                 )
+            reasoning = re.search(r'\b(why|how|explain|cause)\b', message.lower())
+            if reasoning:
+                reasoning_mode = reasoning_mode or settings.CHAT_REASONING_MODE
+                stages.append(Stage(
+                    "reasoning",
+                    lambda out, desc: self.core.aanalyze_with_reasoning(
+                        question=out["question"],
+                        result=out["result"],
+                        descriptive_answer=desc,
+                        mode=reasoning_mode
+                    ),
+                    after=("sql", "descriptive")
+                ))
+            outputs, timings_ms = await run_stages(stages)
+            out, ent = outputs["sql"], outputs["entities"]
+            desc = outputs.get("reasoning", outputs["descriptive"])
 
             # Update State
-            ent = await run_in_threadpool(self.core.extract_entities, out["query"], out["result"])
-            
             new_state = SessionState(
                 last_question=out["question"],
                 last_sql=out["query"],
@@ -99,14 +134,16 @@ class ChatService:
                     "latency_ms": int((time.time()-t0)*1000),
                     "entity_type": new_state.entity_type,
                     "entities": new_state.entities[:3],
-                    "metric": new_state.metric
+                    "metric": new_state.metric,
+                    "timings_ms": timings_ms,
+                    "reasoning_mode": reasoning_mode if reasoning else None
                 }
             )
 
         except Exception as e:
             # Fallback to General Conversation Check via AI
             try:
-                gen_answer = await run_in_threadpool(self.core.general_response, message)
+                gen_answer = await self.core.ageneral_response(message)
                 return ChatResponse(
                     session_id=session_id,
                     mode="general",
@@ -0,0 +1,117 @@
+"""
+Executive dashboard in one round trip.
+
+Plans the tiles the frontend used to request one by one, folds tiles that
+aggregate the same rows into one shared query (regions/areas/territories
+and top customers/concentration risk), and runs the independent groups
+concurrently, each on its own pooled session.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from app.services.analytics_service import AnalyticsService
+from app.services.regional_service import RegionalService
+from app.services.sales_service import SalesService
+
+logger = logging.getLogger(__name__)
+
+# A task computes one or more tiles from a single session
+TileTask = Callable[[AsyncSession], Awaitable[Dict[str, Any]]]
+
+
+class DashboardService:
+    def __init__(
+        self,
+        session_maker: Callable[[], AsyncContextManager[AsyncSession]],
+        max_concurrency: Optional[int] = None
+    ):
+        self.session_maker = session_maker
+        self.max_concurrency = max_concurrency or settings.DASHBOARD_MAX_CONCURRENCY
+
+    async def get_dashboard(
+        self,
+        unit_id: Optional[int] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute every dashboard tile for the period.
+
+        A failing tile is reported under "errors" and returned as None
+        instead of failing the whole payload.
+
+        Returns:
+            {"tiles": {tile: data}, "timings_ms": {tile: ms}, "errors": {tile: message}}
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        plan = self._plan(unit_id, year, month)
+        results = await asyncio.gather(*(self._run(tiles, task, semaphore) for tiles, task in plan))
+
+        dashboard: Dict[str, Any] = {"tiles": {}, "timings_ms": {}, "errors": {}}
+        for (tile_names, _), (data, elapsed_ms, error) in zip(plan, results):
+            for tile in tile_names:
+                dashboard["tiles"][tile] = data.get(tile)
+                dashboard["timings_ms"][tile] = elapsed_ms
+                if error is not None:
+                    dashboard["errors"][tile] = error
+        return dashboard
+
+    def _plan(self, unit_id: Optional[int], year: Optional[int], month: Optional[int]) -> List[Tuple[Tuple[str, ...], TileTask]]:
+        """(tiles, task) pairs; a task sharing one scan produces several tiles."""
+        unit_str = str(unit_id) if unit_id is not None else None
+        month_str = f"{year}-{month:02d}" if year and month else None
+
+        async def ytd(db):
+            return {"ytd": await SalesService(db).get_ytd_comparison(unit_str, False, year, month)}
+
+        async def mtd(db):
+            return {"mtd": await SalesService(db).get_mtd_stats(unit_str, year, month)}
+
+        async def metrics(db):
+            return {"metrics": await SalesService(db).get_sales_metrics(unit_str, year, month)}
+
+        async def monthly_summary(db):
+            return {"monthly_summary": await SalesService(db).get_monthly_summary(month, year, unit_id)}
+
+        async def geography(db):
+            geo = await RegionalService(db).get_geo_performance(unit_id, year, month)
+            return {"regions": geo["region"], "areas": geo["area"], "territories": geo["territory"]}
+
+        async def customers(db):
+            overview = await AnalyticsService(db).get_customer_overview(unit_id, month, year)
+            return {"top_customers": overview["top_customers"], "concentration_risk": overview["concentration"]}
+
+        async def credit_ratio(db):
+            return {"credit_ratio": await AnalyticsService(db).get_credit_ratio(unit_id, month_str, year)}
+
+        # Heaviest scans first so they start before the pool is saturated
+        return [
+            (("metrics",), metrics),
+            (("regions", "areas", "territories"), geography),
+            (("top_customers", "concentration_risk"), customers),
+            (("ytd",), ytd),
+            (("mtd",), mtd),
+            (("monthly_summary",), monthly_summary),
+            (("credit_ratio",), credit_ratio),
+        ]
+
+    async def _run(
+        self,
+        tiles: Tuple[str, ...],
+        task: TileTask,
+        semaphore: asyncio.Semaphore
+    ) -> Tuple[Dict[str, Any], float, Optional[str]]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with self.session_maker() as session:
+                    data = await task(session)
+                return data, round((time.perf_counter() - started) * 1000, 1), None
+            except Exception as e:
+                logger.error(f"Dashboard tiles {', '.join(tiles)} failed: {e}")
+                return {}, round((time.perf_counter() - started) * 1000, 1), str(e)
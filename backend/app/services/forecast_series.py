@@ -0,0 +1,143 @@
+"""
+Array-based actual/forecast stitching for forecast charts.
+
+Every chart of a response shares one month axis, so a set of charts is a
+(charts x months) matrix filled with fancy indexing. Results match
+ForecastService._merge_data: forecast values only where a chart has no
+actual, and the last actual month repeated as a forecast point so the two
+lines join. Duplicate (chart, month) rows resolve the same way too: the
+last actual row and the first forecast row win. NaN marks months a chart has
+no row for.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.downsample import lttb
+
+
+def month_axis(*month_lists: Sequence[str]) -> np.ndarray:
+    """Sorted union of 'YYYY-MM' months."""
+    months = [month for months in month_lists for month in months]
+    return np.unique(np.array(months, dtype=str)) if months else np.array([], dtype=str)
+
+
+def stitch(
+    axis: np.ndarray,
+    chart_codes: np.ndarray,
+    months: Sequence[str],
+    is_actual: np.ndarray,
+    qty: np.ndarray,
+    n_charts: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Place rows on the month axis and stitch each chart's lines.
+
+    Args:
+        axis: Month axis from month_axis()
+        chart_codes: Chart index per row
+        months: Month per row
+        is_actual: Whether each row is an actual (else a forecast)
+        qty: Quantity per row (None already mapped to 0)
+        n_charts: Number of charts
+
+    Returns:
+        (actual, forecast) float matrices of shape (n_charts, len(axis))
+    """
+    shape = (n_charts, len(axis))
+    actual = np.full(shape, np.nan)
+    forecast = np.full(shape, np.nan)
+    if len(qty) == 0:
+        return actual, forecast
+
+    month_index = np.searchsorted(axis, np.asarray(months, dtype=str))
+    cells = chart_codes * shape[1] + month_index
+    rows = _one_row_per_cell(cells, np.flatnonzero(is_actual), keep_last=True)
+    actual[chart_codes[rows], month_index[rows]] = qty[rows]
+    rows = _one_row_per_cell(cells, np.flatnonzero(~is_actual), keep_last=False)
+    forecast[chart_codes[rows], month_index[rows]] = qty[rows]
+
+    has_actual = ~np.isnan(actual)
+    forecast[has_actual] = np.nan
+
+    # Join the lines at each chart's last actual month
+    charts = np.flatnonzero(has_actual.any(axis=1))
+    last = shape[1] - 1 - np.argmax(has_actual[charts, ::-1], axis=1)
+    forecast[charts, last] = actual[charts, last]
+    return actual, forecast
+
+
+def _one_row_per_cell(cells: np.ndarray, rows: np.ndarray, keep_last: bool) -> np.ndarray:
+    """``rows`` with one row per matrix cell, the last or first of duplicates."""
+    if keep_last:
+        _, first = np.unique(cells[rows][::-1], return_index=True)
+        return rows[len(rows) - 1 - first]
+    _, first = np.unique(cells[rows], return_index=True)
+    return rows[first]
+
+
+def series_matrix(
+    axis: np.ndarray,
+    names: Sequence[Any],
+    row_types: Sequence[str],
+    months: Sequence[str],
+    qty: Sequence[Optional[float]],
+    historical: str = 'Historical'
+) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """
+    Charts from per-row series data, one per distinct name in first-seen order.
+
+    Returns:
+        (chart names, actual matrix, forecast matrix)
+    """
+    chart_names = list(dict.fromkeys(names))
+    codes = {name: i for i, name in enumerate(chart_names)}
+    actual, forecast = stitch(
+        axis,
+        np.fromiter((codes[name] for name in names), dtype=np.int64, count=len(names)),
+        months,
+        np.array([row_type == historical for row_type in row_types], dtype=bool),
+        np.array([value or 0 for value in qty], dtype=float),
+        len(chart_names)
+    )
+    return chart_names, actual, forecast
+
+
+def to_column(values: np.ndarray) -> List[Optional[float]]:
+    """Matrix row as a JSON-ready list, NaN as None."""
+    return [None if value != value else value for value in values.tolist()]
+
+
+def to_points(axis: np.ndarray, actual: np.ndarray, forecast: np.ndarray) -> List[Dict[str, Any]]:
+    """One chart as per-month points, keeping only months it has rows for."""
+    present = ~(np.isnan(actual) & np.isnan(forecast))
+    return [
+        {"month": month, "actual": a, "forecast": f}
+        for month, a, f in zip(
+            axis[present].tolist(), to_column(actual[present]), to_column(forecast[present])
+        )
+    ]
+
+
+def downsample(axis: np.ndarray, actual: np.ndarray, forecast: np.ndarray, points: int) -> np.ndarray:
+    """
+    Axis indices that keep one chart's shape in about ``points`` points.
+
+    The actual and forecast lines are reduced separately with LTTB, each
+    getting a share of the budget proportional to its length; both lines'
+    end points (and so the stitch month) are always kept.
+    """
+    lines = [np.flatnonzero(~np.isnan(values)) for values in (actual, forecast)]
+    total = sum(len(line) for line in lines)
+    if total <= points:
+        return np.arange(len(axis))
+
+    # Months as ordinals so gaps in the axis keep their width
+    x = np.array([int(month[:4]) * 12 + int(month[5:7]) for month in axis.tolist()], dtype=float)
+    keep = []
+    for line, values in zip(lines, (actual, forecast)):
+        if len(line) == 0:
+            continue
+        share = max(round(points * len(line) / total), min(len(line), 3))
+        keep.append(line[lttb(x[line], values[line], share)])
+    return np.unique(np.concatenate(keep))
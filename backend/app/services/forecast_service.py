@@ -1,17 +1,54 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Callable, AsyncContextManager, Awaitable, Tuple
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.forecast_repository import ForecastRepository
+from app.services import forecast_series
 from app.schemas.forecast import ForecastChart, ChartPoint, ForecastResponse
 from app.utils.exceptions import ValidationError
-from starlette.concurrency import run_in_threadpool
 from collections import defaultdict
 
+logger = logging.getLogger(__name__)
+
 class ForecastService:
-    def __init__(self, db: AsyncSession):
-        self.repository = ForecastRepository(db)
+    def __init__(
+        self,
+        db: Optional[AsyncSession] = None,
+        session_maker: Optional[Callable[[], AsyncContextManager[AsyncSession]]] = None
+    ):
+        """
+        Args:
+            db: Session shared by every query (branches then run one after another)
+            session_maker: Opens a session per branch so the global, item and
+                territory queries run concurrently
+        """
+        self.repository = ForecastRepository(db) if db is not None else None
+        self.session_maker = session_maker
+
+    async def _gather(self, *branches: Callable[[ForecastRepository], Awaitable[Any]]) -> List[Any]:
+        """Run repository branches, concurrently when each can have its own session."""
+        if self.session_maker is None:
+            return [await branch(self.repository) for branch in branches]
+
+        async def run(branch):
+            async with self.session_maker() as session:
+                return await branch(ForecastRepository(session))
 
-    async def get_sales_forecast(self, unit_id: Optional[str] = None) -> ForecastResponse:
+        return list(await asyncio.gather(*(run(branch) for branch in branches)))
+
+    async def get_sales_forecast(self, unit_id: Optional[str] = None, columnar: bool = False) -> Any:
+        """
+        Global, top item and top territory forecast charts.
+
+        Args:
+            columnar: Return plain dicts with one shared ``months`` axis and
+                per-chart ``actual``/``forecast`` arrays instead of a
+                ForecastResponse of per-month points
+        """
         if not unit_id:
+            if columnar:
+                return self._columnar(np.array([], dtype=str), [], [], [], None)
             return ForecastResponse(
                 global_chart=[],
                 items_charts=[],
@@ -19,95 +56,162 @@ class ForecastService:
                 unit_id=None
             )
 
-        # Ensure unit_id is int if possible
-        unit_id_val = None
-        if unit_id:
-            try:
-                unit_id_val = int(unit_id)
-            except ValueError:
-                pass
-
-        # 1. Global Chart
-        global_data = await self.repository.get_global_forecast(unit_id_val)
-        global_chart = self._merge_data(global_data["actuals"], global_data["forecast"])
-        
-        # 2. Items Charts
-        top_items = await self.repository.get_top_items(unit_id_val, limit=50) # Limit reasonable number
-        items_chart_data = []
-        if top_items:
-            bulk_item_data = await self.repository.get_item_data_bulk(top_items, unit_id_val)
-            # Organize by Item
-            item_map = defaultdict(lambda: {"actuals": [], "forecast": []})
-            for row in bulk_item_data:
-                # Row: name, type, month, qty
-                name, row_type, month, qty = row[0], row[1], row[2], float(row[3] or 0)
-                if row_type == 'Historical':
-                    item_map[name]["actuals"].append((month, qty))
-                else:
-                    item_map[name]["forecast"].append((month, qty))
-            
-            for name in top_items:
-                if name in item_map:
-                    merged = self._merge_data(item_map[name]["actuals"], item_map[name]["forecast"])
-                    items_chart_data.append(ForecastChart(name=name, chart=merged))
-        
-        # 3. Territories Charts
-        top_terrs = await self.repository.get_top_territories(unit_id_val, limit=50)
-        terrs_chart_data = []
-        if top_terrs:
-            bulk_terr_data = await self.repository.get_territory_data_bulk(top_terrs, unit_id_val)
-            terr_map = defaultdict(lambda: {"actuals": [], "forecast": []})
-            for row in bulk_terr_data:
-                name, row_type, month, qty = row[0], row[1], row[2], float(row[3] or 0)
-                if row_type == 'Historical':
-                    terr_map[name]["actuals"].append((month, qty))
-                else:
-                    terr_map[name]["forecast"].append((month, qty))
-            
-            for name in top_terrs:
-                 if name in terr_map:
-                    merged = self._merge_data(terr_map[name]["actuals"], terr_map[name]["forecast"])
-                    terrs_chart_data.append(ForecastChart(name=name, chart=merged))
+        unit_id_val = self._parse_unit_id(unit_id)
+
+        global_data, item_rows, terr_rows = await self._gather(
+            lambda repo: repo.get_global_forecast(unit_id_val),
+            lambda repo: repo.get_top_series("item", unit_id_val, limit=50),
+            lambda repo: self._optional(repo.get_top_series("territory", unit_id_val, limit=50), "territory"),
+        )
+
+        # Global rows in the (rank, name, type, month, qty) shape of the series rows
+        global_rows = self._global_rows(global_data)
+        axis = forecast_series.month_axis(
+            [row[3] for row in global_rows], [row[3] for row in item_rows], [row[3] for row in terr_rows]
+        )
+        global_charts = self._series_matrix(axis, global_rows)
+        items = self._series_matrix(axis, item_rows)
+        territories = self._series_matrix(axis, terr_rows)
+
+        if columnar:
+            return self._columnar(axis, global_charts, items, territories, unit_id)
+
+        def points(actual, forecast) -> List[ChartPoint]:
+            # Values come from the database already typed: skip per-point validation
+            return [ChartPoint.model_construct(**point) for point in forecast_series.to_points(axis, actual, forecast)]
 
         return ForecastResponse(
-            global_chart=global_chart,
-            items_charts=items_chart_data,
-            territories_charts=terrs_chart_data,
+            global_chart=points(*global_charts[0][1:]) if global_charts else [],
+            items_charts=[ForecastChart.model_construct(name=name, chart=points(a, f)) for name, a, f in items],
+            territories_charts=[ForecastChart.model_construct(name=name, chart=points(a, f)) for name, a, f in territories],
             unit_id=unit_id
         )
 
-    def _merge_data(self, actual_rows: List, forecast_rows: List) -> List[ChartPoint]:
-        data_map = {}
-        
-        # Track the last actual point to stitch the lines
-        last_actual_month = None
-        last_actual_qty = None
-        
-        # Ensure actuals are sorted
-        sorted_actuals = sorted(actual_rows, key=lambda x: x[0])
-        
-        # First pass: Add all actual data
-        for row in sorted_actuals:
-            m, qty = row[0], float(row[1] or 0)
-            data_map[m] = {"month": m, "actual": qty, "forecast": None}
-            last_actual_month = m
-            last_actual_qty = qty
-            
-        # Second pass: Add forecast data ONLY for months without actual data
-        for row in forecast_rows:
-            m, qty = row[0], float(row[1] or 0)
-            # Only add forecast if this month doesn't have actual data
-            if m not in data_map:
-                data_map[m] = {"month": m, "actual": None, "forecast": qty}
-        
-        # Stitch the lines: Add forecast value to the last actual month for smooth transition
-        if last_actual_month and last_actual_qty is not None:
-            # Only add stitching point if it's still None (no forecast data for that month)
-            if data_map[last_actual_month]["forecast"] is None:
-                 data_map[last_actual_month]["forecast"] = last_actual_qty
-        
-        sorted_keys = sorted(data_map.keys())
-        return [ChartPoint(**data_map[k]) for k in sorted_keys]
+    @staticmethod
+    def _series_matrix(axis, rows: List) -> List[Tuple[Any, Any, Any]]:
+        """(name, actual, forecast) per chart from (rank, name, type, month, qty) rows, in rank order."""
+        if not rows:
+            return []
+        _, names, row_types, months, qty = zip(*rows)
+        chart_names, actual, forecast = forecast_series.series_matrix(axis, names, row_types, months, qty)
+        return list(zip(chart_names, actual, forecast))
+
+    @staticmethod
+    def _columnar(axis, global_charts: List, items: List, territories: List, unit_id: Optional[str]) -> Dict[str, Any]:
+        def chart(actual, forecast) -> Dict[str, Any]:
+            return {"actual": forecast_series.to_column(actual), "forecast": forecast_series.to_column(forecast)}
+
+        return {
+            "format": "columnar",
+            "months": axis.tolist(),
+            "global_chart": chart(*global_charts[0][1:]) if global_charts else None,
+            "items_charts": [{"name": name, **chart(a, f)} for name, a, f in items],
+            "territories_charts": [{"name": name, **chart(a, f)} for name, a, f in territories],
+            "unit_id": unit_id
+        }
+
+    async def get_forecast_overview(
+        self,
+        unit_id: Optional[str] = None,
+        limit: int = 50,
+        points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Global chart plus the top items and territories with totals only.
+
+        Per-entity series are fetched on demand with get_entity_forecast.
+        """
+        if not unit_id:
+            return {"global_chart": [], "items": [], "territories": [], "unit_id": None}
+        unit_id_val = self._parse_unit_id(unit_id)
+
+        global_data, items, territories = await self._gather(
+            lambda repo: repo.get_global_forecast(unit_id_val),
+            lambda repo: repo.get_top_entities("item", unit_id_val, limit),
+            lambda repo: self._optional(repo.get_top_entities("territory", unit_id_val, limit), "territory"),
+        )
+        return {
+            "global_chart": self._chart_points(self._global_rows(global_data), points),
+            "items": [self._entity_summary(row) for row in items],
+            "territories": [self._entity_summary(row) for row in territories],
+            "unit_id": unit_id
+        }
+
+    async def get_forecast_entities(self, dimension: str, unit_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Top names of a dimension ("item" or "territory") with totals."""
+        if not unit_id:
+            return []
+        rows, = await self._gather(
+            lambda repo: repo.get_top_entities(dimension, self._parse_unit_id(unit_id), limit)
+        )
+        return [self._entity_summary(row) for row in rows]
+
+    async def get_entity_forecast(
+        self,
+        dimension: str,
+        name: str,
+        unit_id: Optional[str] = None,
+        points: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        One item's or territory's chart.
+
+        Args:
+            points: Downsample the chart to about this many points (LTTB)
+        """
+        # Like the other forecast views, nothing is summed across units
+        if not unit_id:
+            return {"name": name, "chart": []}
+        rows, = await self._gather(
+            lambda repo: repo.get_entity_series(dimension, name, self._parse_unit_id(unit_id))
+        )
+        return {"name": name, "chart": self._chart_points(rows, points)}
+
+    def _chart_points(self, rows: List, points: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stitched points of a single chart from series rows, optionally downsampled."""
+        axis = forecast_series.month_axis([row[3] for row in rows])
+        charts = self._series_matrix(axis, rows)
+        if not charts:
+            return []
+        _, actual, forecast = charts[0]
+        if points:
+            keep = forecast_series.downsample(axis, actual, forecast, points)
+            axis, actual, forecast = axis[keep], actual[keep], forecast[keep]
+        return forecast_series.to_points(axis, actual, forecast)
+
+    @staticmethod
+    def _global_rows(global_data: Dict[str, List]) -> List[Tuple]:
+        # Global rows in the (rank, name, type, month, qty) shape of the series rows
+        rows = [(1, "Total", "Historical", month, qty) for month, qty in global_data["actuals"]]
+        rows += [(1, "Total", "Forecasted", month, qty) for month, qty in global_data["forecast"]]
+        return rows
+
+    @staticmethod
+    def _entity_summary(row) -> Dict[str, Any]:
+        return {
+            "rank": int(row.rank),
+            "name": row.name,
+            "actual_qty": float(row.actual_qty or 0),
+            "forecast_qty": float(row.forecast_qty or 0),
+            "months": int(row.months or 0)
+        }
+
+    @staticmethod
+    def _parse_unit_id(unit_id: Optional[str]) -> Optional[int]:
+        # Ensure unit_id is int if possible
+        try:
+            return int(unit_id) if unit_id else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    async def _optional(query: Awaitable[Any], label: str) -> Any:
+        # Territory forecasts are optional: the page renders without them
+        try:
+            return await query
+        except Exception as e:
+            logger.warning(f"{label} forecast unavailable: {e}")
+            return []
 
     async def generate_insights(self, unit_id: Optional[str], core_engine: Any) -> Dict[str, Any]:
         # Generating insights with auto-reload check
@@ -117,46 +221,27 @@ class ForecastService:
         if not unit_id:
             return {"analysis": "Please select a Business Unit to view forecast insights."}
             
-        # Ensure unit_id is int if possible
-        unit_id_val = None
-        if unit_id:
-            try:
-                unit_id_val = int(unit_id)
-            except ValueError:
-                pass
+        unit_id_val = self._parse_unit_id(unit_id)
         
         # 1. Fetch Forecast Data
-        repo_data = await self.repository.get_global_forecast(unit_id_val)
-        forecast_rows = repo_data["forecast"]
-        total_forecast = [{"month": r[0], "qty": float(r[1])} for r in forecast_rows]
-        
+        repo_data, item_rows, terr_rows = await self._gather(
+            lambda repo: repo.get_global_forecast(unit_id_val),
+            lambda repo: repo.get_top_series("item", unit_id_val, limit=5),
+            lambda repo: self._optional(repo.get_top_series("territory", unit_id_val, limit=5), "territory"),
+        )
+        total_forecast = [{"month": r[0], "qty": float(r[1] or 0)} for r in repo_data["forecast"]]
 
-        top_items_names = await self.repository.get_top_items(unit_id_val, limit=5)
-        top_territories_names = await self.repository.get_top_territories(unit_id_val, limit=5)
-        
-        top_items = []
-        if top_items_names:
-            bulk_item = await self.repository.get_item_data_bulk(top_items_names, unit_id_val)
-            # Aggregate per item
-            item_agg = defaultdict(float)
-            for row in bulk_item:
-                 if row[1] == 'Forecast': # Type
-                     item_agg[row[0]] += float(row[3] or 0)
-            top_items = [{"name": k, "qty": v} for k, v in item_agg.items()]
-            top_items.sort(key=lambda x: x['qty'], reverse=True)
-            
-        top_territories = []
-        if top_territories_names:
-            bulk_terr = await self.repository.get_territory_data_bulk(top_territories_names, unit_id_val)
-            terr_agg = defaultdict(float)
-            for row in bulk_terr:
-                 if row[1] == 'Forecast':
-                     terr_agg[row[0]] += float(row[3] or 0)
-            top_territories = [{"name": k, "qty": v} for k, v in terr_agg.items()]
-            top_territories.sort(key=lambda x: x['qty'], reverse=True)
+        # 2. Forecast totals per top item / territory
+        top_items = self._forecast_totals(item_rows)
+        top_territories = self._forecast_totals(terr_rows)
 
         # 3. Call AI Core
-        return await run_in_threadpool(
-            core_engine.analyze_forecast_ceo,
-            total_forecast, top_items, top_territories
-        ) 
+        return await core_engine.aanalyze_forecast_ceo(total_forecast, top_items, top_territories)
+
+    @staticmethod
+    def _forecast_totals(rows: List) -> List[Dict[str, Any]]:
+        totals = defaultdict(float)
+        for row in rows:
+            if row[2] != 'Historical':
+                totals[row[1]] += float(row[4] or 0)
+        return sorted(({"name": k, "qty": v} for k, v in totals.items()), key=lambda x: x['qty'], reverse=True)
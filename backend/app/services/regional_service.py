@@ -38,6 +38,16 @@ class RegionalService:
         start_date, end_date = self._get_date_range(year, month)
         return await self.repository.get_area_performance(start_date, end_date, unit_id)
 
+    async def get_geo_performance(
+        self,
+        unit_id: Optional[int] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Region, area and territory performance from one shared scan."""
+        start_date, end_date = self._get_date_range(year, month)
+        return await self.repository.get_geo_performance(start_date, end_date, unit_id)
+
     def _get_date_range(self, year: Optional[int], month: Optional[int]):
         # Date Logic (replicated from api_legacy.py)
         today = date.today()
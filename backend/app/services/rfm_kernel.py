@@ -0,0 +1,148 @@
+"""
+NumPy RFM scoring kernel.
+
+Same results as RFMService.calculate_rfm + get_segment_summary (pandas):
+average-tie percentile ranks, the 25/30/45 weighted score scaled to 0-5,
+right-closed segment bins and values rounded to 2 decimals, built from
+whole-array operations instead of per-row pandas work. It is CPU-bound
+and synchronous; callers run it off the event loop (run_in_threadpool).
+"""
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+SEGMENTS = ('Inactive', 'Occasional', 'Silver', 'Gold', 'Platinum')
+# pd.cut bins [0, 1.6, 3.0, 4.0, 4.5, 5.0] with include_lowest=True
+SEGMENT_EDGES = np.array([1.6, 3.0, 4.0, 4.5])
+SCORE_RANGE = (0.0, 5.0)
+WEIGHTS = {'R': 0.25, 'F': 0.30, 'M': 0.45}
+# Highest segment first in the summary
+SEGMENT_ORDER = SEGMENTS[::-1]
+
+
+def pct_rank(values: np.ndarray, descending: bool = False) -> np.ndarray:
+    """Percentile rank in (0, 1], ties get their average rank (pandas rank(pct=True))."""
+    n = len(values)
+    if n == 0:
+        return np.empty(0)
+    keys = -values if descending else values
+    order = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+
+    new_group = np.empty(n, dtype=bool)
+    new_group[0] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=new_group[1:])
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], n)
+    # 1-based positions start+1 .. end share their mean
+    average_rank = (starts + 1 + ends) / 2.0
+
+    ranks = np.empty(n)
+    ranks[order] = average_rank[np.cumsum(new_group) - 1]
+    return ranks / n
+
+
+def segment_codes(scores: np.ndarray) -> np.ndarray:
+    """Index into SEGMENTS per score; -1 outside the 0-5 range."""
+    codes = np.searchsorted(SEGMENT_EDGES, scores, side='left')
+    codes[(scores < SCORE_RANGE[0]) | (scores > SCORE_RANGE[1]) | np.isnan(scores)] = -1
+    return codes
+
+
+def score_customers(
+    customer_ids: Sequence[Any],
+    customer_names: Sequence[Any],
+    recency: np.ndarray,
+    frequency: np.ndarray,
+    monetary: np.ndarray
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Score, segment and summarize customers.
+
+    Returns:
+        (customer records, segment summary) shaped like the pandas
+        implementation's to_dict('records') output
+    """
+    if len(recency) == 0:
+        return [], []
+
+    recency = np.asarray(recency, dtype=float)
+    frequency = np.asarray(frequency, dtype=float)
+    monetary = np.asarray(monetary, dtype=float)
+
+    r_norm = pct_rank(recency, descending=True) * 100
+    f_norm = pct_rank(frequency) * 100
+    m_norm = pct_rank(monetary) * 100
+    scores = (WEIGHTS['R'] * r_norm + WEIGHTS['F'] * f_norm + WEIGHTS['M'] * m_norm) * 0.05
+    codes = segment_codes(scores)
+
+    # Displayed (and summarized) values are rounded like DataFrame.round(2)
+    monetary_r = np.round(monetary, 2)
+    scores_r = np.round(scores, 2)
+    labels = np.array(SEGMENTS + (None,), dtype=object)[codes]
+
+    customers = [
+        {
+            'customer_id': cid,
+            'customer_name': name,
+            'Recency': r,
+            'Frequency': f,
+            'Monetary': m,
+            'R_rank_norm': rn,
+            'F_rank_norm': fn,
+            'M_rank_norm': mn,
+            'RFM_Score': s,
+            'Customer_segment': label,
+        }
+        for cid, name, r, f, m, rn, fn, mn, s, label in zip(
+            list(customer_ids),
+            list(customer_names),
+            np.round(recency, 2).astype(np.int64).tolist(),
+            np.round(frequency, 2).astype(np.int64).tolist(),
+            monetary_r.tolist(),
+            np.round(r_norm, 2).tolist(),
+            np.round(f_norm, 2).tolist(),
+            np.round(m_norm, 2).tolist(),
+            scores_r.tolist(),
+            labels.tolist(),
+        )
+    ]
+
+    return customers, summarize_segments(codes, frequency, monetary_r, scores_r)
+
+
+def summarize_segments(
+    codes: np.ndarray,
+    frequency: np.ndarray,
+    monetary: np.ndarray,
+    scores: np.ndarray
+) -> List[Dict[str, Any]]:
+    """Per-segment counts, orders, volume and mean score via bincount."""
+    valid = codes >= 0
+    k = len(SEGMENTS)
+    counts = np.bincount(codes[valid], minlength=k)
+    orders = np.bincount(codes[valid], weights=frequency[valid], minlength=k)
+    volume = np.bincount(codes[valid], weights=monetary[valid], minlength=k)
+    score_sum = np.bincount(codes[valid], weights=scores[valid], minlength=k)
+
+    total_customers = counts.sum()
+    total_volume = volume.sum()
+
+    summary = []
+    for segment in SEGMENT_ORDER:
+        i = SEGMENTS.index(segment)
+        summary.append({
+            'segment': segment,
+            'customer_count': int(counts[i]),
+            'total_orders': int(orders[i]),
+            'total_volume': _round2(volume[i]),
+            'avg_rfm_score': _round2(score_sum[i] / counts[i]) if counts[i] else None,
+            'customer_percentage': _round2(counts[i] / total_customers * 100) if total_customers else None,
+            'volume_percentage': _round2(volume[i] / total_volume * 100) if total_volume else None,
+        })
+    return summary
+
+
+def _round2(value: float) -> float:
+    # np.round, not round(): matches the pandas implementation's rounding
+    return float(np.round(value, 2))
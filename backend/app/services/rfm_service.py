@@ -1,29 +1,103 @@
-from typing import Dict, List, Any, Optional
+import asyncio
+import math
+from dataclasses import dataclass, field
+from typing import AsyncContextManager, Callable, Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from core.config import settings
+from app.repositories.rfm_history_repository import LOST_SEGMENT, NEW_SEGMENT, RFMHistoryRepository
 from app.repositories.rfm_repository import RFMRepository
+from app.schemas.common import PaginatedResponse
+from app.services import rfm_kernel
+from app.utils.cache import LocalLRUCache
+from app.utils.exceptions import NotFoundError, ValidationError
+
+# Public sort keys -> customer record fields
+SORT_FIELDS = {
+    'rfm_score': 'RFM_Score',
+    'recency': 'Recency',
+    'frequency': 'Frequency',
+    'monetary': 'Monetary',
+    'customer_name': 'customer_name',
+}
+
+# Scored populations per (unit, date range), shared by every page of a listing
+_snapshots = LocalLRUCache(maxsize=settings.RFM_SNAPSHOT_CACHE_SIZE, ttl=settings.RFM_SNAPSHOT_TTL_SECONDS)
+# Computations in flight per snapshot key: (lock, requests holding or awaiting it).
+# Entries are dropped once the last request leaves, so the dict stays small.
+_snapshot_locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+
+@dataclass
+class RFMSnapshot:
+    """Scored customers of one analysis, with memoized listing orders."""
+    customers: List[Dict[str, Any]]
+    segment_summary: List[Dict[str, Any]]
+    metadata: Dict[str, Any]
+    _orders: Dict[Tuple[Optional[str], Optional[str], bool], np.ndarray] = field(default_factory=dict, repr=False)
+
+    def select(self, segment: Optional[str] = None, sort_by: Optional[str] = None, descending: bool = True) -> np.ndarray:
+        """Indices of the matching customers in listing order (computed once per view)."""
+        key = (segment, sort_by, descending)
+        order = self._orders.get(key)
+        if order is not None:
+            return order
+
+        n = len(self.customers)
+        if sort_by is None:
+            order = np.arange(n)
+        elif SORT_FIELDS[sort_by] == 'customer_name':
+            order = np.array(
+                sorted(range(n), key=lambda i: str(self.customers[i]['customer_name']), reverse=descending),
+                dtype=np.int64
+            )
+        else:
+            values = np.fromiter((c[SORT_FIELDS[sort_by]] for c in self.customers), dtype=float, count=n)
+            order = np.argsort(-values if descending else values, kind='stable')
+
+        if segment:
+            segments = np.array([c['Customer_segment'] for c in self.customers], dtype=object)
+            order = order[segments[order] == segment]
+
+        self._orders[key] = order
+        return order
+
+
 class RFMService:
     """Service for RFM analysis business logic"""
     
-    def __init__(self, db: AsyncSession):
-        self.repository = RFMRepository(db)
+    def __init__(
+        self,
+        db: Optional[AsyncSession] = None,
+        session_maker: Optional[Callable[[], AsyncContextManager[AsyncSession]]] = None
+    ):
+        """
+        Args:
+            db: Session shared by every query
+            session_maker: Opens a session only when a snapshot has to be
+                computed, so snapshot hits never hold a session or an
+                admission slot
+        """
+        self.repository = RFMRepository(db) if db is not None else None
+        self.history = RFMHistoryRepository(db) if db is not None else None
+        self.session_maker = session_maker
     
-    def calculate_rfm(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate RFM metrics for all customers"""
-        if df.empty:
-            return pd.DataFrame()
+    def calculate_rfm(self, rfm_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Score and segment customers (pandas reference implementation; the
+        API uses the equivalent rfm_kernel off the event loop).
         
-        df['delivery_date'] = pd.to_datetime(df['delivery_date'])
-        
-        reference_date = df['delivery_date'].max() + timedelta(days=1)
+        Args:
+            rfm_df: One row per customer with Recency, Frequency and Monetary
+                    (see RFMRepository.get_customer_aggregates)
+        """
+        if rfm_df.empty:
+            return pd.DataFrame()
         
-        rfm_df = df.groupby(['customer_id', 'customer_name']).agg(
-            Recency=('delivery_date', lambda x: (reference_date - x.max()).days),
-            Frequency=('delivery_date', 'count'),
-            Monetary=('monetary', 'sum')
-        ).reset_index()
+        rfm_df = rfm_df.copy()
         
         # Calculate rank percentiles (normalized scores 0-100)
         rfm_df['R_rank_norm'] = rfm_df['Recency'].rank(pct=True, ascending=False) * 100
@@ -51,7 +125,7 @@ class RFMService:
         return rfm_df
     
     def get_segment_summary(self, rfm_df: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Get summary statistics by customer segment"""
+        """Get summary statistics by customer segment (pandas reference implementation)"""
         if rfm_df.empty:
             return []
         
@@ -93,17 +167,137 @@ class RFMService:
         self, 
         unit_id: Optional[int] = None,
         start_date: Optional[str] = None, 
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        segment: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True
     ) -> Dict[str, Any]:
         """Get complete RFM analysis with all metrics"""
-        # Get transaction data
-        df = await self.repository.get_customer_transactions(unit_id, start_date, end_date)
+        snapshot = await self.get_snapshot(unit_id, start_date, end_date)
+        customers = snapshot.customers
+        if segment or sort_by:
+            order = await run_in_threadpool(snapshot.select, segment, sort_by, descending)
+            customers = [customers[i] for i in order.tolist()]
+        return {
+            'customers': customers,
+            'segment_summary': snapshot.segment_summary,
+            'metadata': snapshot.metadata
+        }
+    
+    async def get_rfm_page(
+        self,
+        page: int,
+        page_size: int,
+        unit_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        segment: Optional[str] = None,
+        sort_by: Optional[str] = None,
+        descending: bool = True
+    ) -> PaginatedResponse[Dict[str, Any]]:
+        """One page of scored customers, served from the cached snapshot"""
+        snapshot = await self.get_snapshot(unit_id, start_date, end_date)
+        order = await run_in_threadpool(snapshot.select, segment, sort_by, descending)
+        offset = (page - 1) * page_size
+        return PaginatedResponse[Dict[str, Any]](
+            data=[snapshot.customers[i] for i in order[offset:offset + page_size].tolist()],
+            total=len(order),
+            page=page,
+            page_size=page_size,
+            total_pages=math.ceil(len(order) / page_size)
+        )
+    
+    async def get_rfm_overview(
+        self,
+        unit_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Segment summary and metadata without the customer rows"""
+        snapshot = await self.get_snapshot(unit_id, start_date, end_date)
+        return {
+            'segment_summary': snapshot.segment_summary,
+            'metadata': snapshot.metadata
+        }
+    
+    async def get_snapshot(
+        self,
+        unit_id: Optional[int] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> RFMSnapshot:
+        """Scored population for a unit and date range, computed once per worker per TTL"""
+        key = f"{unit_id}:{start_date}:{end_date}"
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            return snapshot
+        
+        # Concurrent requests for the same analysis wait for one computation
+        lock, users = _snapshot_locks.get(key, (None, 0))
+        lock = lock or asyncio.Lock()
+        _snapshot_locks[key] = (lock, users + 1)
+        try:
+            async with lock:
+                snapshot = _snapshots.get(key)
+                if snapshot is None:
+                    snapshot = await self._compute_snapshot(unit_id, start_date, end_date)
+                    _snapshots.set(key, snapshot)
+        finally:
+            lock, users = _snapshot_locks[key]
+            if users > 1:
+                _snapshot_locks[key] = (lock, users - 1)
+            else:
+                del _snapshot_locks[key]
+        return snapshot
+    
+    async def score_aggregates(self, df: pd.DataFrame) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Score and segment per-customer aggregates with the RFM kernel.
+
+        Shared by snapshots and the monthly history job so both segment alike.
+        Runs in a worker thread so the event loop stays responsive.
+        """
+        return await run_in_threadpool(
+            rfm_kernel.score_customers,
+            df['customer_id'].tolist(),
+            df['customer_name'].tolist(),
+            df['Recency'].to_numpy(),
+            df['Frequency'].to_numpy(),
+            df['Monetary'].to_numpy()
+        )
+    
+    async def _fetch_snapshot_inputs(
+        self,
+        unit_id: Optional[int],
+        start_date: Optional[str],
+        end_date: Optional[str]
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Customer aggregates and summary stats; the session is released before scoring."""
+        async def fetch(repository: RFMRepository) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+            df = await repository.get_customer_aggregates(unit_id, start_date, end_date)
+            if df.empty:
+                return df, {}
+            return df, await repository.get_rfm_summary(unit_id, start_date, end_date)
+        
+        if self.session_maker is None:
+            return await fetch(self.repository)
+        async with self.session_maker() as session:
+            return await fetch(RFMRepository(session))
+    
+    async def _compute_snapshot(
+        self, 
+        unit_id: Optional[int] = None,
+        start_date: Optional[str] = None, 
+        end_date: Optional[str] = None
+    ) -> RFMSnapshot:
+        # Per-customer aggregates, computed in the database
+        df, summary = await self._fetch_snapshot_inputs(unit_id, start_date, end_date)
         
         if df.empty:
-            return {
-                'customers': [],
-                'segment_summary': [],
-                'metadata': {
+            return RFMSnapshot(
+                customers=[],
+                segment_summary=[],
+                metadata={
                     'total_customers': 0,
                     'total_transactions': 0,
                     'total_volume': 0,
@@ -114,24 +308,14 @@ class RFMService:
                         'end': end_date
                     }
                 }
-            }
-        
-        # Calculate RFM
-        rfm_df = self.calculate_rfm(df)
-        
-        # Get segment summary
-        segment_summary = self.get_segment_summary(rfm_df)
-        
-        # Get summary stats
-        summary = await self.repository.get_rfm_summary(unit_id, start_date, end_date)
+            )
         
-        # Convert DataFrame to list of dicts
-        customers = rfm_df.to_dict('records')
+        customers, segment_summary = await self.score_aggregates(df)
         
-        return {
-            'customers': customers,
-            'segment_summary': segment_summary,
-            'metadata': {
+        return RFMSnapshot(
+            customers=customers,
+            segment_summary=segment_summary,
+            metadata={
                 'total_customers': len(customers),
                 'total_transactions': summary.get('total_transactions', 0),
                 'total_volume': summary.get('total_volume', 0),
@@ -142,4 +326,100 @@ class RFMService:
                     'end': summary.get('latest_date') if not end_date else end_date
                 }
             }
-        }
\ No newline at end of file
+        )
+    
+    async def get_segment_transitions(
+        self,
+        unit_id: int,
+        from_month: Optional[str] = None,
+        to_month: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Segment migration matrix between two stored months (default: the latest two).
+        
+        Rows are the segment in from_month, columns the segment in to_month;
+        "New" and "Lost" count customers present in only one of the months.
+        """
+        from_date = self._parse_month(from_month) if from_month else None
+        to_date = self._parse_month(to_month) if to_month else None
+        if from_date is not None and to_date is not None and from_date >= to_date:
+            raise ValidationError("from_month must be before to_month")
+        
+        stored = await self.history.get_stored_months(unit_id)
+        for month in (from_date, to_date):
+            if month is not None and month not in stored:
+                raise NotFoundError(f"No stored RFM history for unit {unit_id} in {month:%Y-%m}")
+        to_date = to_date or (stored[-1] if stored else None)
+        earlier = [month for month in stored if to_date and month < to_date]
+        from_date = from_date or (earlier[-1] if earlier else None)
+        if from_date is None or to_date is None:
+            raise NotFoundError(f"Not enough stored RFM history for unit {unit_id}")
+        if from_date >= to_date:
+            raise ValidationError("from_month must be before to_month")
+        
+        rows = await self.history.get_transitions(unit_id, from_date, to_date)
+        
+        segments = list(rfm_kernel.SEGMENT_ORDER)
+        matrix = {
+            source: dict.fromkeys(segments + [LOST_SEGMENT], 0)
+            for source in segments + [NEW_SEGMENT]
+        }
+        for row in rows:
+            if row.from_segment in matrix and row.to_segment in matrix[row.from_segment]:
+                matrix[row.from_segment][row.to_segment] = int(row.customers)
+        
+        transitions = sorted(
+            (
+                {'from': source, 'to': target, 'customers': count}
+                for source, targets in matrix.items()
+                for target, count in targets.items()
+                if count and source != target
+            ),
+            key=lambda t: t['customers'],
+            reverse=True
+        )
+        return {
+            'unit_id': unit_id,
+            'from_month': from_date.strftime('%Y-%m'),
+            'to_month': to_date.strftime('%Y-%m'),
+            'matrix': matrix,
+            'transitions': transitions,
+            'retained': sum(matrix[segment][segment] for segment in segments),
+            'moved': sum(matrix[source][target] for source in segments for target in segments if source != target),
+            'new': sum(matrix[NEW_SEGMENT].values()),
+            'lost': sum(matrix[segment][LOST_SEGMENT] for segment in segments)
+        }
+    
+    async def get_customer_segment_history(
+        self,
+        customer_id: str,
+        unit_id: Optional[int] = None,
+        start_month: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Stored monthly segment, score and RFM inputs of one customer"""
+        rows = await self.history.get_customer_history(
+            customer_id, unit_id, self._parse_month(start_month) if start_month else None
+        )
+        return {
+            'customer_id': customer_id,
+            'history': [
+                {
+                    'unit_id': row.unit_id,
+                    'month': row.month.strftime('%Y-%m'),
+                    'customer_name': row.customer_name,
+                    'segment': row.segment,
+                    'rfm_score': row.rfm_score,
+                    'recency': row.recency,
+                    'frequency': row.frequency,
+                    'monetary': row.monetary
+                }
+                for row in rows
+            ]
+        }
+    
+    @staticmethod
+    def _parse_month(month_str: str):
+        try:
+            return datetime.strptime(month_str, '%Y-%m').date()
+        except ValueError:
+            raise ValidationError("Invalid month format. Use YYYY-MM")
@@ -1,12 +1,14 @@
 from typing import Optional, Dict, Any
-from datetime import date
+from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.sales_repository import SalesRepository
+from app.repositories.period_repository import PeriodComparisonRepository, PeriodWindow
 from app.utils.exceptions import ValidationError
 
 class SalesService:
     def __init__(self, db: AsyncSession):
         self.repository = SalesRepository(db)
+        self.periods = PeriodComparisonRepository(db)
 
     async def get_ytd_comparison(
         self, 
@@ -82,9 +84,16 @@ class SalesService:
         except ValueError: # Handle leap years (Feb 29)
             last_end = date(last_end_year, 2, 28)
         
-        # Fetch Data
-        current_data = await self.repository.get_metrics_by_date_range(current_start, current_end, unit_id_int)
-        last_data = await self.repository.get_metrics_by_date_range(last_start, last_end, unit_id_int)
+        # Fetch both periods in one scan (inclusive end dates -> half-open windows)
+        comparison = await self.periods.compare(
+            [
+                PeriodWindow("current", current_start, current_end + timedelta(days=1)),
+                PeriodWindow("last", last_start, last_end + timedelta(days=1)),
+            ],
+            unit_id=unit_id_int
+        )
+        current_data = self._to_range_metrics(comparison["totals"]["current"])
+        last_data = self._to_range_metrics(comparison["totals"]["last"])
         
         # Calculate Growth
         growth = self._calculate_growth(current_data, last_data)
@@ -96,6 +105,22 @@ class SalesService:
             "comparison_date": compare_date
         }
 
+    @staticmethod
+    def _to_range_metrics(window: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "total_orders": window["orders"],
+            "total_quantity": round(window["quantity"], 2),
+            "uom": window["uom"] or "Units"
+        }
+
+    @staticmethod
+    def _to_mtd_metrics(window: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "delivery_qty": round(window["quantity"], 2),
+            "total_orders": window["orders"],
+            "uom": window["uom"] or "Units"
+        }
+
     def _calculate_growth(self, current: Dict, last: Dict) -> Dict:
         """Calculate percentage growth safely"""
         def calc_pct(curr, prev):
@@ -147,9 +172,16 @@ class SalesService:
              if same_day_end < prev_month_end_limit:
                  prev_end = same_day_end
         
-        # Fetch data
-        current = await self.repository.get_mtd_stats(curr_start, curr_end, unit_id_int)
-        previous = await self.repository.get_mtd_stats(prev_start, prev_end, unit_id_int)
+        # Fetch both months in one scan
+        comparison = await self.periods.compare(
+            [
+                PeriodWindow("current", curr_start, curr_end),
+                PeriodWindow("previous", prev_start, prev_end),
+            ],
+            unit_id=unit_id_int
+        )
+        current = self._to_mtd_metrics(comparison["totals"]["current"])
+        previous = self._to_mtd_metrics(comparison["totals"]["previous"])
         
         # Calculate Growth
         qty_growth = ((current["delivery_qty"] - previous["delivery_qty"]) / previous["delivery_qty"] * 100) if previous["delivery_qty"] > 0 else 0.0
@@ -194,8 +226,29 @@ class SalesService:
 
         print(f"DEBUG: Trend Date Range -> Start: {trend_start}, End: {trend_end}")
 
-        current = await self.repository.get_mtd_stats(start, end, unit_id_int)
-        raw_trend = await self.repository.get_monthly_trend(unit_id_int, end_date=trend_end, start_date=trend_start)
+        # Selected month and every trend month from one scan
+        month_windows = [
+            PeriodWindow(
+                f"{target_year_for_trend}-{str(m).zfill(2)}",
+                date(target_year_for_trend, m, 1),
+                date(target_year_for_trend + 1, 1, 1) if m == 12 else date(target_year_for_trend, m + 1, 1)
+            )
+            for m in range(1, 13)
+        ]
+        comparison = await self.periods.compare(
+            [PeriodWindow("current", start, end)] + month_windows,
+            unit_id=unit_id_int
+        )
+        current = self._to_mtd_metrics(comparison["totals"]["current"])
+        raw_trend = [
+            {
+                "month": window.name,
+                "order_count": comparison["totals"][window.name]["orders"],
+                "qty": round(comparison["totals"][window.name]["quantity"], 2)
+            }
+            for window in month_windows
+            if comparison["totals"][window.name]["orders"] > 0
+        ]
         
         # Zero-fill missing months, but only up to current month for current year
         trend = []
@@ -1,68 +1,608 @@
 import json
+import time
+import uuid
+import asyncio
 import hashlib
+import inspect
+import logging
+from collections import OrderedDict, defaultdict
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from datetime import date
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple, Union, get_args, get_origin
 import redis.asyncio as redis
+from fastapi import params as fastapi_params
+from pydantic.fields import FieldInfo
 from core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Initialize Redis client
 redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
 
-def cache_response(expire: int = 300):
+# Per-route counters for this worker
+_STAT_FIELDS = ("hits", "local_hits", "misses", "errors", "stale_served", "coalesced", "lock_waits", "refreshes")
+_cache_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(_STAT_FIELDS, 0))
+
+# Per-route in-process LRU tiers
+_local_caches: Dict[str, "LocalLRUCache"] = {}
+
+# In-flight computations per key (in-process single-flight)
+_inflight: Dict[str, asyncio.Future] = {}
+
+# Background stale-while-revalidate refreshes per key
+_refreshing: Dict[str, asyncio.Task] = {}
+
+# Query parameter values that all mean "not provided"
+_EMPTY_VALUES = {"", "null", "none", "undefined"}
+
+# Data-version tokens per unit: {unit_id: (expires_at, token)}
+_versions: Dict[Any, Tuple[float, str]] = {}
+
+# In-flight data-version loads per unit (in-process single-flight)
+_version_loads: Dict[Any, asyncio.Future] = {}
+
+_TAG_PREFIX = "cache:tag"
+_SCAN_BATCH = 500
+
+# Deletes the lock only if we still own it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LocalLRUCache:
+    """Bounded, TTL-aware LRU used as the per-process tier in front of Redis."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cache_response(
+    expire: int = 300,
+    route: Optional[str] = None,
+    local_ttl: Optional[int] = None,
+    local_maxsize: Optional[int] = None,
+    versioned: bool = True,
+    period_scope: str = "month"
+):
     """
-    Cache decorator for FastAPI endpoints.
-    
+    Two-tier cache decorator for FastAPI endpoints (in-process LRU + Redis).
+
+    Keys are built from the route and the endpoint's query parameters only;
+    dependency-injected objects (services, sessions, AI core) are ignored so
+    that identical requests share a cache entry. When an entry is missing or
+    expired, a Redis lock lets a single request across all workers recompute
+    it while the others wait for the fresh one. Expired entries still within
+    CACHE_STALE_GRACE_SECONDS are served stale while a background task
+    recomputes them with freshly resolved dependencies.
+
+    Requests for closed periods (a past month or year) are cached without
+    expiry. Requests touching the open period fold the unit's
+    tbldeliveryinfo data version into the key, so new deliveries produce a
+    new key instead of waiting for the TTL. Every key is tagged by route and
+    unit for invalidation.
+
     Args:
         expire: Cache expiration in seconds (default 5 minutes)
+        route: Route path used as key namespace and stats label
+               (defaults to the endpoint's module and function name)
+        local_ttl: Seconds an entry lives in the per-process LRU
+                   (default: min(expire, CACHE_LOCAL_TTL_SECONDS))
+        local_maxsize: Max entries in the per-process LRU for this route
+        versioned: Fold the data version into keys for open periods
+        period_scope: "month" when the response covers the requested month,
+                      "year" when it always covers the whole requested year
+
+    The decorated endpoint gains an async ``refresh(params, horizon=0)`` used by
+    the background refresh and the cache warmer.
     """
     def decorator(func: Callable):
+        route_name = route or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        signature = inspect.signature(func)
+        local = _local_caches.setdefault(route_name, LocalLRUCache(
+            maxsize=local_maxsize or settings.CACHE_LOCAL_MAXSIZE,
+            ttl=local_ttl if local_ttl is not None else min(expire, settings.CACHE_LOCAL_TTL_SECONDS),
+        ))
+
+        async def resolve_key(arguments: Dict[str, Any]) -> Tuple[str, Optional[int], Tuple[str, str]]:
+            params = {name: _normalize_param(value) for name, value in arguments.items()}
+            if _is_closed_period(params, period_scope):
+                ttl = settings.CACHE_CLOSED_PERIOD_TTL_SECONDS or None
+                version = None
+            else:
+                ttl = expire
+                version = await _get_data_version(route_name, params.get("unit_id")) if versioned else None
+            cache_key = _generate_cache_key(route_name, params, version)
+            tags = (f"route:{route_name}", f"unit:{params.get('unit_id') or 'all'}")
+            return cache_key, ttl, tags
+
+        async def refresh(params: Dict[str, Any], horizon: float = 0) -> bool:
+            """
+            Recompute and store one entry outside a request, resolving the
+            endpoint's dependencies afresh. Skips entries that stay fresh for
+            at least ``horizon`` seconds or that another worker is refreshing.
+            Returns True when the entry was recomputed.
+            """
+            arguments = _query_arguments(signature, (), params)
+            cache_key, ttl, tags = await resolve_key(arguments)
+
+            envelope = await _read_envelope(route_name, cache_key)
+            if envelope is not None and _is_fresh(envelope, horizon):
+                return False
+
+            token = uuid.uuid4().hex
+            if not await _acquire_lock(route_name, cache_key, token):
+                return False
+            try:
+                _record(route_name, "refreshes")
+                result = await _call_with_fresh_dependencies(func, signature, arguments)
+                await _store(route_name, cache_key, result, ttl, tags, local)
+                return True
+            finally:
+                await _release_lock(route_name, cache_key, token)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            # Generate cache key from function name and arguments
-            cache_key = _generate_cache_key(func.__name__, args, kwargs)
-            
-            # Try to get from cache
-            try:
-                cached = await redis_client.get(cache_key)
-                if cached:
-                    return json.loads(cached)
-            except Exception:
-                # If Redis fails, silently continue to DB (fail-safe)
-                pass
-            
-            # Execute function
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
+            arguments = _query_arguments(signature, args, kwargs)
+            cache_key, ttl, tags = await resolve_key(arguments)
+
+            # Tier 1: this worker's LRU
+            cached = local.get(cache_key)
+            if cached is not None:
+                _record(route_name, "hits", "local_hits")
+                return cached
+
+            # Tier 2: Redis
+            envelope = await _read_envelope(route_name, cache_key)
+            if envelope is not None:
+                if _is_fresh(envelope):
+                    _record(route_name, "hits")
+                    local.set(cache_key, envelope["payload"])
+                    return envelope["payload"]
+                # Expired but within the grace window: serve stale, refresh in the background
+                _record(route_name, "stale_served")
+                _schedule_refresh(route_name, cache_key, refresh(arguments))
+                return envelope["payload"]
+
+            # Coalesce concurrent misses inside this worker
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                _record(route_name, "coalesced")
+                return await asyncio.shield(inflight)
+
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
             try:
-                if hasattr(result, "model_dump_json"):
-                    data_to_store = result.model_dump_json()
-                    pass 
-                
-                # Simple serialization for standard dicts/lists
-                await redis_client.setex(
-                    cache_key,
-                    expire,
-                    json.dumps(result, default=str)
+                result = await _compute_single_flight(
+                    func, args, kwargs, route_name, cache_key, ttl, tags, local
                 )
-            except Exception:
-                pass
-                
-            return result
+                future.set_result(result)
+                return result
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # mark retrieved when nobody else awaits it
+                raise
+            finally:
+                _inflight.pop(cache_key, None)
+        wrapper.refresh = refresh
         return wrapper
     return decorator
 
-def _generate_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
-    """Generate unique cache key based on function and arguments"""
-    # Sort kwargs to ensure consistent keys
-    key_part = f"{func_name}:{args}:{sorted(kwargs.items())}"
-    return f"cache:{hashlib.md5(key_part.encode()).hexdigest()}"
+
+def _schedule_refresh(route_name: str, cache_key: str, refresh: Any) -> None:
+    """Run a background refresh unless one is already running for this key."""
+    if cache_key in _refreshing:
+        refresh.close()
+        return
+
+    async def runner():
+        from app.db.session import db_lane
+        from app.db.admission import HEAVY
+
+        # Nobody waits on this result, so don't compete with live requests
+        db_lane.set(HEAVY)
+        try:
+            await refresh
+        except Exception as e:
+            _record(route_name, "errors")
+            logger.warning(f"Background refresh failed for {route_name}: {e}")
+        finally:
+            _refreshing.pop(cache_key, None)
+
+    _refreshing[cache_key] = asyncio.get_running_loop().create_task(runner())
+
+
+async def _compute_single_flight(
+    func: Callable,
+    args: tuple,
+    kwargs: dict,
+    route_name: str,
+    cache_key: str,
+    ttl: Optional[int],
+    tags: Iterable[str],
+    local: LocalLRUCache
+) -> Any:
+    """Recompute under a cross-worker lock; losers wait for the winner's value."""
+    token = uuid.uuid4().hex
+    acquired = await _acquire_lock(route_name, cache_key, token)
+
+    if not acquired:
+        _record(route_name, "lock_waits")
+        payload = await _wait_for_value(route_name, cache_key)
+        if payload is not None:
+            _record(route_name, "hits")
+            local.set(cache_key, payload)
+            return payload
+
+    try:
+        _record(route_name, "misses")
+        result = await func(*args, **kwargs)
+        await _store(route_name, cache_key, result, ttl, tags, local)
+        return result
+    finally:
+        if acquired:
+            await _release_lock(route_name, cache_key, token)
+
+
+async def _read_envelope(route_name: str, cache_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        raw = await redis_client.get(cache_key)
+        return json.loads(raw) if raw is not None else None
+    except Exception as e:
+        # If Redis fails, continue to DB (fail-safe)
+        _record(route_name, "errors")
+        logger.warning(f"Cache read failed for {route_name}: {e}")
+        return None
+
+
+def _is_fresh(envelope: Dict[str, Any], horizon: float = 0) -> bool:
+    fresh_until = envelope.get("fresh_until")
+    return fresh_until is None or fresh_until > time.time() + horizon
+
+
+async def _store(
+    route_name: str,
+    cache_key: str,
+    result: Any,
+    ttl: Optional[int],
+    tags: Iterable[str],
+    local: LocalLRUCache
+) -> None:
+    try:
+        payload = _to_payload(result)
+    except Exception as e:
+        _record(route_name, "errors")
+        logger.warning(f"Cache serialization failed for {route_name}: {e}")
+        return
+
+    local.set(cache_key, payload)
+    try:
+        envelope = {"fresh_until": time.time() + ttl if ttl else None, "payload": payload}
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(
+                cache_key,
+                json.dumps(envelope, default=str),
+                ex=ttl + settings.CACHE_STALE_GRACE_SECONDS if ttl else None
+            )
+            for tag in tags:
+                pipe.sadd(f"{_TAG_PREFIX}:{tag}", cache_key)
+            await pipe.execute()
+    except Exception as e:
+        _record(route_name, "errors")
+        logger.warning(f"Cache write failed for {route_name}: {e}")
+
+
+async def _acquire_lock(route_name: str, cache_key: str, token: str) -> bool:
+    """Try to become the single recomputing request. Redis errors count as acquired."""
+    try:
+        return bool(await redis_client.set(
+            f"lock:{cache_key}", token, nx=True, px=settings.CACHE_LOCK_TIMEOUT_SECONDS * 1000
+        ))
+    except Exception as e:
+        _record(route_name, "errors")
+        logger.warning(f"Cache lock failed for {route_name}: {e}")
+        return True
+
+
+async def _release_lock(route_name: str, cache_key: str, token: str) -> None:
+    try:
+        await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, f"lock:{cache_key}", token)
+    except Exception as e:
+        _record(route_name, "errors")
+        logger.warning(f"Cache unlock failed for {route_name}: {e}")
+
+
+async def _wait_for_value(route_name: str, cache_key: str) -> Optional[Any]:
+    """Poll Redis until the lock holder publishes a fresh value or we give up."""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+    delay = 0.05
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        envelope = await _read_envelope(route_name, cache_key)
+        if envelope is not None and _is_fresh(envelope):
+            return envelope["payload"]
+        delay = min(delay * 2, 0.5)
+    return None
+
+
+def _query_arguments(signature: inspect.Signature, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """Bind call arguments and keep only primitive query parameters, skipping dependencies."""
+    bound = signature.bind_partial(*args, **kwargs)
+    bound.apply_defaults()
+
+    arguments = {}
+    for name, value in bound.arguments.items():
+        if isinstance(signature.parameters[name].default, fastapi_params.Depends):
+            continue
+        if isinstance(value, FieldInfo):
+            # Endpoint called directly without this argument: use the Query default
+            value = value.default
+        if value is None or isinstance(value, (str, int, float, bool)):
+            arguments[name] = value
+    return arguments
+
+
+async def _call_with_fresh_dependencies(func: Callable, signature: inspect.Signature, arguments: Dict[str, Any]) -> Any:
+    """
+    Call an endpoint outside a request: query parameters come from ``arguments``
+    and every Depends() is resolved anew (generator dependencies such as get_db
+    are entered and closed around the call).
+    """
+    async with AsyncExitStack() as stack:
+        solved: Dict[Callable, Any] = {}
+        kwargs = {}
+        for name, parameter in signature.parameters.items():
+            if isinstance(parameter.default, fastapi_params.Depends):
+                kwargs[name] = await _solve_dependency(parameter.default.dependency, stack, solved)
+            elif name in arguments:
+                kwargs[name] = _coerce(arguments[name], parameter.annotation)
+        return await func(**kwargs)
+
+
+async def _solve_dependency(dependency: Callable, stack: AsyncExitStack, solved: Dict[Callable, Any]) -> Any:
+    if dependency in solved:
+        return solved[dependency]
+
+    kwargs = {}
+    for name, parameter in inspect.signature(dependency).parameters.items():
+        if isinstance(parameter.default, fastapi_params.Depends):
+            kwargs[name] = await _solve_dependency(parameter.default.dependency, stack, solved)
+        elif isinstance(parameter.default, FieldInfo):
+            kwargs[name] = parameter.default.default
+
+    if inspect.isasyncgenfunction(dependency):
+        value = await stack.enter_async_context(asynccontextmanager(dependency)(**kwargs))
+    elif inspect.isgeneratorfunction(dependency):
+        value = stack.enter_context(contextmanager(dependency)(**kwargs))
+    else:
+        value = dependency(**kwargs)
+        if inspect.isawaitable(value):
+            value = await value
+    solved[dependency] = value
+    return value
+
+
+def _coerce(value: Any, annotation: Any) -> Any:
+    """Match FastAPI's parsing of str/int query parameters for warmed calls."""
+    if value is None:
+        return None
+    if get_origin(annotation) is Union:
+        candidates = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = candidates[0] if len(candidates) == 1 else annotation
+    if annotation is str and not isinstance(value, str):
+        return str(value)
+    if annotation is int and isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+def _normalize_param(value: Any) -> Any:
+    """Collapse equivalent spellings ("4" vs 4, "null" vs None) to one value."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lower() in _EMPTY_VALUES:
+            return None
+        if value.lstrip("-").isdigit():
+            return int(value)
+    return value
+
+
+def _generate_cache_key(route: str, params: Dict[str, Any], version: Optional[str] = None) -> str:
+    """Generate a stable cache key from the route, normalized query parameters and data version"""
+    key_part = json.dumps(params, sort_keys=True, default=str)
+    if version:
+        key_part = f"{key_part}@{version}"
+    return f"cache:{route}:{hashlib.md5(key_part.encode()).hexdigest()}"
+
+
+def _is_closed_period(params: Dict[str, Any], period_scope: str = "month") -> bool:
+    """
+    True when the requested period ended before the current month started,
+    i.e. its deliveries can no longer change. Requests without an explicit
+    year/month default to the current period and are never closed.
+    """
+    year, month = params.get("year"), params.get("month")
+    if isinstance(month, str):
+        # "YYYY-MM" style month parameter
+        try:
+            year, month = (int(part) for part in month.split("-")[:2])
+        except ValueError:
+            return False
+    if year is None and month is None:
+        return False
+
+    today = date.today()
+    year = year if isinstance(year, int) else today.year
+    if period_scope == "year" or not isinstance(month, int):
+        return year < today.year
+    return (year, month) < (today.year, today.month)
+
+
+async def _get_data_version(route_name: str, unit_id: Any) -> Optional[str]:
+    """
+    tbldeliveryinfo data version for a unit, memoized per worker and shared
+    through Redis for CACHE_VERSION_TTL_SECONDS.
+    """
+    cached = _versions.get(unit_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    # Coalesce concurrent loads inside this worker
+    inflight = _version_loads.get(unit_id)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+
+    future = asyncio.get_running_loop().create_future()
+    _version_loads[unit_id] = future
+    try:
+        token = await _load_data_version(route_name, unit_id)
+        future.set_result(token)
+        return token
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        _version_loads.pop(unit_id, None)
+
+
+async def _load_data_version(route_name: str, unit_id: Any) -> Optional[str]:
+    """Data version from Redis, else from the database; None when unavailable."""
+    version_key = f"cache:version:{unit_id or 'all'}"
+    token = None
+    try:
+        token = await redis_client.get(version_key)
+    except Exception as e:
+        _record(route_name, "errors")
+        logger.warning(f"Cache version read failed for {route_name}: {e}")
+
+    if token is None:
+        try:
+            token = await load_data_version(unit_id if isinstance(unit_id, int) else None)
+        except Exception as e:
+            # Without a watermark open periods fall back to plain TTL expiry
+            _record(route_name, "errors")
+            logger.warning(f"Data version lookup failed for {route_name}: {e}")
+            return None
+        try:
+            await redis_client.set(version_key, token, ex=settings.CACHE_VERSION_TTL_SECONDS)
+        except Exception:
+            pass
+
+    _versions[unit_id] = (time.monotonic() + settings.CACHE_VERSION_TTL_SECONDS, token)
+    return token
+
+
+async def load_data_version(unit_id: Optional[int]) -> str:
+    """
+    Read the current data-version watermark from the database.
+
+    Deliberately not admitted: keys are resolved inside a request that already
+    holds an admission slot, and waiting for a second one in the same lane
+    would stall it for the queue timeout whenever the lane is saturated. The
+    watermark query is a single index probe plus a catalog read.
+    """
+    from app.db.session import async_session_maker
+    from app.repositories.watermark_repository import WatermarkRepository
+
+    async with async_session_maker() as session:
+        return await WatermarkRepository(session).get_data_version(unit_id)
+
+
+def _to_payload(result: Any) -> Any:
+    """JSON-safe copy of the real response payload (pydantic models via model_dump)."""
+    if hasattr(result, "model_dump"):
+        return result.model_dump(mode="json")
+    return json.loads(json.dumps(result, default=str))
+
+
+def _record(route: str, *outcomes: str) -> None:
+    for outcome in outcomes:
+        _cache_stats[route][outcome] += 1
+
+
+def get_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Snapshot of per-route cache counters and LRU occupancy for this process."""
+    stats = {}
+    for route in set(_cache_stats) | set(_local_caches):
+        counters = dict(_cache_stats[route])
+        local = _local_caches.get(route)
+        if local is not None:
+            counters.update(local_size=len(local), local_maxsize=local.maxsize, evictions=local.evictions)
+        stats[route] = counters
+    return stats
+
 
 async def invalidate_cache(pattern: str):
-    """Invalidate cache entries matching a pattern"""
+    """
+    Invalidate cache entries matching a pattern.
+    Uses incremental SCAN + UNLINK instead of the blocking KEYS command.
+    """
+    _clear_local()
     try:
-        keys = await redis_client.keys(f"cache:{pattern}*")
-        if keys:
-            await redis_client.delete(*keys)
-    except Exception:
-        pass
+        batch = []
+        async for key in redis_client.scan_iter(match=f"cache:{pattern}*", count=_SCAN_BATCH):
+            batch.append(key)
+            if len(batch) >= _SCAN_BATCH:
+                await redis_client.unlink(*batch)
+                batch = []
+        if batch:
+            await redis_client.unlink(*batch)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {pattern}: {e}")
+
+
+async def invalidate_tags(*tags: str):
+    """
+    Invalidate every entry carrying one of the given tags,
+    e.g. invalidate_tags("unit:4") or invalidate_tags("route:/sales/ytd").
+    """
+    _clear_local()
+    try:
+        for tag in tags:
+            tag_key = f"{_TAG_PREFIX}:{tag}"
+            members = await redis_client.smembers(tag_key)
+            if members:
+                await redis_client.unlink(*members)
+            await redis_client.unlink(tag_key)
+    except Exception as e:
+        logger.warning(f"Cache tag invalidation failed for {tags}: {e}")
+
+
+def _clear_local() -> None:
+    for local in _local_caches.values():
+        local.clear()
+    _versions.clear()
@@ -17,4 +17,9 @@ class ValidationError(AppException):
 
 class DatabaseError(AppException):
     def __init__(self, message: str = "Database error"):
-        super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        super().__init__(message, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class ServiceUnavailableError(AppException):
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.headers = {"Retry-After": str(retry_after)}
@@ -0,0 +1,83 @@
+"""
+Per-request AI engine setup: a fresh SalesGPTCore vs the shared engine.
+
+Times what an insight endpoint spends before its first LLM call:
+
+    legacy  get_llm() + SalesGPTCore(llm) with every chain and the SQL
+            tooling built up front (the old __init__)
+    fresh   get_llm() + SalesGPTCore(llm) + the one insight chain it uses
+    shared  get_core() + the insight chain, after the first request
+
+The SQL tooling reflects an in-memory SQLite database here, so the legacy
+numbers understate the Postgres reflection it did on a cold worker.
+
+    python -m benchmarks.ai_engine_setup
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from typing import Callable
+from unittest.mock import patch
+
+from langchain_community.utilities import SQLDatabase
+
+from app.api import deps
+from llm.chain import SalesGPTCore
+from llm.client import get_llm
+from llm.prompts import regional_strategy_prompt
+
+
+def _legacy() -> SalesGPTCore:
+    core = SalesGPTCore(get_llm())
+    for name in ("sql_writer", "sql_executor", "contextualize_chain", "descriptive_chain",
+                 "prescriptive_chain", "entity_extract_chain", "general_chain"):
+        getattr(core, name)
+    core._prompt_chain(regional_strategy_prompt)
+    return core
+
+
+def _fresh() -> SalesGPTCore:
+    core = SalesGPTCore(get_llm())
+    core._prompt_chain(regional_strategy_prompt)
+    return core
+
+
+def _shared() -> SalesGPTCore:
+    core = deps.get_core()
+    core._prompt_chain(regional_strategy_prompt)
+    return core
+
+
+def _timeit(build: Callable, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        build()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AI engine setup cost per insight request")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    sql_database = SQLDatabase.from_uri("sqlite://")
+    # get_llm() logs every construction
+    with patch("llm.chain.get_sql_database", return_value=sql_database), \
+            contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            "legacy": _timeit(_legacy, args.repeat),
+            "fresh": _timeit(_fresh, args.repeat),
+            "shared": _timeit(_shared, args.repeat),
+        }
+
+    print(f"setup per request, median of {args.repeat}")
+    for name, us in results.items():
+        print(f"  {name:<7} {us:10.1f} us  {results['legacy'] / us:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
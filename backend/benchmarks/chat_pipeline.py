@@ -0,0 +1,102 @@
+"""
+Chat pipeline latency: sequential stages vs the dependency graph.
+
+Replays --requests chat turns against a fake engine whose LLM stages sleep
+for randomized, Groq-like latencies (same seed for both runs) and reports
+p50/p95 of ChatService.process_message:
+
+    sequential  sql -> descriptive -> reasoning -> entities (the old order)
+    graph       entities overlapping descriptive/reasoning (run_stages)
+
+    python -m benchmarks.chat_pipeline
+    python -m benchmarks.chat_pipeline --requests 200 --why-share 0.5
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import List
+from unittest.mock import AsyncMock
+
+from app.schemas.chat import SessionState
+from app.services.chat_service import ChatService
+
+# Median seconds per stage; each call is drawn from a lognormal around it
+STAGE_LATENCY = {"sql": 0.9, "descriptive": 0.7, "entities": 0.4, "reasoning": 2.4}
+
+
+class FakeCore:
+    def __init__(self, seed: int, scale: float):
+        self.rng = random.Random(seed)
+        self.scale = scale
+
+    async def _llm(self, stage: str, result):
+        await asyncio.sleep(STAGE_LATENCY[stage] * self.scale * self.rng.lognormvariate(0, 0.35))
+        return result
+
+    async def arun_sql_from_question(self, question):
+        return await self._llm("sql", {"question": question, "query": "SELECT 1", "result": "[(1,)]"})
+
+    async def adescriptive(self, out):
+        return await self._llm("descriptive", "Sales fell.")
+
+    async def aextract_entities(self, query, result):
+        return await self._llm("entities", {"entity_type": "unit", "entities": [], "metric": "qty"})
+
+    async def aanalyze_with_reasoning(self, question, result, descriptive_answer, mode=None):
+        return await self._llm("reasoning", "Because.")
+
+
+async def _sequential(core: FakeCore, message: str) -> None:
+    out = await core.arun_sql_from_question(message)
+    desc = await core.adescriptive(out)
+    if message.startswith("why"):
+        desc = await core.aanalyze_with_reasoning(out["question"], out["result"], desc)
+    await core.aextract_entities(out["query"], out["result"])
+
+
+async def _run(messages: List[str], graph: bool, seed: int, scale: float) -> List[float]:
+    core = FakeCore(seed, scale)
+    service = ChatService(core)
+    service._get_state = AsyncMock(return_value=SessionState())
+    service._save_state = AsyncMock()
+    samples = []
+    for message in messages:
+        started = time.perf_counter()
+        if graph:
+            await service.process_message(message, "bench")
+        else:
+            await _sequential(core, message)
+        samples.append((time.perf_counter() - started) / scale)
+    return samples
+
+
+def _percentile(samples: List[float], q: int) -> float:
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Chat pipeline latency, sequential vs graph")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--why-share", type=float, default=0.3, help="share of why/how questions")
+    parser.add_argument("--scale", type=float, default=0.01, help="time scale for the simulated latencies")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    messages = [
+        "why did sales drop in march" if rng.random() < args.why_share else "total sales in march"
+        for _ in range(args.requests)
+    ]
+    results = {
+        "sequential": asyncio.run(_run(messages, False, 1, args.scale)),
+        "graph": asyncio.run(_run(messages, True, 1, args.scale)),
+    }
+
+    print(f"{args.requests} chats, {args.why_share:.0%} why/how, simulated seconds")
+    for name, samples in results.items():
+        print(f"  {name:<10} p50 {_percentile(samples, 50):5.2f} s  p95 {_percentile(samples, 95):5.2f} s")
+
+
+if __name__ == "__main__":
+    main()
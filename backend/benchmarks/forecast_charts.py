@@ -0,0 +1,158 @@
+"""
+Forecast chart assembly: per-point merge vs the shared-axis arrays.
+
+Builds a synthetic unit (global chart plus --charts item and territory
+charts over --months months) and times assembling and serializing the
+/forecast payload three ways:
+
+    legacy    merge_points per chart, validated ChartPoint models
+    points    forecast_series stitching, unvalidated ChartPoint models
+    columnar  forecast_series stitching, months axis + value arrays
+    overview  global chart + item/territory names and totals (/forecast/overview)
+
+    python -m benchmarks.forecast_charts
+    python -m benchmarks.forecast_charts --charts 50 --months 60
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, List
+from unittest.mock import AsyncMock, MagicMock
+
+from app.schemas.common import StandardResponse
+from app.schemas.forecast import ChartPoint, ForecastChart, ForecastResponse
+from app.services.forecast_service import ForecastService
+
+
+def merge_points(actual_rows: List, forecast_rows: List) -> List[ChartPoint]:
+    """
+    The pre-array per-point merge of one chart, kept as the baseline (and as
+    the reference the forecast_series stitching is tested against).
+    """
+    data_map = {}
+    last_actual_month = None
+    last_actual_qty = None
+
+    for m, qty in sorted(actual_rows, key=lambda x: x[0]):
+        qty = float(qty or 0)
+        data_map[m] = {"month": m, "actual": qty, "forecast": None}
+        last_actual_month = m
+        last_actual_qty = qty
+
+    # Forecast only for months without an actual
+    for m, qty in forecast_rows:
+        if m not in data_map:
+            data_map[m] = {"month": m, "actual": None, "forecast": float(qty or 0)}
+
+    # Repeat the last actual as a forecast point so the lines join
+    if last_actual_month and data_map[last_actual_month]["forecast"] is None:
+        data_map[last_actual_month]["forecast"] = last_actual_qty
+
+    return [ChartPoint(**data_map[k]) for k in sorted(data_map)]
+
+
+def _months(count: int) -> List[str]:
+    return [f"{2022 + i // 12}-{i % 12 + 1:02d}" for i in range(count)]
+
+
+def _series_rows(prefix: str, charts: int, months: List[str], rng: random.Random) -> List[tuple]:
+    split = len(months) * 3 // 4
+    return [
+        (rank, f"{prefix} {rank}", "Historical" if i < split else "Forecasted", month, rng.random() * 1000)
+        for rank in range(1, charts + 1)
+        for i, month in enumerate(months)
+    ]
+
+
+def _service(charts: int, month_count: int) -> ForecastService:
+    rng = random.Random(0)
+    months = _months(month_count)
+    split = month_count * 3 // 4
+    service = ForecastService(db=MagicMock())
+    service.repository.get_global_forecast = AsyncMock(return_value={
+        "actuals": [(m, rng.random() * 1e5) for m in months[:split]],
+        "forecast": [(m, rng.random() * 1e5) for m in months[split:]],
+    })
+    items = _series_rows("Item", charts, months, rng)
+    territories = _series_rows("Territory", charts, months, rng)
+    service.repository.get_top_series = AsyncMock(
+        side_effect=lambda dimension, unit_id, limit: items if dimension == "item" else territories
+    )
+    service.repository.get_top_entities = AsyncMock(side_effect=lambda dimension, unit_id, limit: [
+        SimpleNamespace(rank=rank, name=f"{dimension} {rank}", actual_qty=rng.random() * 1e5,
+                        forecast_qty=rng.random() * 1e4, months=month_count)
+        for rank in range(1, charts + 1)
+    ])
+    return service
+
+
+async def _legacy(service: ForecastService) -> ForecastResponse:
+    """The pre-array assembly: dicts per month, sort, validated model per point."""
+    repo = service.repository
+    global_data = await repo.get_global_forecast(7)
+
+    def charts(rows):
+        series = {}
+        for _, name, row_type, month, qty in rows:
+            entry = series.setdefault(name, {"actuals": [], "forecast": []})
+            entry["actuals" if row_type == "Historical" else "forecast"].append((month, float(qty or 0)))
+        return [ForecastChart(name=name, chart=merge_points(s["actuals"], s["forecast"])) for name, s in series.items()]
+
+    return ForecastResponse(
+        global_chart=merge_points(global_data["actuals"], global_data["forecast"]),
+        items_charts=charts(await repo.get_top_series("item", 7, 50)),
+        territories_charts=charts(await repo.get_top_series("territory", 7, 50)),
+        unit_id="7"
+    )
+
+
+def _serialize(data: Any) -> str:
+    # What the endpoint does: wrap, validate against the response model, encode
+    return json.dumps(StandardResponse.model_validate(StandardResponse(data=data)).model_dump(mode="json"))
+
+
+def _timeit(loop: asyncio.AbstractEventLoop, build: Callable, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _serialize(loop.run_until_complete(build()))
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Forecast chart assembly micro-benchmark")
+    parser.add_argument("--charts", type=int, default=50, help="item and territory charts each")
+    parser.add_argument("--months", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    service = _service(args.charts, args.months)
+    loop = asyncio.new_event_loop()
+    try:
+        results = {
+            "legacy": _timeit(loop, lambda: _legacy(service), args.repeat),
+            "points": _timeit(loop, lambda: service.get_sales_forecast("7"), args.repeat),
+            "columnar": _timeit(loop, lambda: service.get_sales_forecast("7", columnar=True), args.repeat),
+            "overview": _timeit(loop, lambda: service.get_forecast_overview("7"), args.repeat),
+        }
+        sizes = {
+            "legacy": len(_serialize(loop.run_until_complete(_legacy(service)))),
+            "points": len(_serialize(loop.run_until_complete(service.get_sales_forecast("7")))),
+            "columnar": len(_serialize(loop.run_until_complete(service.get_sales_forecast("7", columnar=True)))),
+            "overview": len(_serialize(loop.run_until_complete(service.get_forecast_overview("7")))),
+        }
+    finally:
+        loop.close()
+
+    print(f"{2 * args.charts + 1} charts x {args.months} months, median of {args.repeat}")
+    for name, ms in results.items():
+        print(f"  {name:<9} {ms:8.2f} ms  {sizes[name] / 1024:7.1f} KiB  {results['legacy'] / ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+NumPy RFM kernel vs the pandas implementation (RFMService.calculate_rfm +
+get_segment_summary + to_dict('records')) on synthetic per-customer data.
+
+    python -m benchmarks.rfm_kernel
+    python -m benchmarks.rfm_kernel --customers 10000 100000 1000000
+"""
+import argparse
+import statistics
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from app.services import rfm_kernel
+from app.services.rfm_service import RFMService
+
+
+def _aggregates(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "customer_id": np.arange(n),
+        "customer_name": [f"Customer {i}" for i in range(n)],
+        "Recency": rng.integers(1, 730, n),
+        "Frequency": rng.integers(1, 400, n),
+        "Monetary": rng.gamma(2.0, 50.0, n),
+    })
+
+
+def _median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench(n: int, repeat: int) -> None:
+    df = _aggregates(n)
+    service = RFMService(MagicMock())
+
+    def with_pandas():
+        rfm_df = service.calculate_rfm(df)
+        service.get_segment_summary(rfm_df)
+        rfm_df.to_dict("records")
+
+    def with_kernel():
+        rfm_kernel.score_customers(
+            df["customer_id"].tolist(), df["customer_name"].tolist(),
+            df["Recency"].to_numpy(), df["Frequency"].to_numpy(), df["Monetary"].to_numpy()
+        )
+
+    pandas_ms = _median_ms(with_pandas, repeat)
+    kernel_ms = _median_ms(with_kernel, repeat)
+    print(f"{n:>9} customers  pandas {pandas_ms:9.1f} ms  numpy {kernel_ms:9.1f} ms  speedup {pandas_ms / kernel_ms:4.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RFM kernel micro-benchmark")
+    parser.add_argument("--customers", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for n in args.customers:
+        bench(n, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Typed executor vs the legacy ``SQLDatabase.run()`` + ``ast.literal_eval`` path.
+
+Offline (default) the legacy cost is measured on the same rendering
+SQLDatabase.run() produces (``str()`` of the row list) for a synthetic
+result, against handing the driver's tuples over unchanged. With --db both
+paths run against Postgres on a generate_series query.
+
+    python -m benchmarks.typed_executor
+    python -m benchmarks.typed_executor --rows 10000 --db
+"""
+import argparse
+import ast
+import asyncio
+import statistics
+import time
+from typing import Callable, List
+
+BENCH_SQL = """
+    SELECT g AS unit_id,
+           'Customer ' || g AS customer_name,
+           (g * 1.5)::float8 AS qty_mt,
+           g % 7 AS order_count
+    FROM generate_series(1, {rows}) AS g
+"""
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _synthetic_rows(rows: int) -> List[tuple]:
+    return [(i, f"Customer {i}", i * 1.5, i % 7) for i in range(1, rows + 1)]
+
+
+def bench_offline(rows: int, repeat: int) -> None:
+    data = _synthetic_rows(rows)
+    legacy = _timeit(lambda: ast.literal_eval(str(data)), repeat)
+    typed = _timeit(lambda: [tuple(row) for row in data], repeat)
+    _report(rows, legacy, typed, "offline: render + literal_eval vs driver tuples")
+
+
+async def bench_db(rows: int, repeat: int) -> None:
+    from app.db.engine import get_sql_database
+    from app.db.executor import fetch
+
+    sql = BENCH_SQL.format(rows=rows)
+    db = get_sql_database()
+    legacy = _timeit(lambda: ast.literal_eval(db.run(sql)), repeat)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fetch(sql)
+        samples.append((time.perf_counter() - started) * 1000)
+    _report(rows, legacy, statistics.median(samples), "postgres: SQLDatabase.run + literal_eval vs fetch()")
+
+
+def _report(rows: int, legacy_ms: float, typed_ms: float, label: str) -> None:
+    print(f"{label} ({rows} rows)")
+    print(f"  legacy: {legacy_ms:9.2f} ms")
+    print(f"  typed:  {typed_ms:9.2f} ms")
+    print(f"  speedup: {legacy_ms / typed_ms:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", action="store_true", help="run both paths against Postgres")
+    args = parser.parse_args()
+
+    if args.db:
+        asyncio.run(bench_db(args.rows, args.repeat))
+    else:
+        bench_offline(args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,10 +24,65 @@ class Settings(BaseSettings):
     DEFAULT_LIMIT: int = 200
     ALLOWED_TABLES: str = "tbldeliveryinfo,AIL_Monthly_Total_Final_Territory,AIL_Monthly_Total_Forecast,AIL_Monthly_Total_Item,dim_business_unit"
 
+    # Schema digest for NL->SQL prompts (llm/schema_digest.py)
+    SCHEMA_DIGEST_TTL_SECONDS: int = 86400
+    SCHEMA_DIGEST_SAMPLE_VALUES: int = 5  # representative values per sampled column
+    SCHEMA_DIGEST_WARM_ON_STARTUP: bool = True
+
+    # Chat
+    CHAT_REASONING_MODE: str = "fast"  # why/how answers: "fast" = 1 JSON call, "deep" = 4 chained calls
+
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     SESSION_TTL_SECONDS: int = 86400
 
+    # Response cache
+    CACHE_LOCAL_MAXSIZE: int = 256
+    CACHE_LOCAL_TTL_SECONDS: int = 30
+    CACHE_STALE_GRACE_SECONDS: int = 120
+    CACHE_LOCK_TIMEOUT_SECONDS: int = 30
+    CACHE_LOCK_WAIT_SECONDS: float = 10.0
+    CACHE_CLOSED_PERIOD_TTL_SECONDS: int = 0  # 0 = keep closed periods until invalidated
+    CACHE_VERSION_TTL_SECONDS: int = 60
+    CACHE_WARM_ENABLED: bool = True
+    CACHE_WARM_INTERVAL_SECONDS: int = 240  # 0 = warm once at startup
+
+    # Daily rollup of tbldeliveryinfo
+    USE_DAILY_ROLLUP: bool = False
+    ROLLUP_LOOKBACK_DAYS: int = 3
+    ROLLUP_REFRESH_INTERVAL_SECONDS: int = 900
+
+    # Persisted per-customer RFM state
+    USE_RFM_STATE: bool = False
+    RFM_STATE_SETTLE_DAYS: int = 3
+    RFM_STATE_REFRESH_INTERVAL_SECONDS: int = 3600
+    RFM_SNAPSHOT_TTL_SECONDS: int = 300  # scored populations reused across pages
+    RFM_SNAPSHOT_CACHE_SIZE: int = 8
+
+    # Monthly RFM segment history (app/jobs/build_rfm_history.py)
+    RFM_HISTORY_WINDOW_MONTHS: int = 12  # RFM window ending with each stored month
+    RFM_HISTORY_BACKFILL_MONTHS: int = 24
+
+    # Persisted converted quantity (tbldeliveryinfo.qty_mt / uom_shown)
+    USE_PERSISTED_QTY_MT: bool = False
+    QTY_MT_BACKFILL_BATCH_DAYS: int = 7
+
+    # Database pools: DB_CONNECTION_BUDGET is shared by all WEB_CONCURRENCY workers
+    DB_CONNECTION_BUDGET: int = 60
+    WEB_CONCURRENCY: int = 1
+    DB_SYNC_POOL_ENABLED: bool = True
+    DB_SYNC_POOL_SHARE: float = 0.2  # of each worker's connections, for the LLM/sync pool
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+
+    # Database admission control
+    DB_MAX_CONCURRENCY: int = 0  # 0 = async pool_size + max_overflow
+    DB_HEAVY_LANE_LIMIT: int = 0  # 0 = half of DB_MAX_CONCURRENCY
+    DB_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    DB_MAX_QUEUE: int = 100
+
+    # Batched /dashboard endpoint
+    DASHBOARD_MAX_CONCURRENCY: int = 4  # tile groups running at once, each on its own connection
+
     # API
     DEBUG_RETURN_SQL: bool = Field(default=False)
 
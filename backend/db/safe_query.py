@@ -1,6 +1,6 @@
 from typing import List, Tuple, Optional, Any, Dict
 from sqlalchemy import text
-from db.engine import engine
+from app.db.engine import get_sync_engine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,7 +9,7 @@ logger = logging.getLogger(__name__)
 def safe_execute(query: str, params: Optional[Dict[str, Any]] = None) -> List[Tuple]:
 
     try:
-        with engine.connect() as conn:
+        with get_sync_engine().connect() as conn:
             if params:
                 result = conn.execute(text(query), params)
             else:
@@ -37,7 +37,7 @@ def safe_execute_scalar(query: str, params: Optional[Dict[str, Any]] = None) ->
 def safe_execute_dict(query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
 
     try:
-        with engine.connect() as conn:
+        with get_sync_engine().connect() as conn:
             if params:
                 result = conn.execute(text(query), params)
             else:
@@ -1,30 +1,2 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from core.config import settings
-# Create async engine
-async_engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,  # postgresql+asyncpg://...
-    echo=False,
-    pool_size=10,
-    max_overflow=20,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
-# Create async session factory
-async_session_maker = async_sessionmaker(
-    async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
-# Dependency for FastAPI
-async def get_db() -> AsyncSession:
-    async with async_session_maker() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
\ No newline at end of file
+"""Compatibility shim: sessions now come from app.db.session's shared pool."""
+from app.db.session import async_engine, async_session_maker, get_db
@@ -1,16 +1,17 @@
 import json
 import re
-from typing import Dict, Any, List, Optional
+from functools import cached_property
+from typing import Dict, Any, Generator, List, Optional, Tuple
 
 from operator import itemgetter
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_community.tools import QuerySQLDatabaseTool
-from langchain_classic.chains.sql_database.query import create_sql_query_chain
 
 from core.config import settings
 from db.sql_safety import extract_sql, is_select_only, ensure_limit, enforce_allowlist
-from db.engine import get_sync_db
+from app.db.engine import get_sql_database
+from llm.schema_digest import schema_digest
 from llm.prompts import (
     contextualize_prompt, descriptive_prompt, prescriptive_prompt, entity_extract_prompt,
     reasoning_step1_prompt, reasoning_step2_prompt, reasoning_step3_prompt, reasoning_step4_prompt,
@@ -19,6 +20,15 @@ from llm.prompts import (
 
 parser = StrOutputParser()
 
+# Default LIMIT suggested to the SQL writer (create_sql_query_chain's k)
+SQL_PROMPT_TOP_K = 5
+
+# A method body as a generator: it yields (runnable, input) pairs, receives each
+# runnable's output and returns the method's result. SalesGPTCore drives it with
+# invoke() for the blocking methods and ainvoke() for their a-prefixed twins, so
+# the prompt and parsing logic is written once.
+Steps = Generator[Tuple[Any, Any], Any, Any]
+
 def looks_like_why(text: str) -> bool:
     t = (text or "").strip().lower()
     return bool(re.search(r"\b(why|reason|explain|root cause|what happened|recommend|suggest|how to|action)\b", t))
@@ -33,6 +43,36 @@ def safe_json_load(s: str) -> dict:
     except Exception:
         return {"entity_type":"unknown","entities":[],"metric":"unknown"}
 
+REASONING_MODES = ("fast", "deep")
+REASONING_SECTIONS = ("observations", "patterns", "implications", "recommendations")
+
+def parse_reasoning(text: str) -> Optional[Dict[str, List[str]]]:
+    """Sections of a fast-mode reply, or None if it isn't the expected JSON."""
+    match = re.search(r"\{.*\}", text or "", re.DOTALL)
+    try:
+        data = json.loads(match.group()) if match else None
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not all(isinstance(data.get(key), list) for key in REASONING_SECTIONS):
+        return None
+    return {key: [str(item).strip() for item in data[key] if str(item).strip()] for key in REASONING_SECTIONS}
+
+def format_reasoning(observations: str, patterns: str, implications: str, recommendations: str) -> str:
+    # Combine all steps into structured response
+    return f"""**Analysis:**
+
+**Data Insights:**
+{observations}
+
+**Patterns Identified:**
+{patterns}
+
+**Business Implications:**
+{implications}
+
+**Recommendations:**
+{recommendations}"""
+
 class SalesGPTCore:
     """
     Orchestrates:
@@ -42,30 +82,116 @@ class SalesGPTCore:
     - prescriptive answer on why
     - entity extraction for context
     - general chat fallback
+
+    Every method has an async twin prefixed with ``a`` (``adescriptive``,
+    ``aanalyze_forecast_ceo``, ...) that awaits ``ainvoke`` instead of
+    blocking on ``invoke``; use those from request handlers.
     """
 
     def __init__(self, llm):
+        # Cheap by design: chains and the SQL tooling are built on first use,
+        # so insight-only callers never reflect the database
         self.llm = llm
         self.allowed_tables = [t.strip() for t in settings.ALLOWED_TABLES.split(",") if t.strip()]
-        
+        self._chains: Dict[int, Any] = {}
+
+    @cached_property
+    def sql_writer(self):
+        """
+        SQL generation chain; expects {"question", "table_info"}.
+
+        Same shape as create_sql_query_chain, but {table_info} is the cached
+        schema digest passed in by the caller instead of live reflection.
+        """
         # Use custom SQL prompt for speed and accuracy (1 call vs 5 calls)
         from llm.sql_prompt_enhanced import sql_prompt
-        
-        self.sql_writer = create_sql_query_chain(llm, get_sync_db(), prompt=sql_prompt)
-        self.sql_executor = QuerySQLDatabaseTool(db=get_sync_db())
-
-        self.contextualize_chain = contextualize_prompt | llm | parser
-        self.descriptive_chain = descriptive_prompt | llm | parser
-        self.prescriptive_chain = prescriptive_prompt | llm | parser
-        self.entity_extract_chain = entity_extract_prompt | llm | parser
-        self.general_chain = general_chat_prompt | llm | parser
+        return (
+            {
+                "input": lambda x: x["question"] + "\nSQLQuery: ",
+                "table_info": itemgetter("table_info"),
+            }
+            | sql_prompt.partial(top_k=str(SQL_PROMPT_TOP_K))
+            | self.llm.bind(stop=["\nSQLResult:"])
+            | parser
+        )
+
+    @cached_property
+    def sql_executor(self):
+        return QuerySQLDatabaseTool(db=get_sql_database())
+
+    def _prompt_chain(self, prompt):
+        """``prompt | llm | parser``, composed once per prompt."""
+        chain = self._chains.get(id(prompt))
+        if chain is None:
+            chain = self._chains[id(prompt)] = prompt | self.llm | parser
+        return chain
+
+    @property
+    def contextualize_chain(self):
+        return self._prompt_chain(contextualize_prompt)
+
+    @property
+    def descriptive_chain(self):
+        return self._prompt_chain(descriptive_prompt)
+
+    @property
+    def prescriptive_chain(self):
+        return self._prompt_chain(prescriptive_prompt)
+
+    @property
+    def entity_extract_chain(self):
+        return self._prompt_chain(entity_extract_prompt)
+
+    @property
+    def general_chain(self):
+        return self._prompt_chain(general_chat_prompt)
+
+    @staticmethod
+    def _run(steps: Steps) -> Any:
+        """Drive a step generator with blocking invoke() calls."""
+        output, error = None, None
+        while True:
+            try:
+                runnable, value = steps.throw(error) if error else steps.send(output)
+            except StopIteration as done:
+                return done.value
+            try:
+                output, error = runnable.invoke(value), None
+            except Exception as e:
+                output, error = None, e
+
+    @staticmethod
+    async def _arun(steps: Steps) -> Any:
+        """Drive a step generator with awaited ainvoke() calls."""
+        output, error = None, None
+        while True:
+            try:
+                runnable, value = steps.throw(error) if error else steps.send(output)
+            except StopIteration as done:
+                return done.value
+            try:
+                output, error = await runnable.ainvoke(value), None
+            except Exception as e:
+                output, error = None, e
 
     def general_response(self, question: str) -> str:
+        return self._run(self._general_response_steps(question))
+
+    async def ageneral_response(self, question: str) -> str:
+        return await self._arun(self._general_response_steps(question))
+
+    def _general_response_steps(self, question: str) -> Steps:
         """Provide a general response when SQL fails or isn't needed."""
-        return self.general_chain.invoke({"question": question}).strip()
+        return (yield self.general_chain, {"question": question}).strip()
 
 
     def elaborate(self, last_question: str, last_answer: str, last_result: str, user_request: str) -> str:
+        return self._run(self._elaborate_steps(last_question, last_answer, last_result, user_request))
+
+    async def aelaborate(self, last_question: str, last_answer: str, last_result: str, user_request: str) -> str:
+        return await self._arun(self._elaborate_steps(last_question, last_answer, last_result, user_request))
+
+    def _elaborate_steps(self, last_question: str, last_answer: str, last_result: str, user_request: str) -> Steps:
         """Provide more details about the previous answer based on context."""
         elaboration_prompt = f"""You are a knowledgeable sales analytics assistant. The user wants more details about your previous answer.
 
@@ -89,14 +215,31 @@ Provide a deeper explanation based on the previous answer and data:
 
 Build upon the previous answer with more depth and context."""
         
-        return self.llm.invoke(elaboration_prompt).content.strip()
+        return (yield self.llm, elaboration_prompt).content.strip()
+
+    def analyze_with_reasoning(self, question: str, result: str, descriptive_answer: str, mode: Optional[str] = None) -> str:
+        return self._run(self._analyze_with_reasoning_steps(question, result, descriptive_answer, mode))
 
-    def analyze_with_reasoning(self, question: str, result: str, descriptive_answer: str) -> str:
-        """Multi-step reasoning for analytical questions."""
+    async def aanalyze_with_reasoning(self, question: str, result: str, descriptive_answer: str, mode: Optional[str] = None) -> str:
+        return await self._arun(self._analyze_with_reasoning_steps(question, result, descriptive_answer, mode))
+
+    def _analyze_with_reasoning_steps(self, question: str, result: str, descriptive_answer: str, mode: Optional[str] = None) -> Steps:
+        """
+        Reasoning for analytical questions.
+
+        Args:
+            mode: "fast" for one structured JSON call, "deep" for the four
+                chained steps; defaults to settings.CHAT_REASONING_MODE
+        """
+        mode = mode or settings.CHAT_REASONING_MODE
+        if mode not in REASONING_MODES:
+            raise ValueError(f"Unknown reasoning mode: {mode}")
+        if mode == "fast":
+            return (yield from self._fast_reasoning_steps(question, result, descriptive_answer))
         
         # Step 1: Data Understanding - Identify key observations
-        step1_chain = reasoning_step1_prompt | self.llm | parser
-        observations = step1_chain.invoke({
+        step1_chain = self._prompt_chain(reasoning_step1_prompt)
+        observations = (yield step1_chain, {
             "question": question,
             "result": result,
             "descriptive_answer": descriptive_answer
@@ -104,45 +247,57 @@ Build upon the previous answer with more depth and context."""
 
         
         # Step 2: Pattern Identification
-        step2_chain = reasoning_step2_prompt | self.llm | parser
-        patterns = step2_chain.invoke({
+        step2_chain = self._prompt_chain(reasoning_step2_prompt)
+        patterns = (yield step2_chain, {
             "observations": observations
         })
         
         # Step 3: Implication Analysis
-        step3_chain = reasoning_step3_prompt | self.llm | parser
-        implications = step3_chain.invoke({
+        step3_chain = self._prompt_chain(reasoning_step3_prompt)
+        implications = (yield step3_chain, {
             "patterns": patterns
         })
         
         # Step 4: Recommendations
-        step4_chain = reasoning_step4_prompt | self.llm | parser
-        recommendations = step4_chain.invoke({
+        step4_chain = self._prompt_chain(reasoning_step4_prompt)
+        recommendations = (yield step4_chain, {
             "implications": implications
         })
         
-        # Combine all steps into structured response
-        structured_answer = f"""**Analysis:**
+        return format_reasoning(observations, patterns, implications, recommendations)
 
-**Data Insights:**
-{observations}
+    def _fast_reasoning_steps(self, question: str, result: str, descriptive_answer: str) -> Steps:
+        """All four reasoning sections from a single structured call."""
+        from llm.prompts import reasoning_fast_prompt
 
-**Patterns Identified:**
-{patterns}
+        raw = (yield self._prompt_chain(reasoning_fast_prompt), {
+            "question": question,
+            "result": result,
+            "descriptive_answer": descriptive_answer
+        })
+        sections = parse_reasoning(raw)
+        if sections is None:
+            # Not the JSON we asked for: the text is still the model's analysis
+            return f"**Analysis:**\n\n{raw.strip()}"
+        return format_reasoning(
+            "\n".join(f"- {item}" for item in sections["observations"]),
+            "\n".join(f"- {item}" for item in sections["patterns"]),
+            "\n".join(f"- {item}" for item in sections["implications"]),
+            "\n".join(f"{i}. {item}" for i, item in enumerate(sections["recommendations"], 1))
+        )
 
-**Business Implications:**
-{implications}
+    def run_sql_from_question(self, question: str) -> Dict[str, Any]:
+        return self._run(self._run_sql_from_question_steps(question))
 
-**Recommendations:**
-{recommendations}"""
-        
-        return structured_answer
+    async def arun_sql_from_question(self, question: str) -> Dict[str, Any]:
+        return await self._arun(self._run_sql_from_question_steps(question))
 
-    def run_sql_from_question(self, question: str) -> Dict[str, Any]:
+    def _run_sql_from_question_steps(self, question: str) -> Steps:
         """Generate and execute SQL from natural language using custom prompt chain."""
         
-        # 1. Generate SQL using the improved prompt
-        raw = self.sql_writer.invoke({"question": question})
+        # 1. Generate SQL using the improved prompt over the cached schema digest
+        table_info = (yield schema_digest, None)
+        raw = (yield self.sql_writer, {"question": question, "table_info": table_info})
         sql = extract_sql(raw)
         
         print(f"\\n[DEBUG] Original SQL generated:\\n{sql}\\n")
@@ -158,7 +313,7 @@ Build upon the previous answer with more depth and context."""
 
         # 3. Execution with auto-fix logic
         try:
-            result = self.sql_executor.invoke(sql)
+            result = (yield self.sql_executor, sql)
             
             # Check if result contains SQL error text (LangChain sometimes returns errors as strings)
             result_str = str(result).lower()
@@ -181,7 +336,7 @@ Build upon the previous answer with more depth and context."""
                 print(f"[DEBUG] Fixed SQL:\\n{sql_fixed}\\n")
                 
                 try:
-                    result = self.sql_executor.invoke(sql_fixed)
+                    result = (yield self.sql_executor, sql_fixed)
                     print(f"[DEBUG] Auto-fix successful!\\n")
                     return {"question": question, "query": sql_fixed, "result": result}
                 except Exception:
@@ -191,7 +346,13 @@ Build upon the previous answer with more depth and context."""
             raise ValueError(f"SQL execution failed: {str(e)}\\n\\nQuery:\\n{sql}")
 
     def contextualize(self, last_question: str, entity_type: str, entities: List[str], metric: str, user_message: str) -> str:
-        return self.contextualize_chain.invoke({
+        return self._run(self._contextualize_steps(last_question, entity_type, entities, metric, user_message))
+
+    async def acontextualize(self, last_question: str, entity_type: str, entities: List[str], metric: str, user_message: str) -> str:
+        return await self._arun(self._contextualize_steps(last_question, entity_type, entities, metric, user_message))
+
+    def _contextualize_steps(self, last_question: str, entity_type: str, entities: List[str], metric: str, user_message: str) -> Steps:
+        return (yield self.contextualize_chain, {
             "last_question": last_question,
             "entity_type": entity_type,
             "entities": entities,
@@ -200,10 +361,22 @@ Build upon the previous answer with more depth and context."""
         }).strip()
 
     def descriptive(self, out: Dict[str, Any]) -> str:
-        return self.descriptive_chain.invoke(out).strip()
+        return self._run(self._descriptive_steps(out))
+
+    async def adescriptive(self, out: Dict[str, Any]) -> str:
+        return await self._arun(self._descriptive_steps(out))
+
+    def _descriptive_steps(self, out: Dict[str, Any]) -> Steps:
+        return (yield self.descriptive_chain, out).strip()
 
     def prescriptive(self, question: str, query: str, result: str, descriptive_answer: str) -> str:
-        return self.prescriptive_chain.invoke({
+        return self._run(self._prescriptive_steps(question, query, result, descriptive_answer))
+
+    async def aprescriptive(self, question: str, query: str, result: str, descriptive_answer: str) -> str:
+        return await self._arun(self._prescriptive_steps(question, query, result, descriptive_answer))
+
+    def _prescriptive_steps(self, question: str, query: str, result: str, descriptive_answer: str) -> Steps:
+        return (yield self.prescriptive_chain, {
             "question": question,
             "query": query,
             "result": result,
@@ -211,12 +384,24 @@ Build upon the previous answer with more depth and context."""
         }).strip()
 
     def extract_entities(self, query: str, result: str) -> dict:
-        js = self.entity_extract_chain.invoke({"query": query, "result": result})
+        return self._run(self._extract_entities_steps(query, result))
+
+    async def aextract_entities(self, query: str, result: str) -> dict:
+        return await self._arun(self._extract_entities_steps(query, result))
+
+    def _extract_entities_steps(self, query: str, result: str) -> Steps:
+        js = (yield self.entity_extract_chain, {"query": query, "result": result})
         return safe_json_load(js)
 
 
 
     def analyze_sales_metrics(self, current_month: dict, trend_data: list) -> dict:
+        return self._run(self._analyze_sales_metrics_steps(current_month, trend_data))
+
+    async def aanalyze_sales_metrics(self, current_month: dict, trend_data: list) -> dict:
+        return await self._arun(self._analyze_sales_metrics_steps(current_month, trend_data))
+
+    def _analyze_sales_metrics_steps(self, current_month: dict, trend_data: list) -> Steps:
         """Generate AI insights for sales metrics."""
         from llm.prompts import sales_metrics_prompt
         
@@ -233,8 +418,8 @@ Build upon the previous answer with more depth and context."""
             trend_summary = "Insufficient data"
         
         # Generate insights
-        chain = sales_metrics_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(sales_metrics_prompt)
+        analysis = (yield chain, {
             "current_month": current_summary,
             "trend": trend_summary
         })
@@ -263,6 +448,12 @@ Build upon the previous answer with more depth and context."""
         }
 
     def analyze_sales_diagnostics(self, current_month: dict, trend_data: list) -> dict:
+        return self._run(self._analyze_sales_diagnostics_steps(current_month, trend_data))
+
+    async def aanalyze_sales_diagnostics(self, current_month: dict, trend_data: list) -> dict:
+        return await self._arun(self._analyze_sales_diagnostics_steps(current_month, trend_data))
+
+    def _analyze_sales_diagnostics_steps(self, current_month: dict, trend_data: list) -> Steps:
         """Generate diagnostic and prescriptive CEO insights for sales metrics."""
         from llm.prompts import sales_diagnostic_prompt
         
@@ -282,8 +473,8 @@ Build upon the previous answer with more depth and context."""
         ])
         
         # Generate insights
-        chain = sales_diagnostic_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(sales_diagnostic_prompt)
+        analysis = (yield chain, {
             "revenue": f"{current_month['revenue']/1000000:.0f}",
             "volume": f"{current_month['qty']:.0f}",
             "order_count": current_month['order_count'],
@@ -297,6 +488,12 @@ Build upon the previous answer with more depth and context."""
 
 
     def analyze_b2b_b2c_mix(self, b2b_data: dict, b2c_data: dict) -> dict:
+        return self._run(self._analyze_b2b_b2c_mix_steps(b2b_data, b2c_data))
+
+    async def aanalyze_b2b_b2c_mix(self, b2b_data: dict, b2c_data: dict) -> dict:
+        return await self._arun(self._analyze_b2b_b2c_mix_steps(b2b_data, b2c_data))
+
+    def _analyze_b2b_b2c_mix_steps(self, b2b_data: dict, b2c_data: dict) -> Steps:
         """Generate AI insights for B2B vs B2C sales mix."""
         from llm.prompts import b2b_b2c_mix_prompt
         
@@ -305,8 +502,8 @@ Build upon the previous answer with more depth and context."""
         b2c_summary = f"{b2c_data['percentage']:.1f}% (৳{b2c_data['revenue']/1000000:.0f}M, {b2c_data['qty']:.0f} MT)"
         
         # Generate insights
-        chain = b2b_b2c_mix_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(b2b_b2c_mix_prompt)
+        analysis = (yield chain, {
             "b2b_data": b2b_summary,
             "b2c_data": b2c_summary
         })
@@ -326,6 +523,12 @@ Build upon the previous answer with more depth and context."""
         }
 
     def analyze_credit_ratio_ceo(self, credit_data: dict, cash_data: dict, both_data: dict, channel_data: list) -> dict:
+        return self._run(self._analyze_credit_ratio_ceo_steps(credit_data, cash_data, both_data, channel_data))
+
+    async def aanalyze_credit_ratio_ceo(self, credit_data: dict, cash_data: dict, both_data: dict, channel_data: list) -> dict:
+        return await self._arun(self._analyze_credit_ratio_ceo_steps(credit_data, cash_data, both_data, channel_data))
+
+    def _analyze_credit_ratio_ceo_steps(self, credit_data: dict, cash_data: dict, both_data: dict, channel_data: list) -> Steps:
         """Generate CEO-focused AI insights for credit sales ratio."""
         
         credit_pct = credit_data.get('percentage', 0)
@@ -370,7 +573,7 @@ Produce a detailed financial strategy report (300-400 words) covering:
 - Format: Use structured Markdown with sub-bullets. Bold key financial metrics.
 - Focus: Cash cycle optimization and risk mitigation."""
 
-        result = self._invoke_json(prompt)
+        result = yield from self._invoke_json_steps(prompt)
         
         # Fallback balance calculation still needed for UI badges if used elsewhere, 
         # but here we focus on the text analysis.
@@ -384,6 +587,12 @@ Produce a detailed financial strategy report (300-400 words) covering:
         }
 
     def analyze_forecast_ceo(self, total_forecast: list, top_items: list, top_territories: list) -> dict:
+        return self._run(self._analyze_forecast_ceo_steps(total_forecast, top_items, top_territories))
+
+    async def aanalyze_forecast_ceo(self, total_forecast: list, top_items: list, top_territories: list) -> dict:
+        return await self._arun(self._analyze_forecast_ceo_steps(total_forecast, top_items, top_territories))
+
+    def _analyze_forecast_ceo_steps(self, total_forecast: list, top_items: list, top_territories: list) -> Steps:
         """Generate CEO-focused AI insights for sales forecast."""
         
         # Prepare summaries
@@ -426,7 +635,7 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
 - Format: Use structured Markdown with sub-bullets.
 - STRICT RULE: Use numbers sparingly to support key points. Focus on qualitative descriptors (Significant, Moderate, Critical)."""
 
-        analysis = self._invoke_json(prompt)
+        analysis = yield from self._invoke_json_steps(prompt)
         
         # Determine trend direction programmatically
         trend = "Stable"
@@ -445,6 +654,10 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
 
     
     
+    async def aanalyze_channel_credit_ratio(self, channels_list: list) -> dict:
+        # Rule-based, no LLM call to await
+        return self.analyze_channel_credit_ratio(channels_list)
+
     def analyze_channel_credit_ratio(self, channels_list: list) -> dict:
         """Generate AI insights for credit sales ratio by channel."""
         if not channels_list:
@@ -482,14 +695,20 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
         }
 
     def analyze_concentration_risk(self, top10_pct: float, top1_data: dict) -> dict:
+        return self._run(self._analyze_concentration_risk_steps(top10_pct, top1_data))
+
+    async def aanalyze_concentration_risk(self, top10_pct: float, top1_data: dict) -> dict:
+        return await self._arun(self._analyze_concentration_risk_steps(top10_pct, top1_data))
+
+    def _analyze_concentration_risk_steps(self, top10_pct: float, top1_data: dict) -> Steps:
         """Generate AI insights for customer concentration risk."""
         from llm.prompts import concentration_risk_prompt
         
         others_pct = 100.0 - top10_pct
         
         # Generate insights
-        chain = concentration_risk_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(concentration_risk_prompt)
+        analysis = (yield chain, {
             "top10_pct": f"{top10_pct:.2f}",
             "others_pct": f"{others_pct:.2f}",
             "top1_name": top1_data['name'],
@@ -511,6 +730,12 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
         }
 
     def analyze_sales_growth(self, current_data: dict, prev_data: dict, trend_data: list) -> dict:
+        return self._run(self._analyze_sales_growth_steps(current_data, prev_data, trend_data))
+
+    async def aanalyze_sales_growth(self, current_data: dict, prev_data: dict, trend_data: list) -> dict:
+        return await self._arun(self._analyze_sales_growth_steps(current_data, prev_data, trend_data))
+
+    def _analyze_sales_growth_steps(self, current_data: dict, prev_data: dict, trend_data: list) -> Steps:
         """Generate AI insights for sales growth momentum."""
         from llm.prompts import sales_growth_prompt
         
@@ -531,8 +756,8 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
                 trend_desc = "Consistently Falling"
         
         # Generate insights
-        chain = sales_growth_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(sales_growth_prompt)
+        analysis = (yield chain, {
             "current_month": current_data['month'],
             "current_revenue": f"{current_data['revenue']/1000000:.0f}",
             "prev_month": prev_data['month'],
@@ -550,6 +775,12 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
 
 
     def analyze_regional_performance(self, top_regions: list, bottom_regions: list, total_volume: float) -> dict:
+        return self._run(self._analyze_regional_performance_steps(top_regions, bottom_regions, total_volume))
+
+    async def aanalyze_regional_performance(self, top_regions: list, bottom_regions: list, total_volume: float) -> dict:
+        return await self._arun(self._analyze_regional_performance_steps(top_regions, bottom_regions, total_volume))
+
+    def _analyze_regional_performance_steps(self, top_regions: list, bottom_regions: list, total_volume: float) -> Steps:
         """Generate CEO strategic brief for regional sales."""
         from llm.prompts import regional_strategy_prompt
         
@@ -571,8 +802,8 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
         gap_efficiency = top_qty / low_qty if low_qty > 0 else 1.0
 
         # Generate insights
-        chain = regional_strategy_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(regional_strategy_prompt)
+        analysis = (yield chain, {
             "top_region": top['name'],
             "top_qty": f"{top_qty:.1f}",
             "top_share": f"{top_share:.1f}",
@@ -586,11 +817,17 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
         }
 
     def _invoke_json(self, prompt_text: str) -> dict:
+        return self._run(self._invoke_json_steps(prompt_text))
+
+    async def _ainvoke_json(self, prompt_text: str) -> dict:
+        return await self._arun(self._invoke_json_steps(prompt_text))
+
+    def _invoke_json_steps(self, prompt_text: str) -> Steps:
         import json
         import re
 
         # Invoke directly to allow brace characters in prompt
-        response = self.llm.invoke(prompt_text)
+        response = (yield self.llm, prompt_text)
         
         # Handle response (it might be AIMessage or string)
         if hasattr(response, 'content'):
@@ -609,6 +846,12 @@ CONSTRAINT: Focus on strategic implications and directional trends. Avoid extens
             return {"analysis": response_text}
 
     def analyze_area_performance(self, top_areas: list, bottom_areas: list, total_volume: float) -> dict:
+        return self._run(self._analyze_area_performance_steps(top_areas, bottom_areas, total_volume))
+
+    async def aanalyze_area_performance(self, top_areas: list, bottom_areas: list, total_volume: float) -> dict:
+        return await self._arun(self._analyze_area_performance_steps(top_areas, bottom_areas, total_volume))
+
+    def _analyze_area_performance_steps(self, top_areas: list, bottom_areas: list, total_volume: float) -> Steps:
         """Analyze area-level performance within regions."""
         prompt = f"""You are a Strategic AI Advisor to the CEO. Provide a COMPREHENSIVE deep-dive analysis of Area sales performance.
 
@@ -636,9 +879,15 @@ Produce a detailed strategic report (300-400 words) covering:
 - Format: Use structured Markdown with sub-bullets. Bold all key data points.
 - Depth: Do not summarize. Go deep into the data implications."""
         
-        return self._invoke_json(prompt)
+        return (yield from self._invoke_json_steps(prompt))
 
     def analyze_territory_performance(self, top_territories: list, bottom_territories: list, total_volume: float) -> dict:
+        return self._run(self._analyze_territory_performance_steps(top_territories, bottom_territories, total_volume))
+
+    async def aanalyze_territory_performance(self, top_territories: list, bottom_territories: list, total_volume: float) -> dict:
+        return await self._arun(self._analyze_territory_performance_steps(top_territories, bottom_territories, total_volume))
+
+    def _analyze_territory_performance_steps(self, top_territories: list, bottom_territories: list, total_volume: float) -> Steps:
         """Generate CEO strategic brief for territory performance."""
         from llm.prompts import territory_strategy_prompt
         
@@ -670,8 +919,8 @@ Produce a detailed strategic report (300-400 words) covering:
         ticket_gap = top_avg_ticket / bot_avg_ticket if bot_avg_ticket > 0 else 1.0
 
         # Generate insights
-        chain = territory_strategy_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(territory_strategy_prompt)
+        analysis = (yield chain, {
             "top_territory": top['name'],
             "top_qty": f"{top_qty:.1f}",
             "top_orders": top_orders,
@@ -688,6 +937,12 @@ Produce a detailed strategic report (300-400 words) covering:
 
 
     def analyze_forecast(self, total_forecast: list, top_items: list, top_territories: list) -> dict:
+        return self._run(self._analyze_forecast_steps(total_forecast, top_items, top_territories))
+
+    async def aanalyze_forecast(self, total_forecast: list, top_items: list, top_territories: list) -> dict:
+        return await self._arun(self._analyze_forecast_steps(total_forecast, top_items, top_territories))
+
+    def _analyze_forecast_steps(self, total_forecast: list, top_items: list, top_territories: list) -> Steps:
         """Generate AI insights for sales forecast."""
         from llm.prompts import forecast_prompt
         
@@ -697,8 +952,8 @@ Produce a detailed strategic report (300-400 words) covering:
         territory_summary = "\n".join([f"{x['name']}: {x['qty']:.1f} MT" for x in top_territories[:5]]) if top_territories else "No data"
         
         # Generate analysis
-        chain = forecast_prompt | self.llm | parser
-        analysis = chain.invoke({
+        chain = self._prompt_chain(forecast_prompt)
+        analysis = (yield chain, {
             "total_forecast": total_summary,
             "item_forecast": item_summary,
             "territory_forecast": territory_summary
@@ -168,6 +168,25 @@ Format:
 Be specific and concise.
 """)
 
+# Single-call reasoning ("fast" mode): the four steps above in one JSON reply
+reasoning_fast_prompt = PromptTemplate.from_template("""
+Analyze the data and answer in ONE JSON object with exactly these keys:
+{{
+  "observations": ["2-3 items, each: **[Observation]**: one sentence with key number"],
+  "patterns": ["1-2 items, each: **[Pattern]**: one sentence explaining the trend"],
+  "implications": ["1-2 items, each: **[Impact]**: one sentence on business implication"],
+  "recommendations": ["1-2 items, each: one sentence action with expected outcome"]
+}}
+
+Question: {question}
+SQL Result: {result}
+Answer so far: {descriptive_answer}
+
+Derive patterns from the observations, implications from the patterns and
+recommendations from the implications. Be specific and concise.
+Return only the JSON object, no other text.
+""")
+
 # Regional Insights Prompt
 regional_insights_prompt = PromptTemplate.from_template("""
 Analyze regional sales and provide brief insights.
@@ -0,0 +1,226 @@
+"""
+Precomputed schema digest for NL->SQL generation.
+
+LangChain's SQLDatabase.get_table_info reflects every allowed table and runs
+sample-row SELECTs each time the SQL prompt is filled. The digest replaces
+it: one compact text block per ALLOWED_TABLES table, with curated columns,
+their types and a few of the most frequent values of low-cardinality
+columns. It is built once (at startup or on first use), shared through
+Redis and kept in process memory, so generating SQL costs no database
+round-trip.
+
+Bump DIGEST_VERSION whenever DIGEST_TABLES or the text format changes; the
+Redis key carries it, so workers never mix formats.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableLambda
+from sqlalchemy import text
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DIGEST_VERSION = 2
+
+# Columns the model should see per table (in this order) and the ones worth
+# listing representative values for. Tables not listed show every column.
+DIGEST_TABLES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "tbldeliveryinfo": {
+        "columns": (
+            "delivery_date", "unit_id", "region", "area", "territory",
+            "customer_id", "customer_name", "channel_name", "credit_facility_type",
+            # qty_mt is every delivery converted to MT (shown in uom_shown), so
+            # it sums across units; delivery_qty is in each row's base_uom
+            "qty_mt", "uom_shown", "delivery_qty", "base_uom", "delivery_invoice_amount",
+        ),
+        "samples": ("region", "channel_name", "credit_facility_type", "uom_shown", "base_uom"),
+    },
+    "AIL_Monthly_Total_Forecast": {
+        "columns": ("Date", "Unit_Id", "Type", "numDeliveryQtyMT"),
+        "samples": ("Type",),
+    },
+    "AIL_Monthly_Total_Item": {
+        "columns": ("Date", "Unit_Id", "Type", "Item_Name", "numDeliveryQtyMT"),
+        "samples": ("Type",),
+    },
+    "AIL_Monthly_Total_Final_Territory": {
+        "columns": ("Date", "Unit_Id", "Type", "Region", "Area", "Territory", "intTerritory", "numDeliveryQtyMT"),
+        "samples": ("Type", "Region"),
+    },
+    "dim_business_unit": {
+        "columns": ("Unit_Id", "strBusinessUnitName"),
+        "samples": ("strBusinessUnitName",),
+    },
+}
+
+# Process copy: (expires_at, digest)
+_digest: Optional[Tuple[float, str]] = None
+_build_lock = threading.Lock()
+
+
+def allowed_tables() -> List[str]:
+    return [t.strip() for t in settings.ALLOWED_TABLES.split(",") if t.strip()]
+
+
+def digest_key(tables: Optional[Sequence[str]] = None) -> str:
+    """Redis key for the digest of ``tables`` in the current format."""
+    tables = allowed_tables() if tables is None else tables
+    fingerprint = hashlib.sha1(f"{settings.PG_SCHEMA}:{','.join(sorted(tables))}".encode()).hexdigest()[:12]
+    return f"schema_digest:v{DIGEST_VERSION}:{fingerprint}"
+
+
+def _quote(name: str) -> str:
+    return name if name.islower() else f'"{name}"'
+
+
+def format_digest(
+    columns: Dict[str, List[Tuple[str, str]]],
+    samples: Dict[Tuple[str, str], List[Any]]
+) -> str:
+    """
+    Text block for the SQL prompt.
+
+    Args:
+        columns: Table -> [(column, type)] in display order
+        samples: (table, column) -> representative values
+    """
+    blocks = []
+    for table, table_columns in columns.items():
+        lines = [f"Table {_quote(table)}:"]
+        for column, data_type in table_columns:
+            line = f"  {_quote(column)} {data_type}"
+            values = samples.get((table, column))
+            if values:
+                line += ", e.g. " + ", ".join(repr(str(value)) for value in values)
+            lines.append(line)
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks)
+
+
+def curate_columns(table: str, available: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """The curated columns of ``table`` that exist, or every column when none is curated."""
+    wanted = DIGEST_TABLES.get(table, {}).get("columns")
+    if not wanted:
+        return available
+    types = dict(available)
+    curated = [(column, types[column]) for column in wanted if column in types]
+    return curated or available
+
+
+def build_schema_digest(engine=None, tables: Optional[Sequence[str]] = None) -> str:
+    """Read column metadata and sample values from the database and format the digest."""
+    from app.db.engine import get_sync_engine
+
+    engine = engine or get_sync_engine()
+    tables = allowed_tables() if tables is None else list(tables)
+    limit = settings.SCHEMA_DIGEST_SAMPLE_VALUES
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT table_name, column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = :schema AND table_name = ANY(:tables)
+            ORDER BY table_name, ordinal_position
+        """), {"schema": settings.PG_SCHEMA, "tables": tables}).fetchall()
+
+        available: Dict[str, List[Tuple[str, str]]] = {}
+        for row in rows:
+            available.setdefault(row.table_name, []).append((row.column_name, row.data_type))
+        # Allowed-table order, skipping tables that don't exist
+        columns = {table: curate_columns(table, available[table]) for table in tables if table in available}
+
+        samples: Dict[Tuple[str, str], List[Any]] = {}
+        for table, table_columns in columns.items():
+            present = {column for column, _ in table_columns}
+            for column in DIGEST_TABLES.get(table, {}).get("samples", ()):
+                if column not in present or limit <= 0:
+                    continue
+                values = conn.execute(text(f"""
+                    SELECT "{column}" AS value
+                    FROM "{settings.PG_SCHEMA}"."{table}"
+                    WHERE "{column}" IS NOT NULL
+                    GROUP BY 1
+                    ORDER BY COUNT(*) DESC
+                    LIMIT :limit
+                """), {"limit": limit}).scalars().all()
+                samples[(table, column)] = list(values)
+
+    return format_digest(columns, samples)
+
+
+def _remember(digest: str) -> str:
+    global _digest
+    _digest = (time.monotonic() + settings.SCHEMA_DIGEST_TTL_SECONDS, digest)
+    return digest
+
+
+def _forget() -> None:
+    global _digest
+    _digest = None
+
+
+def _cached() -> Optional[str]:
+    if _digest is not None and _digest[0] > time.monotonic():
+        return _digest[1]
+    return None
+
+
+def _build_once() -> str:
+    # One build per process at a time; later callers reuse its result
+    with _build_lock:
+        digest = _cached()
+        if digest is None:
+            started = time.perf_counter()
+            digest = _remember(build_schema_digest())
+            logger.info(f"Schema digest built: {len(digest)} chars in {time.perf_counter() - started:.2f}s")
+        return digest
+
+
+def get_schema_digest(_: Any = None) -> str:
+    """Blocking lookup: process copy, else build."""
+    return _cached() or _build_once()
+
+
+async def aget_schema_digest(_: Any = None, refresh: bool = False) -> str:
+    """
+    Process copy, else Redis, else build and publish to Redis.
+
+    Args:
+        refresh: Rebuild from the database even if a copy exists
+    """
+    from app.utils.cache import redis_client
+
+    if not refresh:
+        digest = _cached()
+        if digest is not None:
+            return digest
+        try:
+            raw = await redis_client.get(digest_key())
+            if raw:
+                return _remember(json.loads(raw)["digest"])
+        except Exception as e:
+            logger.warning(f"Schema digest cache read failed: {e}")
+    else:
+        _forget()
+
+    digest = await asyncio.to_thread(_build_once)
+    try:
+        await redis_client.set(
+            digest_key(),
+            json.dumps({"version": DIGEST_VERSION, "built_at": time.time(), "digest": digest}),
+            ex=settings.SCHEMA_DIGEST_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.warning(f"Schema digest cache write failed: {e}")
+    return digest
+
+
+# Step for SalesGPTCore: input ignored, output is the digest text
+schema_digest = RunnableLambda(get_schema_digest, afunc=aget_schema_digest, name="schema_digest")
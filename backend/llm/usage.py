@@ -0,0 +1,72 @@
+"""
+LLM call and token accounting per answer.
+
+Inside ``with track_usage() as usage:`` every chat model call made by
+LangChain (directly or through a chain, in any task started inside the
+block) is counted, and its token usage added up. The handler is attached
+through a configure hook, so callers don't thread callbacks through
+SalesGPTCore.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+
+class LLMUsage(BaseCallbackHandler):
+    """Counts chat model calls and sums their token usage."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.total_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        input_tokens, output_tokens, total_tokens = _token_usage(response)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.total_tokens += total_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.calls,
+            "tokens": {"input": self.input_tokens, "output": self.output_tokens, "total": self.total_tokens},
+        }
+
+
+def _token_usage(response: LLMResult):
+    """(input, output, total) tokens of one call, 0s when the provider reports none."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage["input_tokens"], usage["output_tokens"], usage["total_tokens"]
+    # OpenAI-style providers (Groq included) also report it in llm_output
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    input_tokens = usage.get("prompt_tokens", 0)
+    output_tokens = usage.get("completion_tokens", 0)
+    return input_tokens, output_tokens, usage.get("total_tokens", input_tokens + output_tokens)
+
+
+_current_usage: ContextVar[Optional[LLMUsage]] = ContextVar("llm_usage", default=None)
+# Registered once: LangChain adds the active handler to every run's callbacks
+register_configure_hook(_current_usage, inheritable=True)
+
+
+@contextmanager
+def track_usage() -> Iterator[LLMUsage]:
+    usage = LLMUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.db.admission import AdmissionController, HEAVY, INTERACTIVE
+from app.utils.exceptions import ServiceUnavailableError
+
+
+@pytest.mark.asyncio
+async def test_heavy_lane_cannot_take_every_slot():
+    controller = AdmissionController(limit=3, heavy_limit=1, queue_timeout=0.05)
+    await controller.acquire(HEAVY)
+
+    with pytest.raises(ServiceUnavailableError):
+        await controller.acquire(HEAVY)
+
+    # Interactive reads still get the remaining slots
+    await controller.acquire(INTERACTIVE)
+    await controller.acquire(INTERACTIVE)
+    stats = controller.get_stats()["lanes"]
+    assert stats[HEAVY]["timeouts"] == 1
+    assert stats[INTERACTIVE]["active"] == 2
+
+
+@pytest.mark.asyncio
+async def test_freed_slot_goes_to_interactive_waiter_first():
+    controller = AdmissionController(limit=1, heavy_limit=1, queue_timeout=1)
+    await controller.acquire(INTERACTIVE)
+    order = []
+
+    async def wait(lane):
+        async with controller.slot(lane):
+            order.append(lane)
+
+    heavy = asyncio.create_task(wait(HEAVY))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(wait(INTERACTIVE))
+    await asyncio.sleep(0)
+    assert controller.get_stats()["lanes"][HEAVY]["queued"] == 1
+
+    controller.release(INTERACTIVE)
+    await asyncio.gather(heavy, interactive)
+    assert order == [INTERACTIVE, HEAVY]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_immediately():
+    controller = AdmissionController(limit=1, heavy_limit=1, queue_timeout=1, max_queue=1)
+    await controller.acquire(INTERACTIVE)
+    waiter = asyncio.create_task(controller.acquire(INTERACTIVE))
+    await asyncio.sleep(0)
+
+    with pytest.raises(ServiceUnavailableError) as exc:
+        await controller.acquire(INTERACTIVE)
+    assert exc.value.status_code == 503
+
+    controller.release(INTERACTIVE)
+    await waiter
+    assert controller.get_stats()["lanes"][INTERACTIVE]["rejected"] == 1
@@ -0,0 +1,272 @@
+import asyncio
+import pytest
+from datetime import date
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import Depends, Query
+from app.schemas.common import StandardResponse
+from app.utils import cache
+from app.utils.cache import cache_response, LocalLRUCache, _generate_cache_key
+
+
+def _get_service():
+    return MagicMock()
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.ops.append(("set", args, kwargs))
+
+    def sadd(self, *args):
+        self.ops.append(("sadd", args, {}))
+
+    async def execute(self):
+        return [await getattr(self.client, op)(*args, **kwargs) for op, args, kwargs in self.ops]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    store = {}
+
+    def _set(key, value, ex=None, px=None, nx=False):
+        if nx and key in store:
+            return None
+        store[key] = value
+        return True
+
+    def _unlink(*keys):
+        return sum(store.pop(key, None) is not None for key in keys)
+
+    async def _scan_iter(match=None, count=None):
+        prefix = match.rstrip("*")
+        for key in list(store):
+            if key.startswith(prefix):
+                yield key
+
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=lambda key: store.get(key))
+    client.set = AsyncMock(side_effect=_set)
+    client.eval = AsyncMock(side_effect=lambda script, n, key, token: store.pop(key, None) and 1)
+    client.sadd = AsyncMock(side_effect=lambda key, *members: store.setdefault(key, set()).update(members))
+    client.smembers = AsyncMock(side_effect=lambda key: set(store.get(key, set())))
+    client.unlink = AsyncMock(side_effect=_unlink)
+    client.scan_iter = _scan_iter
+    client.pipeline = lambda transaction=True: _FakePipeline(client)
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(cache, "load_data_version", AsyncMock(return_value="2024-06-30:100"))
+    cache._versions.clear()
+    return store
+
+
+@pytest.mark.asyncio
+async def test_cache_key_ignores_injected_services(fake_redis):
+    calls = []
+
+    @cache_response(expire=60, route="/test/metrics")
+    async def endpoint(
+        unit_id: Optional[str] = Query(None),
+        year: Optional[int] = Query(None),
+        service=Depends(_get_service)
+    ):
+        calls.append(service)
+        return StandardResponse(data={"unit_id": unit_id, "year": year})
+
+    first = await endpoint(unit_id="4", year=2024, service=MagicMock())
+    second = await endpoint(unit_id=" 4 ", year=2024, service=MagicMock())
+
+    # Second call is served from cache despite a different service instance
+    assert len(calls) == 1
+    assert isinstance(first, StandardResponse)
+    assert second == {"status": "success", "data": {"unit_id": "4", "year": 2024}, "message": None, "errors": None}
+    stats = cache.get_cache_stats()["/test/metrics"]
+    assert (stats["hits"], stats["local_hits"], stats["misses"], stats["errors"]) == (1, 1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(fake_redis):
+    calls = []
+
+    @cache_response(expire=60, route="/test/single-flight")
+    async def endpoint(unit_id: Optional[int] = Query(None)):
+        calls.append(unit_id)
+        await asyncio.sleep(0.01)
+        return {"unit_id": unit_id}
+
+    results = await asyncio.gather(*[endpoint(unit_id=4) for _ in range(5)])
+
+    assert calls == [4]
+    assert all(r == {"unit_id": 4} for r in results)
+    assert not any(key.startswith("lock:") for key in fake_redis)
+
+
+@pytest.mark.asyncio
+async def test_locked_key_serves_stale_value(fake_redis):
+    calls = []
+
+    @cache_response(expire=60, route="/test/stale")
+    async def endpoint(unit_id: Optional[int] = Query(None)):
+        calls.append(unit_id)
+        return {"fresh": True}
+
+    key = _generate_cache_key("/test/stale", {"unit_id": 1}, "2024-06-30:100")
+    fake_redis[key] = '{"fresh_until": 0, "payload": {"fresh": false}}'
+    fake_redis[f"lock:{key}"] = "other-worker"
+
+    assert await endpoint(unit_id=1) == {"fresh": False}
+    assert calls == []
+    assert cache.get_cache_stats()["/test/stale"]["stale_served"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_served_stale_and_refreshed_in_background(fake_redis):
+    opened, closed = [], []
+
+    async def _get_session():
+        opened.append(1)
+        yield "session"
+        closed.append(1)
+
+    def _get_service(session=Depends(_get_session)):
+        return {"session": session}
+
+    @cache_response(expire=60, route="/test/swr")
+    async def endpoint(unit_id: Optional[str] = Query(None), service=Depends(_get_service)):
+        return {"unit_id": unit_id, "session": service["session"]}
+
+    key = _generate_cache_key("/test/swr", {"unit_id": 4}, "2024-06-30:100")
+    fake_redis[key] = '{"fresh_until": 0, "payload": {"unit_id": "4", "session": "old"}}'
+
+    assert await endpoint(unit_id="4", service=None) == {"unit_id": "4", "session": "old"}
+    await asyncio.gather(*list(cache._refreshing.values()))
+
+    # Background refresh resolved its own dependencies and coerced unit_id back to str
+    assert (opened, closed) == ([1], [1])
+    assert '"session": "session"' in fake_redis[key]
+    assert '"unit_id": "4"' in fake_redis[key]
+    assert await endpoint.refresh({"unit_id": 4}, horizon=0) is False
+    assert cache.get_cache_stats()["/test/swr"]["refreshes"] == 1
+
+
+def test_local_lru_evicts_least_recently_used():
+    lru = LocalLRUCache(maxsize=2, ttl=60)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    assert lru.get("a") == 1
+    lru.set("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1 and lru.get("c") == 3
+    assert lru.evictions == 1
+
+
+def test_cache_key_normalizes_empty_values():
+    key = _generate_cache_key("/sales/ytd", {"unit_id": 4, "year": None})
+    assert key.startswith("cache:/sales/ytd:")
+    assert key != _generate_cache_key("/sales/mtd", {"unit_id": 4, "year": None})
+    assert cache._normalize_param("null") is None
+    assert cache._normalize_param("144") == 144
+
+
+def test_closed_period_classification():
+    today = date.today()
+    assert cache._is_closed_period({"year": today.year - 1, "month": 12})
+    assert cache._is_closed_period({"month": f"{today.year - 1}-03"})
+    assert not cache._is_closed_period({"year": today.year, "month": today.month})
+    assert not cache._is_closed_period({"unit_id": 4})
+    # Yearly responses stay open until the whole year has ended
+    assert not cache._is_closed_period({"year": today.year, "month": 1}, period_scope="year")
+
+
+@pytest.mark.asyncio
+async def test_open_period_key_follows_data_version(fake_redis, monkeypatch):
+    calls = []
+
+    @cache_response(expire=60, route="/test/versioned")
+    async def endpoint(unit_id: Optional[int] = Query(None), year: Optional[int] = Query(None)):
+        calls.append(year)
+        return {"calls": len(calls)}
+
+    last_year = date.today().year - 1
+    await endpoint(unit_id=4, year=last_year)
+    await endpoint(unit_id=4, year=None)
+
+    # New deliveries change the watermark: open period recomputes, closed one does not
+    monkeypatch.setattr(cache, "load_data_version", AsyncMock(return_value="2024-07-01:101"))
+    cache._versions.clear()
+    fake_redis.pop("cache:version:4")
+    for local in cache._local_caches.values():
+        local.clear()
+    await endpoint(unit_id=4, year=last_year)
+    await endpoint(unit_id=4, year=None)
+
+    assert calls == [last_year, None, None]
+    closed_key = _generate_cache_key("/test/versioned", {"unit_id": 4, "year": last_year})
+    assert '"fresh_until": null' in fake_redis[closed_key]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_by_tag_and_pattern(fake_redis):
+    @cache_response(expire=60, route="/test/tags", versioned=False)
+    async def endpoint(unit_id: Optional[int] = Query(None)):
+        return {"unit_id": unit_id}
+
+    await endpoint(unit_id=4)
+    await endpoint(unit_id=144)
+    key_4 = _generate_cache_key("/test/tags", {"unit_id": 4})
+    key_144 = _generate_cache_key("/test/tags", {"unit_id": 144})
+
+    await cache.invalidate_tags("unit:4")
+    assert key_4 not in fake_redis and key_144 in fake_redis
+
+    await cache.invalidate_cache("/test/tags")
+    assert key_144 not in fake_redis
+
+
+@pytest.mark.asyncio
+async def test_data_version_is_a_cheap_watermark_outside_admission(monkeypatch):
+    from contextlib import asynccontextmanager
+    from app.db import session as db_session
+
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchone=MagicMock(
+        return_value=MagicMock(max_date=date(2024, 7, 1), writes=1042)
+    )))
+
+    @asynccontextmanager
+    async def session_maker():
+        yield db
+
+    monkeypatch.setattr(db_session, "async_session_maker", session_maker)
+    # The request already holds a slot; the version must not wait for another
+    monkeypatch.setattr(db_session, "admitted_session", MagicMock(side_effect=AssertionError("admitted")))
+
+    assert await cache.load_data_version(4) == "2024-07-01:1042"
+    sql = str(db.execute.await_args.args[0])
+    assert "COUNT(" not in sql and "pg_stat_user_tables" in sql
+    assert db.execute.await_args.args[1] == {"unit_id": 4}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_version_misses_load_once(fake_redis, monkeypatch):
+    async def slow_version(unit_id):
+        await asyncio.sleep(0.01)
+        return "2024-07-01:7"
+
+    load = AsyncMock(side_effect=slow_version)
+    monkeypatch.setattr(cache, "load_data_version", load)
+
+    tokens = await asyncio.gather(*(cache._get_data_version("/test/version", 4) for _ in range(5)))
+
+    assert tokens == ["2024-07-01:7"] * 5
+    load.assert_awaited_once_with(4)
+    assert cache._version_loads == {}
@@ -0,0 +1,26 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+from app.jobs import cache_warmer
+
+
+def test_recent_periods_roll_over_year():
+    periods = cache_warmer._recent_periods(date(2025, 1, 15))
+
+    assert periods["month"] == [{"year": 2025, "month": 1}, {"year": 2024, "month": 12}]
+    assert periods["year"] == [{"year": 2025}, {"year": 2024}]
+    assert periods["month_str"] == [{"month": "2025-01"}, {"month": "2024-12"}]
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_refreshes_every_unit_and_route(monkeypatch):
+    refresh = AsyncMock(return_value=True)
+    for _, endpoint, _ in cache_warmer._warm_targets(cache_warmer._recent_periods()):
+        monkeypatch.setattr(endpoint, "refresh", refresh)
+
+    durations = await cache_warmer.warm_cache(horizon=240, unit_ids=[None, "4"])
+
+    assert set(durations) == {route for route, _, _ in cache_warmer._warm_targets(cache_warmer._recent_periods())}
+    assert refresh.await_args_list[0].args == ({"unit_id": None},)
+    assert refresh.await_args_list[0].kwargs == {"horizon": 240}
+    assert any(call.args == ({"unit_id": "4", "month": f"{date.today():%Y-%m}"},) for call in refresh.await_args_list)
@@ -0,0 +1,95 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.schemas.chat import SessionState
+from app.services.chat_pipeline import Stage, run_stages
+from app.services.chat_service import ChatService
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap_and_are_timed():
+    events = []
+
+    def step(name, delay, result):
+        async def run(*inputs):
+            events.append((name, "start", inputs))
+            await asyncio.sleep(delay)
+            events.append((name, "end"))
+            return result
+        return run
+
+    outputs, timings_ms = await run_stages([
+        Stage("sql", step("sql", 0.01, "rows")),
+        Stage("descriptive", step("descriptive", 0.05, "answer"), after=("sql",)),
+        Stage("entities", step("entities", 0.01, {"entities": []}), after=("sql",)),
+        Stage("reasoning", step("reasoning", 0.01, "why"), after=("sql", "descriptive")),
+    ])
+
+    assert outputs == {"sql": "rows", "descriptive": "answer", "entities": {"entities": []}, "reasoning": "why"}
+    assert set(timings_ms) == set(outputs) and timings_ms["descriptive"] >= 40
+    # Entities started with the descriptive answer and finished before it
+    assert events.index(("entities", "end")) < events.index(("descriptive", "end"))
+    assert ("reasoning", "start", ("rows", "answer")) in events
+
+
+@pytest.mark.asyncio
+async def test_stage_failure_cancels_the_rest():
+    cancelled = asyncio.Event()
+
+    async def slow(_):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def fail(_):
+        raise ValueError("bad SQL")
+
+    with pytest.raises(ValueError, match="bad SQL"):
+        await run_stages([
+            Stage("sql", AsyncMock(return_value="rows")),
+            Stage("descriptive", slow, after=("sql",)),
+            Stage("entities", fail, after=("sql",)),
+        ])
+    assert cancelled.is_set()
+
+    with pytest.raises(ValueError, match="unknown or later"):
+        await run_stages([Stage("descriptive", slow, after=("sql",))])
+
+
+@pytest.mark.asyncio
+async def test_chat_answer_is_unchanged_and_stages_run_concurrently():
+    out = {"question": "Why did sales drop?", "query": "SELECT 1", "result": "[(1,)]"}
+
+    def delayed(result, delay=0.05):
+        async def reply(*args, **kwargs):
+            await asyncio.sleep(delay)
+            return result
+        return reply
+
+    core = MagicMock()
+    core.arun_sql_from_question = AsyncMock(side_effect=delayed(out, 0))
+    core.adescriptive = AsyncMock(side_effect=delayed("Sales fell 5%."))
+    core.aextract_entities = AsyncMock(side_effect=delayed({"entity_type": "unit", "entities": ["A"], "metric": "qty"}))
+    core.aanalyze_with_reasoning = AsyncMock(side_effect=delayed("Because of rain."))
+
+    service = ChatService(core)
+    service._get_state = AsyncMock(return_value=SessionState())
+    service._save_state = AsyncMock()
+
+    started = time.perf_counter()
+    response = await service.process_message("Why did sales drop?", "s1", reasoning_mode="deep")
+    elapsed = time.perf_counter() - started
+
+    assert response.mode == "descriptive" and response.answer == "Because of rain."
+    core.aanalyze_with_reasoning.assert_awaited_once_with(
+        question=out["question"], result=out["result"], descriptive_answer="Sales fell 5%.", mode="deep"
+    )
+    saved = service._save_state.await_args.args[1]
+    assert saved.last_descriptive == "Because of rain." and saved.entities == ["A"]
+    assert set(response.meta["timings_ms"]) == {"sql", "descriptive", "entities", "reasoning"}
+    assert response.meta["reasoning_mode"] == "deep" and response.meta["llm_calls"] == 0
+    # descriptive -> reasoning is the critical path; entities ran alongside
+    assert elapsed < 0.14
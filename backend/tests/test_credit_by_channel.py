@@ -0,0 +1,52 @@
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.services import analytics_service
+from app.services.analytics_service import AnalyticsService
+
+
+def _row(pay_type, channel, sales, pct, pay_type_total, channel_total, grand_total):
+    return SimpleNamespace(
+        pay_type=pay_type, channel_name=channel, channel_sales=sales,
+        channel_pct_within_pay_type=pct, pay_type_total=pay_type_total,
+        channel_total=channel_total, grand_total=grand_total,
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(analytics_service, "_latest_months", analytics_service.LocalLRUCache(maxsize=8, ttl=60))
+    service = AnalyticsService(MagicMock())
+    service.repository = MagicMock()
+    service.repository.get_latest_delivery_date = AsyncMock(return_value=date(2025, 3, 17))
+    service.repository.get_credit_by_channel = AsyncMock(return_value=[
+        _row("Cash", "Retail", 60.0, 75.0, 80.0, 100.0, 200.0),
+        _row("Cash", "Dealer", 20.0, 25.0, 80.0, 100.0, 200.0),
+        _row("Credit", "Retail", 40.0, 33.33, 120.0, 100.0, 200.0),
+        _row("Credit", "Dealer", 80.0, 66.67, 120.0, 100.0, 200.0),
+    ])
+    return service
+
+
+@pytest.mark.asyncio
+async def test_latest_month_is_a_half_open_range_and_cached(service):
+    first = await service.get_credit_by_channel(unit_id=4)
+    await service.get_credit_by_channel(unit_id=4)
+
+    assert first["month"] == "2025-03"
+    assert service.repository.get_latest_delivery_date.await_count == 1
+    assert service.repository.get_credit_by_channel.await_args.args == (date(2025, 3, 1), date(2025, 4, 1), 4)
+
+
+@pytest.mark.asyncio
+async def test_totals_come_from_the_query(service):
+    data = await service.get_credit_by_channel(unit_id=None, month_str="2024-12")
+
+    assert service.repository.get_credit_by_channel.await_args.args[:2] == (date(2024, 12, 1), date(2025, 1, 1))
+    assert data["totals"] == {"credit": 120.0, "cash": 80.0, "both": 0.0, "other": 0.0, "total": 200.0}
+    assert data["by_payment_type"]["Cash"][0] == {"channel_name": "Retail", "revenue": 60.0, "percentage_within_type": 75.0}
+    assert data["by_channel"] == [
+        {"channel_name": "Retail", "revenue": 100.0, "percentage": 50.0},
+        {"channel_name": "Dealer", "revenue": 100.0, "percentage": 50.0},
+    ]
@@ -0,0 +1,93 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from app.db.utils import DAILY_ROLLUP_TABLE, get_delivery_source_sql
+from app.repositories.rollup_repository import RollupRepository
+from app.repositories.sales_repository import SalesRepository
+
+
+def test_source_reads_rollup_plus_raw_tail():
+    raw = get_delivery_source_sql(use_rollup=False)
+    rolled = get_delivery_source_sql(use_rollup=True)
+
+    assert DAILY_ROLLUP_TABLE not in raw
+    assert f"FROM {DAILY_ROLLUP_TABLE}" in rolled
+    assert "UNION ALL" in rolled
+    # Both shapes expose the same aggregate columns
+    for column in ("qty_mt", "order_count", "qty_order_count", "invoice_amount"):
+        assert column in raw and column in rolled
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_read_from_rollup(monkeypatch):
+    monkeypatch.setattr("app.db.utils.settings.USE_DAILY_ROLLUP", True)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchone=MagicMock(return_value=None)))
+
+    await SalesRepository(db).get_mtd_stats(date(2025, 1, 1), date(2025, 2, 1), unit_id=4)
+
+    sql = str(db.execute.await_args.args[0])
+    assert f"FROM {DAILY_ROLLUP_TABLE}" in sql
+    assert "SUM(order_count)" in sql and "COUNT(*)" not in sql
+
+
+@pytest.mark.asyncio
+async def test_incremental_refresh_starts_before_high_water_mark():
+    repo = RollupRepository(MagicMock())
+    repo.db.execute = AsyncMock(return_value=MagicMock(rowcount=42))
+    repo.get_state = AsyncMock(return_value={"covered_until": date(2025, 3, 10)})
+
+    result = await repo.refresh(lookback_days=3, until=date(2025, 3, 12))
+
+    assert result == {"start_date": "2025-03-07", "covered_until": "2025-03-12", "rows_written": 42}
+    insert_params = repo.db.execute.await_args_list[2].args[1]
+    assert insert_params == {"start_date": date(2025, 3, 7), "end_date": date(2025, 3, 12)}
+
+
+class FakeConnection:
+    """Autocommit connection recording its statements."""
+
+    def __init__(self, indisvalid):
+        self.indisvalid = indisvalid
+        self.isolation_level = None
+        self.statements = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execution_options(self, isolation_level):
+        self.isolation_level = isolation_level
+        return self
+
+    async def execute(self, statement, params=None):
+        self.statements.append(" ".join(str(statement).split()))
+        return MagicMock(scalar=MagicMock(return_value=self.indisvalid))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("indisvalid, built", [(None, True), (False, True), (True, False)])
+async def test_source_index_is_built_concurrently_outside_transactions(monkeypatch, indisvalid, built):
+    from app.db import session
+    from app.repositories.rollup_repository import SOURCE_DATE_INDEX
+
+    conn = FakeConnection(indisvalid)
+    monkeypatch.setattr(session, "async_engine", MagicMock(connect=lambda: conn))
+
+    assert await session.ensure_index_concurrently(*SOURCE_DATE_INDEX) is built
+
+    assert conn.isolation_level == "AUTOCOMMIT"
+    ddl = conn.statements[1:]
+    if built:
+        assert ddl[-1] == "CREATE INDEX CONCURRENTLY idx_tbldeliveryinfo_delivery_date ON tbldeliveryinfo (delivery_date)"
+    # Only an invalid leftover is dropped first
+    assert any(sql.startswith("DROP INDEX CONCURRENTLY") for sql in ddl) is (indisvalid is False)
+    assert len(ddl) == int(built) + int(indisvalid is False)
+
+    # The schema transaction no longer builds indexes on tbldeliveryinfo
+    repo = RollupRepository(MagicMock())
+    repo.db.execute = AsyncMock()
+    await repo.ensure_schema()
+    assert not any("ON tbldeliveryinfo (" in str(call.args[0]) for call in repo.db.execute.await_args_list)
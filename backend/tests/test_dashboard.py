@@ -0,0 +1,61 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from app.services.analytics_service import AnalyticsService
+from app.services.dashboard_service import DashboardService
+from app.services.regional_service import RegionalService
+from app.services.sales_service import SalesService
+
+
+@pytest.fixture
+def tiles(monkeypatch):
+    """Stub the tile services and record how many tiles run at once."""
+    state = {"running": 0, "peak": 0, "sessions": 0}
+
+    def stub(result):
+        async def method(self, *args, **kwargs):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return method
+
+    monkeypatch.setattr(SalesService, "get_ytd_comparison", stub({"ytd": 1}))
+    monkeypatch.setattr(SalesService, "get_mtd_stats", stub({"mtd": 1}))
+    monkeypatch.setattr(SalesService, "get_sales_metrics", stub({"metrics": 1}))
+    monkeypatch.setattr(SalesService, "get_monthly_summary", stub({"summary": 1}))
+    monkeypatch.setattr(RegionalService, "get_geo_performance", stub({"region": "r", "area": "a", "territory": "t"}))
+    monkeypatch.setattr(AnalyticsService, "get_customer_overview", stub({"top_customers": [], "concentration": {}}))
+    monkeypatch.setattr(AnalyticsService, "get_credit_ratio", stub(RuntimeError("boom")))
+
+    @asynccontextmanager
+    async def session_maker():
+        state["sessions"] += 1
+        yield object()
+
+    state["session_maker"] = session_maker
+    return state
+
+
+@pytest.mark.asyncio
+async def test_dashboard_runs_tiles_concurrently(tiles):
+    data = await DashboardService(tiles["session_maker"], max_concurrency=3).get_dashboard(unit_id=4, year=2025, month=3)
+
+    assert tiles["peak"] == 3
+    # Regions/areas/territories and customers/concentration share one task each
+    assert tiles["sessions"] == 7
+    assert data["tiles"]["regions"] == "r" and data["tiles"]["territories"] == "t"
+    assert data["tiles"]["ytd"] == {"ytd": 1}
+    assert set(data["timings_ms"]) == set(data["tiles"])
+
+
+@pytest.mark.asyncio
+async def test_failed_tile_does_not_fail_dashboard(tiles):
+    data = await DashboardService(tiles["session_maker"]).get_dashboard()
+
+    assert data["tiles"]["credit_ratio"] is None
+    assert data["errors"] == {"credit_ratio": "boom"}
+    assert data["tiles"]["mtd"] == {"mtd": 1}
@@ -0,0 +1,29 @@
+from app.db.engine import _record_checkout, async_engine, compute_pool_sizes, get_pool_stats
+
+
+def test_budget_is_split_across_workers():
+    sizes = compute_pool_sizes(budget=60, workers=4)
+    per_worker = sum(pool["pool_size"] + pool["max_overflow"] for pool in sizes.values())
+
+    assert per_worker == 15
+    assert sizes["sync"] == {"pool_size": 3, "max_overflow": 0}
+    assert sizes["async"] == {"pool_size": 6, "max_overflow": 6}
+
+
+def test_sync_pool_can_be_disabled():
+    sizes = compute_pool_sizes(budget=20, workers=2, sync_enabled=False)
+
+    assert sizes["sync"]["pool_size"] == 0
+    assert sizes["async"]["pool_size"] + sizes["async"]["max_overflow"] == 10
+
+
+def test_checkout_latency_is_reported(monkeypatch):
+    monkeypatch.setattr("app.db.engine._pool_stats", {})
+    _record_checkout("async", 0.004, checked_out=3)
+    _record_checkout("async", 0.002, checked_out=1)
+    _record_checkout("async", 0.5, checked_out=0, failed=True)
+
+    stats = get_pool_stats()["pools"]["async"]
+    assert (stats["checkouts"], stats["timeouts"], stats["peak_checked_out"]) == (2, 1, 3)
+    assert stats["avg_checkout_ms"] == 3.0 and stats["max_checkout_ms"] == 4.0
+    assert type(async_engine.pool).__name__ == "_AsyncPool"
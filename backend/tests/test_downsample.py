@@ -0,0 +1,19 @@
+import numpy as np
+from app.utils.downsample import lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(100, dtype=float)
+    y = np.sin(x / 10)
+    y[37] = 25.0
+
+    keep = lttb(x, y, 12)
+
+    assert len(keep) == 12
+    assert keep[0] == 0 and keep[-1] == 99
+    assert 37 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_returns_short_series_whole():
+    assert lttb(np.arange(5), np.ones(5), 10).tolist() == [0, 1, 2, 3, 4]
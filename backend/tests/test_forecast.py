@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.repositories.forecast_repository import ForecastRepository
+from app.services.forecast_service import ForecastService
+
+
+@pytest.mark.asyncio
+async def test_top_n_and_series_come_from_one_windowed_query():
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchall=MagicMock(return_value=[])))
+
+    await ForecastRepository(db).get_top_series("item", 7, limit=50)
+
+    db.execute.assert_awaited_once()
+    sql = str(db.execute.await_args.args[0])
+    assert "ROW_NUMBER() OVER" in sql and "GROUP BY \"Item_Name\"" in sql
+    assert db.execute.await_args.args[1] == {"unit_id": 7, "limit": 50}
+
+
+@pytest.mark.asyncio
+async def test_branches_run_concurrently_on_their_own_sessions():
+    in_flight = 0
+    peak = 0
+
+    async def slow(result):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return result
+
+    sessions = []
+
+    @asynccontextmanager
+    async def session_maker():
+        sessions.append(MagicMock())
+        yield sessions[-1]
+
+    with patch.object(ForecastRepository, "get_global_forecast", lambda self, unit: slow({
+        "actuals": [("2025-01", 10.0)], "forecast": [("2025-02", 12.0)]
+    })), patch.object(ForecastRepository, "get_top_series", lambda self, dim, unit, limit: slow([
+        (1, f"{dim}-a", "Historical", "2025-01", 4.0),
+        (1, f"{dim}-a", "Forecasted", "2025-02", 5.0),
+        (2, f"{dim}-b", "Forecasted", "2025-02", 1.0),
+    ])):
+        result = await ForecastService(session_maker=session_maker).get_sales_forecast("7")
+
+    assert peak == 3 and len(sessions) == 3
+    assert [chart.name for chart in result.items_charts] == ["item-a", "item-b"]
+    assert [chart.name for chart in result.territories_charts] == ["territory-a", "territory-b"]
+    assert result.global_chart[-1].forecast == 12.0
+
+
+def test_array_stitching_matches_per_point_merge():
+    import random
+    from app.services import forecast_series
+    from benchmarks.forecast_charts import merge_points
+
+    rng = random.Random(3)
+    months = [f"{year}-{month:02d}" for year in (2024, 2025) for month in range(1, 13)]
+    for _ in range(50):
+        # Duplicate months included: both sides must pick the same row
+        actuals = [(m, rng.choice([None, rng.random() * 100])) for m in rng.choices(months, k=rng.randint(0, 12))]
+        forecast = [(m, rng.random() * 100) for m in rng.choices(months, k=rng.randint(0, 12))]
+        rows = [(1, "x", "Historical", m, q) for m, q in actuals] + [(1, "x", "Forecasted", m, q) for m, q in forecast]
+
+        axis = forecast_series.month_axis(months)
+        charts = ForecastService._series_matrix(axis, rows)
+        got = forecast_series.to_points(axis, *charts[0][1:]) if charts else []
+
+        assert got == [point.model_dump() for point in merge_points(actuals, forecast)]
+
+
+@pytest.mark.asyncio
+async def test_columnar_format_shares_one_month_axis():
+    service = ForecastService(db=MagicMock())
+    service.repository.get_global_forecast = AsyncMock(return_value={
+        "actuals": [("2025-01", 10.0)], "forecast": [("2025-02", 12.0)]
+    })
+    service.repository.get_top_series = AsyncMock(return_value=[
+        (1, "a", "Forecasted", "2025-03", 5.0),
+    ])
+
+    result = await service.get_sales_forecast("7", columnar=True)
+
+    assert result["months"] == ["2025-01", "2025-02", "2025-03"]
+    assert result["global_chart"] == {"actual": [10.0, None, None], "forecast": [10.0, 12.0, None]}
+    assert result["items_charts"] == [{"name": "a", "actual": [None, None, None], "forecast": [None, None, 5.0]}]
+
+
+@pytest.mark.asyncio
+async def test_entity_series_is_fetched_alone_and_downsampled():
+    months = [f"{2022 + i // 12}-{i % 12 + 1:02d}" for i in range(48)]
+    rows = [(1, "Cement", "Historical" if i < 40 else "Forecasted", m, float(i % 7)) for i, m in enumerate(months)]
+    service = ForecastService(db=MagicMock())
+    service.repository.get_entity_series = AsyncMock(return_value=rows)
+
+    result = await service.get_entity_forecast("item", "Cement", "7", points=12)
+
+    service.repository.get_entity_series.assert_awaited_once_with("item", "Cement", 7)
+    chart = result["chart"]
+    assert 10 <= len(chart) <= 14
+    # Both ends and the stitch month survive
+    assert chart[0]["month"] == "2022-01" and chart[-1]["month"] == months[-1]
+    stitch = next(point for point in chart if point["month"] == months[39])
+    assert stitch["actual"] == stitch["forecast"] == rows[39][4]
+
+
+@pytest.mark.asyncio
+async def test_entity_series_without_unit_is_empty():
+    service = ForecastService(db=MagicMock())
+    service.repository.get_entity_series = AsyncMock()
+
+    assert await service.get_entity_forecast("item", "Cement", None) == {"name": "Cement", "chart": []}
+    service.repository.get_entity_series.assert_not_awaited()
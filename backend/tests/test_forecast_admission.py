@@ -0,0 +1,32 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.api.deps import get_core
+from app.db.admission import AdmissionController, INTERACTIVE
+from app.main import app
+
+
+@pytest.fixture
+def saturated(monkeypatch):
+    """Admission controller whose interactive lane is full and sheds at once."""
+    controller = AdmissionController(limit=1, heavy_limit=1, queue_timeout=0)
+    asyncio.run(controller.acquire(INTERACTIVE))
+    monkeypatch.setattr("app.db.session.admission", controller)
+    return controller
+
+
+@pytest.mark.parametrize("method, path", [
+    ("get", "/api/v1/forecast/overview?unit_id=98761"),
+    ("get", "/api/v1/forecast/items?unit_id=98761"),
+    ("post", "/api/v1/forecast/insights?unit_id=98761"),
+])
+def test_saturated_lane_returns_503(client, saturated, method, path):
+    app.dependency_overrides[get_core] = lambda: MagicMock()
+    try:
+        response = getattr(client, method)(path)
+    finally:
+        app.dependency_overrides.pop(get_core, None)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert saturated.get_stats()["lanes"][INTERACTIVE]["rejected"] >= 1
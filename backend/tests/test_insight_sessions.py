@@ -0,0 +1,49 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from app.api.deps import get_core
+from app.api.v1.endpoints import analytics, regional, sales
+from app.main import app
+from app.services.analytics_service import AnalyticsService
+from app.services.regional_service import RegionalService
+from app.services.sales_service import SalesService
+
+
+@pytest.mark.parametrize("path, module, service, method, data, llm", [
+    ("/api/v1/regional/insights", regional, RegionalService, "get_regional_contribution",
+     {"top_regions": []}, "aanalyze_regional_performance"),
+    ("/api/v1/regional/territory-insights", regional, RegionalService, "get_territory_performance",
+     {"top_territories": []}, "aanalyze_territory_performance"),
+    ("/api/v1/sales/mtd-insights", sales, SalesService, "get_mtd_stats",
+     {"current_month": {}}, "aanalyze_sales_diagnostics"),
+    ("/api/v1/analytics/concentration-risk-insights", analytics, AnalyticsService, "get_concentration_risk",
+     {"top_10_customers": []}, "aanalyze_concentration_risk"),
+])
+def test_session_is_released_before_the_llm_call(client, monkeypatch, path, module, service, method, data, llm):
+    open_sessions = []
+
+    @asynccontextmanager
+    async def admitted_session(lane=None):
+        open_sessions.append(lane)
+        try:
+            yield MagicMock()
+        finally:
+            open_sessions.pop()
+
+    async def analyze(**kwargs):
+        # A slow LLM reply must not keep a database slot
+        assert open_sessions == []
+        return {"analysis": "Hold steady."}
+
+    monkeypatch.setattr(module, "admitted_session", admitted_session)
+    monkeypatch.setattr(service, method, AsyncMock(return_value=data))
+    core = MagicMock(**{llm: AsyncMock(side_effect=analyze)})
+    app.dependency_overrides[get_core] = lambda: core
+    try:
+        response = client.request("GET" if module is not regional else "POST", path)
+    finally:
+        app.dependency_overrides.pop(get_core, None)
+
+    assert response.status_code == 200
+    getattr(core, llm).assert_awaited_once()
+    getattr(service, method).assert_awaited_once()
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from llm.chain import SalesGPTCore
+
+
+def make_core(reply, delay=0.0):
+    """SalesGPTCore around a fake chat model."""
+    calls = {"sync": 0, "async": 0}
+
+    def invoke(prompt):
+        calls["sync"] += 1
+        time.sleep(delay)
+        return AIMessage(content=reply(prompt))
+
+    async def ainvoke(prompt):
+        calls["async"] += 1
+        await asyncio.sleep(delay)
+        return AIMessage(content=reply(prompt))
+
+    return SalesGPTCore(RunnableLambda(invoke, afunc=ainvoke)), calls
+
+
+TERRITORIES = [
+    {"name": "North", "quantity": 120.0, "orders": 10},
+    {"name": "South", "quantity": 40.0, "orders": 8},
+]
+
+
+@pytest.mark.asyncio
+async def test_async_twins_match_the_blocking_methods():
+    core, calls = make_core(lambda prompt: "Growth is steady.")
+
+    forecast = [{"month": "2026-01", "qty": 100.0}, {"month": "2026-06", "qty": 120.0}]
+    expected = core.analyze_forecast_ceo(forecast, [], [])
+    assert await core.aanalyze_forecast_ceo(forecast, [], []) == expected == {
+        "trend": "Rising", "analysis": "Growth is steady."
+    }
+
+    expected = core.analyze_with_reasoning("Why?", "[(1,)]", "Sales fell.", mode="deep")
+    assert await core.aanalyze_with_reasoning("Why?", "[(1,)]", "Sales fell.", mode="deep") == expected
+    # Four reasoning steps, once per path
+    assert calls == {"sync": 5, "async": 5}
+
+
+@pytest.mark.asyncio
+async def test_async_insight_does_not_block_the_event_loop():
+    core, calls = make_core(lambda prompt: "Focus on South.", delay=0.2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    started = time.perf_counter()
+    insights, _ = await asyncio.gather(
+        core.aanalyze_territory_performance(TERRITORIES, TERRITORIES[::-1], 160.0),
+        ticker()
+    )
+
+    assert insights == {"analysis": "Focus on South."}
+    assert calls == {"sync": 0, "async": 1}
+    # The ticker ran while the LLM call was pending
+    assert ticks == 10
+    assert time.perf_counter() - started < 0.35
+
+
+@pytest.mark.asyncio
+async def test_arun_sql_retries_without_limit_after_an_execution_error(monkeypatch):
+    core, _ = make_core(lambda prompt: "")
+    core.allowed_tables = ["tbldeliveryinfo"]
+    monkeypatch.setattr("llm.schema_digest._digest", (float("inf"), "Table tbldeliveryinfo:\n  unit_id integer"))
+    prompts = []
+    core.sql_writer = RunnableLambda(
+        lambda inputs: prompts.append(inputs) or "SELECT 1 FROM tbldeliveryinfo LIMIT 5 LIMIT 5"
+    )
+    executed = []
+
+    async def execute(sql):
+        executed.append(sql)
+        if len(executed) == 1:
+            raise RuntimeError("syntax error at or near LIMIT")
+        return "[(1,)]"
+
+    core.sql_executor = RunnableLambda(lambda sql: None, afunc=execute)
+    monkeypatch.setattr("llm.chain.enforce_allowlist", lambda sql, tables: None)
+
+    out = await core.arun_sql_from_question("How many?")
+
+    assert prompts == [{"question": "How many?", "table_info": "Table tbldeliveryinfo:\n  unit_id integer"}]
+    assert out["result"] == "[(1,)]"
+    assert len(executed) == 2 and out["query"] == executed[1]
+
+
+def test_insights_never_build_the_sql_tooling():
+    with patch("llm.chain.get_sql_database") as get_sql_database:
+        core, _ = make_core(lambda prompt: "Hold steady.")
+        core.analyze_regional_performance(TERRITORIES, TERRITORIES[::-1], 160.0)
+        core.analyze_area_performance(TERRITORIES, TERRITORIES[::-1], 160.0)
+
+    get_sql_database.assert_not_called()
+    assert "sql_writer" not in vars(core)
+    # Chains are composed once per prompt and reused
+    assert core.descriptive_chain is core.descriptive_chain
+
+
+def test_shared_engine_is_built_once(monkeypatch):
+    from app.api import deps
+
+    built = []
+    monkeypatch.setattr(deps, "_core_instance", None)
+    monkeypatch.setattr(deps, "get_llm", lambda: built.append(1) or RunnableLambda(lambda prompt: prompt))
+
+    assert deps.get_core() is deps.get_core()
+    assert len(built) == 1
+
+
+def test_parser_chain_keeps_sync_path():
+    core, calls = make_core(lambda prompt: "  Hello there.  ")
+
+    assert core.general_response("hi") == "Hello there."
+    assert calls == {"sync": 1, "async": 0}
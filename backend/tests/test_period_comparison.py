@@ -0,0 +1,89 @@
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from app.repositories.period_repository import PeriodComparisonRepository, PeriodWindow
+from app.repositories.regional_repository import RegionalRepository
+
+
+def _row(**values):
+    row = SimpleNamespace(**values)
+    row._mapping = values
+    return row
+
+
+def _db(rows):
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchall=MagicMock(return_value=rows)))
+    return db
+
+
+@pytest.mark.asyncio
+async def test_all_windows_come_from_one_query():
+    db = _db([_row(w0_quantity=10.5, w0_orders=3, w0_uom="MT", w1_quantity=None, w1_orders=0, w1_uom=None)])
+    windows = [
+        PeriodWindow("current", date(2025, 1, 1), date(2025, 2, 1)),
+        PeriodWindow("last", date(2024, 1, 1), date(2024, 2, 1)),
+    ]
+
+    result = await PeriodComparisonRepository(db).compare(windows, unit_id=4)
+
+    assert db.execute.await_count == 1
+    sql, params = str(db.execute.await_args.args[0]), db.execute.await_args.args[1]
+    assert "FILTER (WHERE (delivery_date >= :w1_start AND delivery_date < :w1_end))" in sql
+    assert params["w1_start"] == date(2024, 1, 1) and params["unit_id"] == 4
+    assert result["totals"] == {
+        "current": {"quantity": 10.5, "orders": 3, "uom": "MT"},
+        "last": {"quantity": 0.0, "orders": 0, "uom": None},
+    }
+
+
+@pytest.mark.asyncio
+async def test_regional_growth_uses_single_scan():
+    def metrics(cur, prev, sply, orders=1):
+        return dict(
+            w0_quantity=cur, w0_orders=orders, w0_uom="MT",
+            w1_quantity=prev, w1_orders=1, w1_uom="MT",
+            w2_quantity=sply, w2_orders=1, w2_uom="MT",
+        )
+
+    db = _db([
+        _row(k0="North", k1="MT", grouping_id=0, **metrics(150.0, 100.0, 300.0)),
+        _row(k0="South", k1="MT", grouping_id=0, **metrics(50.0, 0.0, 25.0)),
+        _row(k0="East", k1="MT", grouping_id=0, **metrics(0.0, 40.0, 0.0, orders=0)),
+        _row(k0=None, k1=None, grouping_id=3, **metrics(200.0, 140.0, 325.0)),
+    ])
+
+    data = await RegionalRepository(db).get_region_performance(date(2025, 3, 1), date(2025, 4, 1), unit_id=4)
+
+    assert db.execute.await_count == 1
+    north, south = data["top_regions"]
+    assert (north["name"], north["percentage"], north["mom_percentage"], north["yo_percentage"]) == ("North", 75.0, 50.0, -50.0)
+    assert (south["name"], south["mom_percentage"], south["yo_percentage"]) == ("South", None, 100.0)
+    assert data["total_volume"] == 200.0
+
+
+@pytest.mark.asyncio
+async def test_geo_levels_share_one_scan():
+    def metrics(cur):
+        return dict(
+            w0_quantity=cur, w0_orders=1, w0_uom="MT",
+            w1_quantity=0.0, w1_orders=0, w1_uom=None,
+            w2_quantity=0.0, w2_orders=0, w2_uom=None,
+        )
+
+    # k0..k3 = region, uom_shown, area, territory; set bits mark rolled-up keys
+    db = _db([
+        _row(k0="North", k1="MT", k2=None, k3=None, grouping_id=0b0011, **metrics(80.0)),
+        _row(k0=None, k1="MT", k2="Dhaka", k3=None, grouping_id=0b1001, **metrics(80.0)),
+        _row(k0=None, k1="MT", k2=None, k3="T-1", grouping_id=0b1010, **metrics(80.0)),
+        _row(k0=None, k1=None, k2=None, k3=None, grouping_id=0b1111, **metrics(80.0)),
+    ])
+
+    data = await RegionalRepository(db).get_geo_performance(date(2025, 3, 1), date(2025, 4, 1))
+
+    assert db.execute.await_count == 1
+    assert "GROUPING SETS" in str(db.execute.await_args.args[0])
+    assert data["region"]["top_regions"][0]["name"] == "North"
+    assert data["area"]["top_areas"][0]["name"] == "Dhaka"
+    assert data["territory"]["top_territories"][0]["quantity_percentage"] == 100.0
@@ -0,0 +1,42 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from app.db.executor import fetch
+from app.repositories import units_repo
+
+
+def _session(columns, rows):
+    result = MagicMock()
+    result.keys.return_value = columns
+    result.all.return_value = rows
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_fetch_keeps_driver_types():
+    session = _session(["month", "revenue"], [(date(2025, 1, 1), Decimal("10.50")), (date(2025, 2, 1), None)])
+
+    result = await fetch("SELECT month, revenue FROM t WHERE unit_id = :unit_id", {"unit_id": 4}, session=session)
+
+    assert result.first() == (date(2025, 1, 1), Decimal("10.50"))
+    assert result.columnar() == {"month": [date(2025, 1, 1), date(2025, 2, 1)], "revenue": [Decimal("10.50"), None]}
+    assert session.execute.await_args.args[1] == {"unit_id": 4}
+
+
+@pytest.mark.asyncio
+async def test_business_unit_name_is_bound_not_interpolated(monkeypatch):
+    calls = []
+
+    async def fake_fetch(query, params=None):
+        calls.append((query, params))
+        return MagicMock(scalar=MagicMock(return_value=None))
+
+    monkeypatch.setattr(units_repo, "fetch", fake_fetch)
+
+    assert await units_repo.get_business_unit_name("4' OR '1'='1") == "Unit 4' OR '1'='1"
+    query, params = calls[0]
+    assert ":unit_id" in query and "OR '1'" not in query
+    assert params == {"unit_id": "4' OR '1'='1"}
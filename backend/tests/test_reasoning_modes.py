@@ -0,0 +1,58 @@
+import json
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from llm.chain import SalesGPTCore, parse_reasoning
+from llm.usage import track_usage
+
+
+def reply(content, input_tokens=100, output_tokens=20):
+    return AIMessage(content=content, usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens
+    })
+
+
+FAST_REPLY = json.dumps({
+    "observations": ["**Volume**: 1,200 MT in March", "**Orders**: down 8%"],
+    "patterns": ["**Softening**: fewer, smaller orders"],
+    "implications": ["**Cash**: slower collections"],
+    "recommendations": ["Run a dealer push in Dhaka", "Review credit terms"],
+})
+
+
+@pytest.mark.asyncio
+async def test_fast_mode_is_one_structured_call():
+    core = SalesGPTCore(GenericFakeChatModel(messages=iter([reply("Sure:\n" + FAST_REPLY)])))
+
+    with track_usage() as usage:
+        answer = await core.aanalyze_with_reasoning("Why?", "[(1200,)]", "Sales fell.", mode="fast")
+
+    assert answer == (
+        "**Analysis:**\n\n"
+        "**Data Insights:**\n- **Volume**: 1,200 MT in March\n- **Orders**: down 8%\n\n"
+        "**Patterns Identified:**\n- **Softening**: fewer, smaller orders\n\n"
+        "**Business Implications:**\n- **Cash**: slower collections\n\n"
+        "**Recommendations:**\n1. Run a dealer push in Dhaka\n2. Review credit terms"
+    )
+    assert usage.as_dict() == {"llm_calls": 1, "tokens": {"input": 100, "output": 20, "total": 120}}
+
+
+@pytest.mark.asyncio
+async def test_deep_mode_keeps_the_four_step_chain():
+    steps = [reply(text) for text in ("- obs", "- pattern", "- impact", "1. act")]
+    core = SalesGPTCore(GenericFakeChatModel(messages=iter(steps)))
+
+    with track_usage() as usage:
+        answer = await core.aanalyze_with_reasoning("Why?", "[(1,)]", "Sales fell.", mode="deep")
+
+    assert "**Data Insights:**\n- obs" in answer and "**Recommendations:**\n1. act" in answer
+    assert usage.as_dict() == {"llm_calls": 4, "tokens": {"input": 400, "output": 80, "total": 480}}
+
+
+def test_fast_mode_falls_back_to_the_raw_text_and_rejects_unknown_modes():
+    core = SalesGPTCore(GenericFakeChatModel(messages=iter([reply("Sales fell on lower demand.")])))
+
+    assert core.analyze_with_reasoning("Why?", "[]", "", mode="fast") == "**Analysis:**\n\nSales fell on lower demand."
+    assert parse_reasoning('{"observations": []}') is None
+    with pytest.raises(ValueError, match="Unknown reasoning mode"):
+        core.analyze_with_reasoning("Why?", "[]", "", mode="quick")
@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.repositories.rfm_repository import RFMRepository
+from app.services.rfm_service import RFMService
+
+
+@pytest.mark.asyncio
+async def test_customer_aggregates_are_computed_in_sql():
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchall=MagicMock(return_value=[
+        (1, "Acme", 1, 12, 340.5),
+        (2, "Beta", 30, 2, 10.0),
+    ])))
+
+    df = await RFMRepository(db).get_customer_aggregates(unit_id=4, start_date="2025-01-01")
+
+    sql = str(db.execute.await_args.args[0])
+    assert "GROUP BY customer_id, customer_name" in sql
+    assert "SUM(order_count) AS frequency" in sql
+    assert list(df.columns) == ["customer_id", "customer_name", "Recency", "Frequency", "Monetary"]
+    assert df["Frequency"].tolist() == [12, 2]
+
+
+def test_scoring_runs_on_one_row_per_customer():
+    import pandas as pd
+
+    aggregates = pd.DataFrame({
+        "customer_id": [1, 2, 3],
+        "customer_name": ["Acme", "Beta", "Core"],
+        "Recency": [1, 30, 200],
+        "Frequency": [12, 4, 1],
+        "Monetary": [340.5, 50.0, 2.0],
+    })
+
+    rfm = RFMService(MagicMock()).calculate_rfm(aggregates)
+
+    assert rfm["Customer_segment"].tolist() == ["Platinum", "Silver", "Occasional"]
+    assert rfm.loc[0, "RFM_Score"] == 5.0
+
+
+@pytest.mark.asyncio
+async def test_pages_share_one_scored_snapshot(monkeypatch):
+    import pandas as pd
+    from app.services import rfm_service
+
+    monkeypatch.setattr(rfm_service, "_snapshots", rfm_service.LocalLRUCache(maxsize=4, ttl=60))
+    service = RFMService(MagicMock())
+    service.repository.get_customer_aggregates = AsyncMock(return_value=pd.DataFrame({
+        "customer_id": [1, 2, 3],
+        "customer_name": ["Acme", "Beta", "Core"],
+        "Recency": [1, 30, 200],
+        "Frequency": [12, 4, 1],
+        "Monetary": [340.5, 50.0, 2.0],
+    }))
+    service.repository.get_rfm_summary = AsyncMock(return_value={"total_transactions": 17, "total_volume": 392.5})
+
+    first = await service.get_rfm_page(1, 2, unit_id=4, sort_by="monetary", descending=False)
+    second = await service.get_rfm_page(2, 2, unit_id=4, sort_by="monetary", descending=False)
+    silver = await service.get_rfm_page(1, 10, unit_id=4, segment="Silver")
+    overview = await service.get_rfm_overview(unit_id=4)
+
+    assert [c["customer_name"] for c in first.data] == ["Core", "Beta"]
+    assert [c["customer_name"] for c in second.data] == ["Acme"]
+    assert (first.total, first.total_pages) == (3, 2)
+    assert [c["customer_name"] for c in silver.data] == ["Beta"]
+    assert "customers" not in overview and overview["metadata"]["total_customers"] == 3
+    service.repository.get_customer_aggregates.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_snapshots_compute_once_and_release_their_lock(monkeypatch):
+    import asyncio
+    import pandas as pd
+    from app.services import rfm_service
+
+    monkeypatch.setattr(rfm_service, "_snapshots", rfm_service.LocalLRUCache(maxsize=4, ttl=60))
+    service = RFMService(MagicMock())
+
+    async def aggregates(*args):
+        await asyncio.sleep(0.01)
+        return pd.DataFrame({
+            "customer_id": [1], "customer_name": ["Acme"], "Recency": [1], "Frequency": [2], "Monetary": [3.0],
+        })
+
+    service.repository.get_customer_aggregates = AsyncMock(side_effect=aggregates)
+    service.repository.get_rfm_summary = AsyncMock(return_value={"total_transactions": 2, "total_volume": 3.0})
+
+    snapshots = await asyncio.gather(*(service.get_snapshot(unit_id=4) for _ in range(3)))
+
+    assert snapshots[0] is snapshots[1] is snapshots[2]
+    service.repository.get_customer_aggregates.assert_awaited_once()
+    assert rfm_service._snapshot_locks == {}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_hits_open_no_session(monkeypatch):
+    import asyncio
+    import pandas as pd
+    from contextlib import asynccontextmanager
+    from app.services import rfm_service
+
+    monkeypatch.setattr(rfm_service, "_snapshots", rfm_service.LocalLRUCache(maxsize=4, ttl=60))
+    open_sessions = []
+
+    @asynccontextmanager
+    async def session_maker():
+        open_sessions.append(1)
+        try:
+            yield MagicMock()
+        finally:
+            open_sessions.pop()
+
+    async def aggregates(*args):
+        await asyncio.sleep(0.01)
+        # Waiters on the lock hold nothing; only the computing request has a session
+        assert len(open_sessions) == 1
+        return pd.DataFrame({
+            "customer_id": [1], "customer_name": ["Acme"], "Recency": [1], "Frequency": [2], "Monetary": [3.0],
+        })
+
+    monkeypatch.setattr(rfm_service.RFMRepository, "get_customer_aggregates", AsyncMock(side_effect=aggregates))
+    monkeypatch.setattr(rfm_service.RFMRepository, "get_rfm_summary", AsyncMock(return_value={}))
+    opened = MagicMock(side_effect=session_maker)
+    service = RFMService(session_maker=opened)
+
+    await asyncio.gather(*(service.get_rfm_page(1, 10, unit_id=4) for _ in range(3)))
+    await service.get_rfm_overview(unit_id=4)
+
+    assert opened.call_count == 1 and open_sessions == []
@@ -0,0 +1,91 @@
+import pytest
+from datetime import date
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from contextlib import asynccontextmanager
+from app.jobs import build_rfm_history
+from app.jobs.build_rfm_history import add_months, months_to_build
+from app.services.rfm_service import RFMService
+
+
+def test_only_missing_closed_months_are_built():
+    months = months_to_build(
+        first_date=date(2024, 11, 20),
+        last_date=date(2025, 3, 5),
+        stored=[date(2024, 11, 1), date(2024, 12, 1)],
+        backfill_months=24,
+        today=date(2025, 3, 5),
+    )
+
+    # March 2025 is still open
+    assert months == [date(2025, 1, 1), date(2025, 2, 1)]
+    assert add_months(date(2025, 1, 1), -13) == date(2023, 12, 1)
+
+
+@pytest.mark.asyncio
+async def test_transition_matrix_defaults_to_latest_two_months():
+    service = RFMService(MagicMock())
+    service.history.get_stored_months = AsyncMock(return_value=[date(2025, 1, 1), date(2025, 2, 1)])
+    service.history.get_transitions = AsyncMock(return_value=[
+        SimpleNamespace(from_segment="Gold", to_segment="Silver", customers=7),
+        SimpleNamespace(from_segment="Gold", to_segment="Gold", customers=20),
+        SimpleNamespace(from_segment="Occasional", to_segment="Inactive", customers=3),
+        SimpleNamespace(from_segment="New", to_segment="Occasional", customers=5),
+        SimpleNamespace(from_segment="Silver", to_segment="Lost", customers=2),
+    ])
+
+    result = await service.get_segment_transitions(unit_id=4)
+
+    service.history.get_transitions.assert_awaited_once_with(4, date(2025, 1, 1), date(2025, 2, 1))
+    assert (result["from_month"], result["to_month"]) == ("2025-01", "2025-02")
+    assert result["matrix"]["Gold"]["Silver"] == 7
+    assert result["transitions"][0] == {"from": "Gold", "to": "Silver", "customers": 7}
+    assert (result["retained"], result["moved"], result["new"], result["lost"]) == (20, 10, 5, 2)
+
+
+@pytest.mark.asyncio
+async def test_history_months_are_scored_like_the_snapshot(monkeypatch):
+    import pandas as pd
+
+    df = pd.DataFrame({
+        "customer_id": [1, 2, 3],
+        "customer_name": ["Acme", "Beta", "Core"],
+        "Recency": [1, 30, 200],
+        "Frequency": [12, 4, 1],
+        "Monetary": [340.5, 50.0, 2.0],
+    })
+
+    @asynccontextmanager
+    async def session(lane=None):
+        yield MagicMock()
+
+    stored = AsyncMock(return_value=3)
+    monkeypatch.setattr(build_rfm_history, "admitted_session", session)
+    monkeypatch.setattr(build_rfm_history.RFMHistoryRepository, "replace_month", stored)
+    monkeypatch.setattr(
+        "app.repositories.rfm_repository.RFMRepository.get_customer_aggregates", AsyncMock(return_value=df)
+    )
+
+    assert await build_rfm_history.build_month(4, date(2025, 2, 1), window_months=12) == 3
+
+    customers, _ = await RFMService(MagicMock()).score_aggregates(df)
+    stored.assert_awaited_once_with(4, date(2025, 2, 1), customers)
+
+
+@pytest.mark.asyncio
+async def test_transitions_reject_reversed_or_unbuilt_months():
+    from app.utils.exceptions import NotFoundError, ValidationError
+
+    service = RFMService(MagicMock())
+    service.history.get_stored_months = AsyncMock(return_value=[date(2025, 1, 1), date(2025, 2, 1)])
+    service.history.get_transitions = AsyncMock(return_value=[])
+
+    with pytest.raises(ValidationError):
+        await service.get_segment_transitions(4, from_month="2025-02", to_month="2025-01")
+    with pytest.raises(ValidationError):
+        await service.get_segment_transitions(4, from_month="2025-02")
+    with pytest.raises(NotFoundError, match="2024-12"):
+        await service.get_segment_transitions(4, from_month="2024-12", to_month="2025-02")
+    with pytest.raises(NotFoundError, match="2025-03"):
+        await service.get_segment_transitions(4, to_month="2025-03")
+    service.history.get_transitions.assert_not_awaited()
@@ -0,0 +1,56 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from app.services import rfm_kernel
+from app.services.rfm_service import RFMService
+
+
+def _aggregates(n, seed=7):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customer_id": np.arange(n),
+        "customer_name": [f"Customer {i}" for i in range(n)],
+        # Small integer ranges force plenty of ties
+        "Recency": rng.integers(1, 60, n),
+        "Frequency": rng.integers(1, 20, n),
+        "Monetary": np.round(rng.gamma(2.0, 50.0, n), 3),
+    })
+
+
+def test_pct_rank_matches_pandas_with_ties():
+    values = np.array([3.0, 1.0, 3.0, 2.0, 3.0, 1.0])
+
+    for descending in (False, True):
+        expected = pd.Series(values).rank(pct=True, ascending=not descending).to_numpy()
+        np.testing.assert_allclose(rfm_kernel.pct_rank(values, descending=descending), expected)
+
+
+def test_kernel_matches_pandas_implementation():
+    df = _aggregates(500)
+    service = RFMService(MagicMock())
+    expected = service.calculate_rfm(df)
+
+    customers, summary = rfm_kernel.score_customers(
+        df["customer_id"].tolist(), df["customer_name"].tolist(),
+        df["Recency"].to_numpy(), df["Frequency"].to_numpy(), df["Monetary"].to_numpy()
+    )
+
+    expected_records = expected.to_dict("records")
+    for record in expected_records:
+        record["Customer_segment"] = str(record["Customer_segment"])
+    assert customers == expected_records
+
+    # Highest segment first, as the pandas version intends
+    assert [row["segment"] for row in summary] == ["Platinum", "Gold", "Silver", "Occasional", "Inactive"]
+    by_segment = {row["segment"]: row for row in summary}
+    for want in service.get_segment_summary(expected):
+        got = by_segment[str(want["segment"])]
+        for key, value in want.items():
+            if key == "segment":
+                continue
+            if isinstance(value, float) and math.isnan(value):
+                assert got[key] is None
+            else:
+                assert got[key] == pytest.approx(value), key
@@ -0,0 +1,68 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from app.db.utils import RFM_STATE_TABLE
+from app.repositories.rfm_repository import RFMRepository
+from app.repositories.rfm_state_repository import RFMStateRepository
+
+
+@pytest.mark.asyncio
+async def test_refresh_adds_only_deliveries_past_the_watermark():
+    repo = RFMStateRepository(MagicMock())
+    repo.db.execute = AsyncMock(return_value=MagicMock(rowcount=7))
+    repo.get_state = AsyncMock(return_value={"covered_until": date(2025, 3, 10)})
+
+    result = await repo.refresh(until=date(2025, 3, 12))
+
+    assert result == {"start_date": "2025-03-10", "covered_until": "2025-03-12", "rows_written": 7}
+    upsert = repo.db.execute.await_args_list[1]
+    sql = str(upsert.args[0])
+    assert "ON CONFLICT" in sql
+    assert "order_count = state.order_count + EXCLUDED.order_count" in sql
+    assert "TRUNCATE" not in sql
+    assert upsert.args[1] == {"start_date": date(2025, 3, 10), "end_date": date(2025, 3, 12)}
+
+
+@pytest.mark.asyncio
+async def test_full_refresh_rebuilds_from_the_beginning():
+    repo = RFMStateRepository(MagicMock())
+    repo.db.execute = AsyncMock(return_value=MagicMock(rowcount=0))
+    repo.get_state = AsyncMock()
+
+    result = await repo.refresh(full=True, until=date(2025, 3, 12))
+
+    repo.get_state.assert_not_awaited()
+    assert result["start_date"] is None
+    statements = [str(call.args[0]) for call in repo.db.execute.await_args_list]
+    assert any(f"TRUNCATE {RFM_STATE_TABLE}" in sql for sql in statements)
+
+
+@pytest.mark.asyncio
+async def test_whole_month_ranges_read_the_state(monkeypatch):
+    monkeypatch.setattr("app.repositories.rfm_repository.settings.USE_RFM_STATE", True)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=MagicMock(fetchall=MagicMock(return_value=[])))
+    repo = RFMRepository(db)
+
+    await repo.get_customer_aggregates(unit_id=4, start_date="2024-07-01", end_date="2025-06-30")
+    sql = str(db.execute.await_args.args[0])
+    assert f"FROM {RFM_STATE_TABLE}" in sql
+    assert "AND month >= :start_date" in sql
+
+    # Partial months still need every delivery
+    await repo.get_customer_aggregates(unit_id=4, start_date="2024-07-15", end_date="2025-06-30")
+    assert RFM_STATE_TABLE not in str(db.execute.await_args.args[0])
+
+
+@pytest.mark.asyncio
+async def test_refresh_groups_by_the_upsert_key():
+    repo = RFMStateRepository(MagicMock())
+    repo.db.execute = AsyncMock(return_value=MagicMock(rowcount=0))
+    repo.get_state = AsyncMock(return_value={"covered_until": date(2025, 3, 10)})
+
+    await repo.refresh(until=date(2025, 3, 12))
+
+    sql = " ".join(str(repo.db.execute.await_args_list[1].args[0]).split())
+    # One row per conflict key, or ON CONFLICT would touch the same row twice
+    assert "GROUP BY COALESCE(unit_id, -1), customer_id, COALESCE(customer_name, '')," in sql
+    assert "MAX(unit_id) AS unit_id" in sql and "MAX(customer_name) AS customer_name" in sql
@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from llm import schema_digest
+from llm.chain import SalesGPTCore
+
+
+@pytest.fixture(autouse=True)
+def no_process_copy():
+    schema_digest._forget()
+    yield
+    schema_digest._forget()
+
+
+def test_digest_keeps_curated_columns_and_quotes_mixed_case():
+    columns = {
+        "AIL_Monthly_Total_Item": schema_digest.curate_columns("AIL_Monthly_Total_Item", [
+            ("numDeliveryQtyMT", "double precision"), ("Date", "date"), ("Item_Name", "text"),
+            ("Type", "text"), ("Unit_Id", "integer"), ("index", "bigint"),
+        ]),
+        "other": schema_digest.curate_columns("other", [("id", "integer")]),
+    }
+    digest = schema_digest.format_digest(columns, {("AIL_Monthly_Total_Item", "Type"): ["Forecasted", "Actual"]})
+
+    assert digest == (
+        'Table "AIL_Monthly_Total_Item":\n'
+        '  "Date" date\n'
+        '  "Unit_Id" integer\n'
+        "  \"Type\" text, e.g. 'Forecasted', 'Actual'\n"
+        '  "Item_Name" text\n'
+        '  "numDeliveryQtyMT" double precision\n'
+        '\n'
+        'Table other:\n'
+        '  id integer'
+    )
+
+
+@pytest.mark.asyncio
+async def test_digest_comes_from_redis_before_the_database():
+    redis = MagicMock(get=AsyncMock(return_value='{"version": 1, "digest": "Table t:\\n  id integer"}'))
+    with patch("app.utils.cache.redis_client", redis), \
+            patch.object(schema_digest, "build_schema_digest") as build:
+        assert await schema_digest.aget_schema_digest() == "Table t:\n  id integer"
+        # Then from the process copy
+        assert await schema_digest.aget_schema_digest() == "Table t:\n  id integer"
+
+    build.assert_not_called()
+    redis.get.assert_awaited_once_with(schema_digest.digest_key())
+    assert schema_digest.digest_key().startswith(f"schema_digest:v{schema_digest.DIGEST_VERSION}:")
+
+
+@pytest.mark.asyncio
+async def test_digest_miss_builds_once_and_publishes():
+    redis = MagicMock(get=AsyncMock(return_value=None), set=AsyncMock())
+    with patch("app.utils.cache.redis_client", redis), \
+            patch.object(schema_digest, "build_schema_digest", return_value="Table t:\n  id integer") as build:
+        assert await schema_digest.aget_schema_digest() == "Table t:\n  id integer"
+        assert schema_digest.get_schema_digest() == "Table t:\n  id integer"
+
+    build.assert_called_once()
+    key, payload = redis.set.await_args.args
+    assert key == schema_digest.digest_key() and '"digest": "Table t:\\n  id integer"' in payload
+
+
+def test_sql_writer_fills_the_prompt_from_the_digest():
+    prompts = []
+
+    def llm(prompt, **kwargs):
+        prompts.append(prompt.to_string())
+        return AIMessage(content="SELECT 1")
+
+    core = SalesGPTCore(RunnableLambda(llm))
+    with patch("llm.chain.get_sql_database") as get_sql_database:
+        assert core.sql_writer.invoke({"question": "Total?", "table_info": "Table t:\n  id integer"}) == "SELECT 1"
+
+    get_sql_database.assert_not_called()
+    assert "Table Schema:\nTable t:\n  id integer\n" in prompts[0]
+    assert "Question: Total?\nSQLQuery: " in prompts[0]
+
+
+def test_digest_exposes_the_mt_columns_and_prompted_territory_id():
+    delivery = schema_digest.curate_columns("tbldeliveryinfo", [
+        ("delivery_qty", "double precision"), ("base_uom", "text"), ("qty_mt", "double precision"),
+        ("uom_shown", "text"), ("unit_id", "integer"),
+    ])
+    territory = schema_digest.curate_columns("AIL_Monthly_Total_Final_Territory", [
+        ("Territory", "text"), ("intTerritory", "integer"), ("numDeliveryQtyMT", "double precision"),
+    ])
+
+    # The converted MT columns come before the mixed-unit quantity
+    assert [column for column, _ in delivery] == ["unit_id", "qty_mt", "uom_shown", "delivery_qty", "base_uom"]
+    assert "intTerritory" in dict(territory)
@@ -0,0 +1,69 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+from app.db import utils
+from app.db.uom import build_qty_mt_case, build_uom_shown_case
+
+
+def _squash(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def test_registry_generates_legacy_conversion_case():
+    assert _squash(build_qty_mt_case()) == _squash("""
+        CASE
+            WHEN unit_id = 4 AND base_uom = 'Ton' THEN delivery_qty
+            WHEN unit_id = 4 THEN (delivery_qty * numgrossweight) / 1000.0
+            WHEN unit_id IN (188, 189, 232) THEN (delivery_qty * numgrossweight) / 1000.0
+            WHEN unit_id = 144 AND base_uom = 'Metric Tons' THEN delivery_qty
+            WHEN unit_id = 144 THEN (delivery_qty * numgrossweight) / 1000.0
+            ELSE delivery_qty
+        END
+    """)
+    assert "NEW.numgrossweight" in build_qty_mt_case("NEW.")
+    assert "WHEN NEW.unit_id IN (4, 188, 189, 232, 144) THEN 'MT'" in _squash(build_uom_shown_case("NEW."))
+
+
+def test_queries_use_persisted_columns_when_enabled(monkeypatch):
+    monkeypatch.setattr(utils.settings, "USE_PERSISTED_QTY_MT", True)
+
+    rows_sql = _squash(utils.get_delivery_rows_sql())
+    assert "(qty_mt)::double precision AS qty_mt" in rows_sql
+    assert "uom_shown AS uom_shown" in rows_sql
+    assert "numgrossweight" not in rows_sql
+
+
+@pytest.mark.asyncio
+async def test_backfill_builds_the_covering_index_after_the_schema_transaction(monkeypatch):
+    from app.jobs import backfill_qty_mt
+    from app.repositories.uom_repository import COVERING_INDEX, UomRepository
+
+    events = []
+    session = MagicMock()
+    session.execute = AsyncMock(side_effect=lambda statement, *args: events.append(_squash(str(statement))))
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+        events.append("COMMIT")
+
+    session.begin = transaction
+
+    @asynccontextmanager
+    async def session_maker():
+        yield session
+
+    async def ensure_index(name, definition):
+        events.append(f"CONCURRENTLY {name}")
+        return True
+
+    monkeypatch.setattr(backfill_qty_mt, "async_session_maker", session_maker)
+    monkeypatch.setattr(backfill_qty_mt, "ensure_index_concurrently", ensure_index)
+    monkeypatch.setattr(UomRepository, "get_date_bounds", AsyncMock(return_value=None))
+    monkeypatch.setattr(UomRepository, "backfill_range", AsyncMock(return_value=0))
+
+    await backfill_qty_mt.backfill_qty_mt()
+
+    assert not any("CREATE INDEX" in event for event in events)
+    assert events.index(f"CONCURRENTLY {COVERING_INDEX[0]}") == events.index("COMMIT") + 1
+    assert "INCLUDE (qty_mt, uom_shown)" in COVERING_INDEX[1]